@@ -1 +1,2 @@
-from .price_threshold import PriceThreshold
\ No newline at end of file
+from .price_threshold import PriceThreshold
+from .price_threshold_watcher import PriceThresholdWatcher, PriceThresholdWatchers
@@ -16,13 +16,10 @@
 import asyncio
 import decimal
 
-import async_channel.enums as channel_enums
 import octobot_commons.enums as commons_enums
 import octobot_commons.configuration as configuration
-import octobot_commons.channels_name as channels_name
 import octobot.automation.bases.abstract_trigger_event as abstract_trigger_event
-import octobot_trading.exchange_channel as exchanges_channel
-import octobot_trading.api as trading_api
+import tentacles.Automation.trigger_events.price_threshold_event.price_threshold_watcher as price_threshold_watcher
 
 
 class PriceThreshold(abstract_trigger_event.AbstractTriggerEvent):
@@ -36,51 +33,28 @@ class PriceThreshold(abstract_trigger_event.AbstractTriggerEvent):
         self.waiter_task = None
         self.symbol = None
         self.target_price = None
-        self.last_price = None
         self.trigger_event = asyncio.Event()
         self.registered_consumer = False
-        self.consumers = []
 
     async def _register_consumer(self):
         self.registered_consumer = True
-        for exchange_id in trading_api.get_exchange_ids():
-            self.consumers.append(
-                await exchanges_channel.get_chan(
-                    channels_name.OctoBotTradingChannelsName.MARK_PRICE_CHANNEL.value,
-                    exchange_id
-                ).new_consumer(
-                    self.mark_price_callback,
-                    priority_level=channel_enums.ChannelConsumerPriorityLevels.MEDIUM.value,
-                    symbol=self.symbol
-                )
-            )
+        # mark prices are watched once per symbol for every price threshold automation
+        await price_threshold_watcher.PriceThresholdWatchers.instance().add_automation(self)
 
-    async def mark_price_callback(
-            self, exchange: str, exchange_id: str, cryptocurrency: str, symbol: str, mark_price
-    ):
+    def on_threshold_crossed(self):
         if self.should_stop:
             # do not go any further if the action has been stopped
             return
-        self._check_threshold(mark_price)
-        self._update_last_price(mark_price)
-
-    def _update_last_price(self, mark_price):
-        self.last_price = mark_price
-
-    def _check_threshold(self, mark_price):
-        if self.last_price is None:
-            return
-        if mark_price >= self.target_price > self.last_price or mark_price <= self.target_price < self.last_price:
-            # mark_price crossed self.target_price threshold
-            self.trigger_event.set()
+        # mark price crossed self.target_price threshold
+        self.trigger_event.set()
 
     async def stop(self):
         await super().stop()
         if self.waiter_task is not None and not self.waiter_task.done():
             self.waiter_task.cancel()
-        for consumer in self.consumers:
-            await consumer.stop()
-        self.consumers = []
+        if self.registered_consumer:
+            await price_threshold_watcher.PriceThresholdWatchers.instance().remove_automation(self)
+            self.registered_consumer = False
 
     async def _get_next_event(self):
         if self.should_stop:
@@ -123,7 +97,6 @@ class PriceThreshold(abstract_trigger_event.AbstractTriggerEvent):
 
     def apply_config(self, config):
         self.trigger_event.clear()
-        self.last_price = None
         self.symbol = config[self.SYMBOL]
         self.target_price = decimal.Decimal(str(config[self.TARGET_PRICE]))
         self.trigger_only_once = config[self.TRIGGER_ONLY_ONCE]
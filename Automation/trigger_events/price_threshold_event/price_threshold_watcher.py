@@ -0,0 +1,129 @@
+#  This file is part of OctoBot (https://github.com/Drakkar-Software/OctoBot)
+#  Copyright (c) 2023 Drakkar-Software, All rights reserved.
+#
+#  OctoBot is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  OctoBot is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public
+#  License along with OctoBot. If not, see <https://www.gnu.org/licenses/>.
+import bisect
+
+import async_channel.enums as channel_enums
+import octobot_commons.singleton as singleton
+import octobot_commons.channels_name as channels_name
+import octobot_trading.exchange_channel as exchanges_channel
+import octobot_trading.api as trading_api
+
+
+class PriceThresholdWatcher:
+    """
+    Watches the mark price of a symbol for every PriceThreshold automation of this symbol.
+    Threshold prices are kept sorted: prices crossed between two mark prices are found using bisect
+    and only their automations are triggered.
+    """
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.last_price = None
+        self.threshold_prices = []
+        self.automations_by_threshold_price = {}
+        self.consumers = []
+        self.registered_consumers = False
+
+    def add_automation(self, automation):
+        if automation.target_price not in self.automations_by_threshold_price:
+            bisect.insort(self.threshold_prices, automation.target_price)
+            self.automations_by_threshold_price[automation.target_price] = []
+        self.automations_by_threshold_price[automation.target_price].append(automation)
+
+    def remove_automation(self, automation):
+        automations = self.automations_by_threshold_price.get(automation.target_price, [])
+        if automation in automations:
+            automations.remove(automation)
+            if not automations:
+                self.automations_by_threshold_price.pop(automation.target_price)
+                self.threshold_prices.remove(automation.target_price)
+
+    def has_automations(self) -> bool:
+        return bool(self.threshold_prices)
+
+    async def register_consumers(self):
+        if self.registered_consumers:
+            return
+        self.registered_consumers = True
+        for exchange_id in trading_api.get_exchange_ids():
+            self.consumers.append(
+                await exchanges_channel.get_chan(
+                    channels_name.OctoBotTradingChannelsName.MARK_PRICE_CHANNEL.value,
+                    exchange_id
+                ).new_consumer(
+                    self.mark_price_callback,
+                    priority_level=channel_enums.ChannelConsumerPriorityLevels.MEDIUM.value,
+                    symbol=self.symbol
+                )
+            )
+
+    async def stop(self):
+        for consumer in self.consumers:
+            await consumer.stop()
+        self.consumers = []
+        self.registered_consumers = False
+
+    async def mark_price_callback(
+            self, exchange: str, exchange_id: str, cryptocurrency: str, symbol: str, mark_price
+    ):
+        self.on_mark_price(mark_price)
+
+    def on_mark_price(self, mark_price):
+        if self.last_price is not None:
+            for threshold_price in self.get_crossed_threshold_prices(self.last_price, mark_price):
+                for automation in self.automations_by_threshold_price[threshold_price]:
+                    automation.on_threshold_crossed()
+        self.last_price = mark_price
+
+    def get_crossed_threshold_prices(self, previous_price, price) -> list:
+        if price > previous_price:
+            # previous_price < threshold_price <= price
+            return self.threshold_prices[
+                bisect.bisect_right(self.threshold_prices, previous_price):
+                bisect.bisect_right(self.threshold_prices, price)
+            ]
+        if price < previous_price:
+            # price <= threshold_price < previous_price
+            return self.threshold_prices[
+                bisect.bisect_left(self.threshold_prices, price):
+                bisect.bisect_left(self.threshold_prices, previous_price)
+            ]
+        return []
+
+
+class PriceThresholdWatchers(singleton.Singleton):
+    """
+    Shares one PriceThresholdWatcher per symbol between PriceThreshold automations
+    """
+    def __init__(self):
+        self.watchers_by_symbol = {}
+
+    async def add_automation(self, automation) -> PriceThresholdWatcher:
+        try:
+            watcher = self.watchers_by_symbol[automation.symbol]
+        except KeyError:
+            watcher = self.watchers_by_symbol[automation.symbol] = PriceThresholdWatcher(automation.symbol)
+        watcher.add_automation(automation)
+        await watcher.register_consumers()
+        return watcher
+
+    async def remove_automation(self, automation):
+        watcher = self.watchers_by_symbol.get(automation.symbol)
+        if watcher is None:
+            return
+        watcher.remove_automation(automation)
+        if not watcher.has_automations():
+            self.watchers_by_symbol.pop(automation.symbol)
+            await watcher.stop()
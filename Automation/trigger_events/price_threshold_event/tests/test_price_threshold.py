@@ -0,0 +1,127 @@
+#  This file is part of OctoBot (https://github.com/Drakkar-Software/OctoBot)
+#  Copyright (c) 2023 Drakkar-Software, All rights reserved.
+#
+#  OctoBot is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  OctoBot is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public
+#  License along with OctoBot. If not, see <https://www.gnu.org/licenses/>.
+import decimal
+import random
+
+import mock
+import pytest
+
+import octobot_commons.singleton as singleton
+import tentacles.Automation.trigger_events.price_threshold_event.price_threshold_watcher as price_threshold_watcher
+from tentacles.Automation.trigger_events.price_threshold_event import PriceThreshold, PriceThresholdWatchers
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+def _price_threshold(target_price, symbol="BTC/USDT"):
+    automation = PriceThreshold()
+    automation.apply_config({
+        PriceThreshold.SYMBOL: symbol,
+        PriceThreshold.TARGET_PRICE: target_price,
+        PriceThreshold.TRIGGER_ONLY_ONCE: False,
+        PriceThreshold.MAX_TRIGGER_FREQUENCY: 0,
+    })
+    return automation
+
+
+@pytest.fixture
+def watchers():
+    singleton.Singleton._instances.pop(PriceThresholdWatchers, None)
+    with mock.patch.object(price_threshold_watcher.PriceThresholdWatcher, "register_consumers",
+                           mock.AsyncMock()) as register_consumers_mock, \
+            mock.patch.object(price_threshold_watcher.PriceThresholdWatcher, "stop", mock.AsyncMock()) as stop_mock:
+        yield PriceThresholdWatchers.instance(), register_consumers_mock, stop_mock
+    singleton.Singleton._instances.pop(PriceThresholdWatchers, None)
+
+
+def _previous_implementation_check(target_price, last_price, mark_price):
+    return mark_price >= target_price > last_price or mark_price <= target_price < last_price
+
+
+async def test_crossed_thresholds(watchers):
+    watchers, register_consumers_mock, stop_mock = watchers
+    automations = [_price_threshold(price) for price in (100, 200, 200, 300)]
+    other_symbol_automation = _price_threshold(150, symbol="ETH/USDT")
+    for automation in automations + [other_symbol_automation]:
+        await automation._register_consumer()
+    watcher = watchers.watchers_by_symbol["BTC/USDT"]
+    assert watcher.threshold_prices == [100, 200, 300]
+    assert len(watchers.watchers_by_symbol) == 2
+
+    def _triggered():
+        triggered = [automation.trigger_event.is_set() for automation in automations]
+        for automation in automations:
+            automation.trigger_event.clear()
+        return triggered
+
+    watcher.on_mark_price(decimal.Decimal(150))
+    # no previous price
+    assert _triggered() == [False] * 4
+    watcher.on_mark_price(decimal.Decimal(200))
+    assert _triggered() == [False, True, True, False]
+    watcher.on_mark_price(decimal.Decimal(200))
+    assert _triggered() == [False] * 4
+    watcher.on_mark_price(decimal.Decimal(300))
+    # 200 was already reached
+    assert _triggered() == [False, False, False, True]
+    watcher.on_mark_price(decimal.Decimal(50))
+    assert _triggered() == [True, True, True, False]
+    assert not other_symbol_automation.trigger_event.is_set()
+
+    await automations[1].stop()
+    watcher.on_mark_price(decimal.Decimal(250))
+    assert _triggered() == [True, False, True, False]
+    for automation in automations + [other_symbol_automation]:
+        await automation.stop()
+    assert watchers.watchers_by_symbol == {}
+    assert stop_mock.await_count == 2
+
+
+async def test_thresholds_replay(watchers):
+    watchers, _, _ = watchers
+    rng = random.Random(1)
+    thresholds_count = 500
+    ticks_count = 20000
+    automations = [
+        _price_threshold(round(rng.uniform(20000, 30000), 2))
+        for _ in range(thresholds_count)
+    ]
+    for automation in automations:
+        await automation._register_consumer()
+    watcher = watchers.watchers_by_symbol["BTC/USDT"]
+    prices = [decimal.Decimal("25000")]
+    for _ in range(ticks_count - 1):
+        prices.append(prices[-1] + decimal.Decimal(str(round(rng.gauss(0, 20), 2))))
+
+    # previous implementation: each automation is woken up and compares prices at each tick
+    target_prices = [automation.target_price for automation in automations]
+    expected_triggers = [0] * thresholds_count
+    for last_price, mark_price in zip(prices, prices[1:]):
+        for index, target_price in enumerate(target_prices):
+            if _previous_implementation_check(target_price, last_price, mark_price):
+                expected_triggers[index] += 1
+    previous_wakeups = thresholds_count * ticks_count
+
+    triggers = [0] * thresholds_count
+    for index, automation in enumerate(automations):
+        automation.on_threshold_crossed = lambda index=index: triggers.__setitem__(index, triggers[index] + 1)
+    for mark_price in prices:
+        watcher.on_mark_price(mark_price)
+    watcher_wakeups = sum(triggers)
+    assert triggers == expected_triggers
+    # only automations which threshold is crossed are woken up
+    assert 0 < watcher_wakeups < previous_wakeups / 100
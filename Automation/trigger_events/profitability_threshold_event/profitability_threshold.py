@@ -14,9 +14,10 @@
 #  You should have received a copy of the GNU General Public
 #  License along with OctoBot. If not, see <https://www.gnu.org/licenses/>.
 import asyncio
+import collections
 import decimal
+import math
 import time
-import sortedcontainers
 
 import async_channel.enums as channel_enums
 import octobot_commons.enums as commons_enums
@@ -34,6 +35,9 @@ class ProfitabilityThreshold(abstract_trigger_event.AbstractTriggerEvent):
     TIME_PERIOD = "time_period"
     TRIGGER_ONLY_ONCE = "trigger_only_once"
     MAX_TRIGGER_FREQUENCY = "max_trigger_frequency"
+    # hard cap on stored profitability values: on large time periods, values are stored by time buckets
+    # of more than 1 second to remain under this cap
+    MAX_PROFITABILITY_HISTORY_SIZE = 10000
 
     def __init__(self):
         super().__init__()
@@ -41,6 +45,7 @@ class ProfitabilityThreshold(abstract_trigger_event.AbstractTriggerEvent):
         self.percent_change = None
         self.time_period = None
         self.profitability_by_time = None
+        self.profitability_bucket_duration = 1
         self.trigger_event = asyncio.Event()
         self.registered_consumer = False
         self.consumers = []
@@ -73,15 +78,22 @@ class ProfitabilityThreshold(abstract_trigger_event.AbstractTriggerEvent):
         self._update_profitability_by_time(profitability_percent)
         self._check_threshold(profitability_percent)
 
-    def _update_profitability_by_time(self, profitability_percent):
-        self.profitability_by_time[int(time.time())] = profitability_percent
-        current_time = time.time()
-        for profitability_time in list(self.profitability_by_time):
-            if profitability_time - current_time > self.time_period:
-                self.profitability_by_time.pop(profitability_time)
+    def _update_profitability_by_time(self, profitability_percent, current_time=None):
+        # profitability_by_time is a deque of (time bucket, profitability) sorted by time: evict outdated values
+        # from the left and only keep the latest profitability of each time bucket
+        current_time = time.time() if current_time is None else current_time
+        profitability_time = int(current_time) // self.profitability_bucket_duration
+        if self.profitability_by_time and self.profitability_by_time[-1][0] == profitability_time:
+            self.profitability_by_time[-1] = (profitability_time, profitability_percent)
+        else:
+            self.profitability_by_time.append((profitability_time, profitability_percent))
+        oldest_time = (current_time - self.time_period) / self.profitability_bucket_duration
+        # always keep the latest profitability, even on sub-second time periods
+        while len(self.profitability_by_time) > 1 and self.profitability_by_time[0][0] < oldest_time:
+            self.profitability_by_time.popleft()
 
     def _check_threshold(self, profitability_percent):
-        oldest_compared_profitability = next(iter(self.profitability_by_time.values()))
+        oldest_compared_profitability = self.profitability_by_time[0][1]
         if trading_constants.ZERO < self.percent_change <= profitability_percent - oldest_compared_profitability:
             # profitability_percent reached or when above self.percent_change
             self.trigger_event.set()
@@ -141,8 +153,11 @@ class ProfitabilityThreshold(abstract_trigger_event.AbstractTriggerEvent):
 
     def apply_config(self, config):
         self.trigger_event.clear()
-        self.profitability_by_time = sortedcontainers.SortedDict()
         self.percent_change = decimal.Decimal(str(config[self.PERCENT_CHANGE]))
         self.time_period = config[self.TIME_PERIOD] * commons_constants.MINUTE_TO_SECONDS
+        self.profitability_bucket_duration = max(
+            1, math.ceil(self.time_period / self.MAX_PROFITABILITY_HISTORY_SIZE)
+        )
+        self.profitability_by_time = collections.deque(maxlen=self.MAX_PROFITABILITY_HISTORY_SIZE)
         self.trigger_only_once = config[self.TRIGGER_ONLY_ONCE]
         self.max_trigger_frequency = config[self.MAX_TRIGGER_FREQUENCY]
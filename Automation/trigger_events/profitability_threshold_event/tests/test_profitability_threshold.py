@@ -0,0 +1,132 @@
+#  This file is part of OctoBot (https://github.com/Drakkar-Software/OctoBot)
+#  Copyright (c) 2023 Drakkar-Software, All rights reserved.
+#
+#  OctoBot is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  OctoBot is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public
+#  License along with OctoBot. If not, see <https://www.gnu.org/licenses/>.
+import decimal
+import gc
+import random
+import tracemalloc
+
+import pytest
+
+from tentacles.Automation.trigger_events.profitability_threshold_event import ProfitabilityThreshold
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+def _profitability_threshold(percent_change, time_period):
+    automation = ProfitabilityThreshold()
+    automation.apply_config({
+        ProfitabilityThreshold.PERCENT_CHANGE: percent_change,
+        ProfitabilityThreshold.TIME_PERIOD: time_period,
+        ProfitabilityThreshold.TRIGGER_ONLY_ONCE: False,
+        ProfitabilityThreshold.MAX_TRIGGER_FREQUENCY: 0,
+    })
+    return automation
+
+
+def _profitability_stream(updates_count, seed, max_interval=3):
+    rng = random.Random(seed)
+    current_time = 1_600_000_000
+    profitability = decimal.Decimal(0)
+    for _ in range(updates_count):
+        current_time += rng.uniform(0.2, max_interval)
+        profitability += decimal.Decimal(str(round(rng.gauss(0, 0.3), 2)))
+        yield current_time, profitability
+
+
+def _update(automation, current_time, profitability):
+    automation._update_profitability_by_time(profitability, current_time=current_time)
+    automation._check_threshold(profitability)
+    triggered = automation.trigger_event.is_set()
+    automation.trigger_event.clear()
+    return triggered
+
+
+async def test_triggers_in_time_window():
+    # 1 minute window
+    automation = _profitability_threshold(5, 1)
+    assert not _update(automation, 1000, decimal.Decimal(0))
+    assert not _update(automation, 1030, decimal.Decimal(4))
+    assert _update(automation, 1050, decimal.Decimal(5))
+    # 0 at 1000 is out of the window, compare with 4 at 1030
+    assert not _update(automation, 1061, decimal.Decimal(6))
+    assert _update(automation, 1062, decimal.Decimal(10))
+    assert list(automation.profitability_by_time) == [(1030, 4), (1050, 5), (1061, 6), (1062, 10)]
+    # only the latest profitability of a second is kept
+    assert not _update(automation, 1062.5, decimal.Decimal(6))
+    assert list(automation.profitability_by_time) == [(1030, 4), (1050, 5), (1061, 6), (1062, 6)]
+    assert not _update(automation, 10000, decimal.Decimal(-100))
+    assert list(automation.profitability_by_time) == [(10000, -100)]
+
+    losses_automation = _profitability_threshold(-5, 1)
+    assert not _update(losses_automation, 1000, decimal.Decimal(0))
+    assert not _update(losses_automation, 1001, decimal.Decimal(-4.9))
+    assert _update(losses_automation, 1002, decimal.Decimal(-5))
+
+
+async def test_sub_second_time_window():
+    for time_period in (0, 0.001):
+        automation = _profitability_threshold(5, time_period)
+        assert not _update(automation, 1000.5, decimal.Decimal(1))
+        assert list(automation.profitability_by_time) == [(1000, 1)]
+        # only the latest profitability is kept
+        assert not _update(automation, 1001.5, decimal.Decimal(10))
+        assert list(automation.profitability_by_time) == [(1001, 10)]
+
+
+async def test_matches_time_window_reference_on_profitability_stream():
+    time_period = 5
+    automation = _profitability_threshold(1, time_period)
+    # reference: every profitability of the last time_period minutes by second
+    profitability_by_time = {}
+    triggers = expected_triggers = 0
+    for current_time, profitability in _profitability_stream(10000, 1):
+        profitability_by_time[int(current_time)] = profitability
+        profitability_by_time = {
+            profitability_time: value
+            for profitability_time, value in profitability_by_time.items()
+            if current_time - profitability_time <= time_period * 60
+        }
+        oldest_compared_profitability = profitability_by_time[min(profitability_by_time)]
+        expected_triggers += profitability - oldest_compared_profitability >= 1
+        triggered = _update(automation, current_time, profitability)
+        assert triggered is (profitability - oldest_compared_profitability >= 1)
+        triggers += triggered
+        assert len(automation.profitability_by_time) == len(profitability_by_time)
+    assert 0 < triggers == expected_triggers
+
+
+@pytest.mark.parametrize("time_period, max_interval", [(60, 3), (60 * 24 * 30, 25)])
+async def test_long_running_profitability_stream_memory(time_period, max_interval):
+    automation = _profitability_threshold(1, time_period)
+    chunk_size = 50000
+    memories = []
+    tracemalloc.start()
+    try:
+        stream = _profitability_stream(chunk_size * 6, 2, max_interval=max_interval)
+        for _ in range(6):
+            for _, (current_time, profitability) in zip(range(chunk_size), stream):
+                _update(automation, current_time, profitability)
+            gc.collect()
+            memories.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+    history_size = len(automation.profitability_by_time)
+    assert history_size <= ProfitabilityThreshold.MAX_PROFITABILITY_HISTORY_SIZE
+    # flat memory once the window is full
+    assert abs(memories[-1] - memories[-2]) < 10000
+    oldest_time = automation.profitability_by_time[0][0] * automation.profitability_bucket_duration
+    assert current_time - time_period * 60 - automation.profitability_bucket_duration <= oldest_time
@@ -0,0 +1,124 @@
+#  Drakkar-Software OctoBot
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import time
+
+import octobot_commons.logging as logging
+
+
+class BufferedWriterMetrics:
+    def __init__(self):
+        self.received_rows = 0
+        self.written_rows = 0
+        self.flushes = 0
+        self.max_buffered_rows = 0
+        # times a producer had to wait for a flush because the buffer was full
+        self.backpressure_waits = 0
+        self.backpressure_wait_time = 0
+        self.last_flush_duration = 0
+
+    def to_dict(self):
+        return {
+            "received_rows": self.received_rows,
+            "written_rows": self.written_rows,
+            "flushes": self.flushes,
+            "max_buffered_rows": self.max_buffered_rows,
+            "backpressure_waits": self.backpressure_waits,
+            "backpressure_wait_time": self.backpressure_wait_time,
+            "last_flush_duration": self.last_flush_duration,
+        }
+
+
+class BufferedDataWriter:
+    """
+    Buffers rows to insert into the given database and writes them by batches using a single
+    insert statement (and commit) per table.
+    Rows are flushed when flush_rows_count rows are buffered or every flush_interval seconds.
+    When max_buffered_rows rows are buffered, producers wait for the current buffer to be written.
+    """
+    def __init__(self, database, flush_rows_count=500, flush_interval=1, max_buffered_rows=10000):
+        self.database = database
+        self.flush_rows_count = flush_rows_count
+        self.flush_interval = flush_interval
+        self.max_buffered_rows = max(max_buffered_rows, flush_rows_count)
+        self.metrics = BufferedWriterMetrics()
+        self.logger = logging.get_logger(self.__class__.__name__)
+
+        self._rows_by_table = {}
+        self._buffered_rows = 0
+        self._flush_lock = asyncio.Lock()
+        self._periodic_flush_task = None
+
+    def start(self):
+        if self._periodic_flush_task is None:
+            self._periodic_flush_task = asyncio.create_task(self._periodic_flush())
+
+    async def stop(self):
+        if self._periodic_flush_task is not None:
+            self._periodic_flush_task.cancel()
+            self._periodic_flush_task = None
+        await self.flush()
+
+    def get_buffered_rows_count(self):
+        return self._buffered_rows
+
+    async def add(self, table, timestamp, **kwargs):
+        if self._buffered_rows >= self.max_buffered_rows:
+            # buffer is full: slow down producers until it is written
+            t0 = time.time()
+            self.metrics.backpressure_waits += 1
+            await self.flush()
+            self.metrics.backpressure_wait_time += time.time() - t0
+        self._rows_by_table.setdefault(table, []).append((timestamp, kwargs))
+        self._buffered_rows += 1
+        self.metrics.received_rows += 1
+        self.metrics.max_buffered_rows = max(self.metrics.max_buffered_rows, self._buffered_rows)
+        if self._buffered_rows >= self.flush_rows_count and not self._flush_lock.locked():
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._buffered_rows:
+                return
+            rows_by_table = self._rows_by_table
+            self._rows_by_table = {}
+            self._buffered_rows = 0
+            t0 = time.time()
+            for table, rows in rows_by_table.items():
+                await self._write_rows(table, rows)
+            self.metrics.flushes += 1
+            self.metrics.last_flush_duration = time.time() - t0
+
+    async def _write_rows(self, table, rows):
+        # rows of a table always share the same columns: one insert_all call writes them in a single statement
+        columns = {
+            column: [row_values[column] for _, row_values in rows]
+            for column in rows[0][1]
+        }
+        try:
+            await self.database.insert_all(table, [timestamp for timestamp, _ in rows], **columns)
+            self.metrics.written_rows += len(rows)
+        except Exception as err:
+            self.logger.exception(err, True, f"Error when writing {len(rows)} {table.value} rows: {err}")
+
+    async def _periodic_flush(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                # shield: stopping this task should never interrupt a write of already un-buffered rows
+                await asyncio.shield(self.flush())
+            except Exception as err:
+                self.logger.exception(err, True, f"Error when flushing buffered rows: {err}")
@@ -18,4 +18,7 @@
 from octobot_backtesting.collectors.exchanges.exchange_collector cimport ExchangeDataCollector
 
 cdef class ExchangeLiveDataCollector(ExchangeDataCollector):
-    pass
+    cdef public object buffered_writer
+    cdef public dict received_updates
+    cdef public double last_log_time
+    cdef public long last_logged_written_rows
@@ -14,12 +14,15 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import json
 import logging
 import time
 
 import octobot_backtesting.collectors.exchanges as exchanges
+import octobot_backtesting.enums as backtesting_enums
 import octobot_commons.channels_name as channels_name
 import tentacles.Backtesting.importers.exchanges.generic_exchange_importer as generic_exchange_importer
+import tentacles.Backtesting.collectors.exchanges.exchange_live_collector.buffered_writer as buffered_writer
 
 try:
     import octobot_trading.exchange_channel as exchange_channel
@@ -30,6 +33,32 @@ except ImportError:
 
 class ExchangeLiveDataCollector(exchanges.AbstractExchangeLiveCollector):
     IMPORTER = generic_exchange_importer.GenericExchangeDataImporter
+    FLUSH_ROWS_COUNT = 500
+    FLUSH_INTERVAL = 1
+    MAX_BUFFERED_ROWS = 20000
+    LOG_INTERVAL = 60
+
+    def __init__(self, config, exchange_name, exchange_type, tentacles_setup_config, symbols, time_frames,
+                 use_all_available_timeframes=False,
+                 data_format=backtesting_enums.DataFormats.REGULAR_COLLECTOR_DATA,
+                 start_timestamp=None,
+                 end_timestamp=None):
+        super().__init__(config, exchange_name, exchange_type, tentacles_setup_config, symbols, time_frames,
+                         use_all_available_timeframes, data_format=data_format,
+                         start_timestamp=start_timestamp, end_timestamp=end_timestamp)
+        self.buffered_writer = None
+        self.received_updates = {}
+        self.last_log_time = time.time()
+        self.last_logged_written_rows = 0
+
+    async def initialize(self):
+        await super().initialize()
+        self.buffered_writer = buffered_writer.BufferedDataWriter(
+            self.database,
+            flush_rows_count=self.FLUSH_ROWS_COUNT,
+            flush_interval=self.FLUSH_INTERVAL,
+            max_buffered_rows=self.MAX_BUFFERED_ROWS
+        )
 
     async def start(self):
         exchange_manager = await trading_api.create_exchange_builder(self.config, self.exchange_name) \
@@ -45,6 +74,7 @@ class ExchangeLiveDataCollector(exchanges.AbstractExchangeLiveCollector):
 
         # create description
         await self._create_description()
+        self.buffered_writer.start()
 
         exchange_id = exchange_manager.id
         await exchange_channel.get_chan(channels_name.OctoBotTradingChannelsName.TICKER_CHANNEL.value,
@@ -60,36 +90,111 @@ class ExchangeLiveDataCollector(exchanges.AbstractExchangeLiveCollector):
 
         await asyncio.gather(*asyncio.all_tasks(asyncio.get_event_loop()))
 
+    async def stop(self, **kwargs):
+        await super().stop(**kwargs)
+        if self.buffered_writer is not None:
+            await self.buffered_writer.stop()
+        self._log_received_updates()
+
+    async def save_ticker(self, timestamp, exchange, cryptocurrency, symbol, ticker, multiple=False):
+        if multiple:
+            return await super().save_ticker(timestamp, exchange, cryptocurrency, symbol, ticker, multiple=multiple)
+        await self.buffered_writer.add(backtesting_enums.ExchangeDataTables.TICKER, timestamp,
+                                       exchange_name=exchange, cryptocurrency=cryptocurrency,
+                                       symbol=symbol, recent_trades=json.dumps(ticker))
+
+    async def save_order_book(self, timestamp, exchange, cryptocurrency, symbol, asks, bids, multiple=False):
+        if multiple:
+            return await super().save_order_book(timestamp, exchange, cryptocurrency, symbol, asks, bids,
+                                                 multiple=multiple)
+        await self.buffered_writer.add(backtesting_enums.ExchangeDataTables.ORDER_BOOK, timestamp,
+                                       exchange_name=exchange, cryptocurrency=cryptocurrency, symbol=symbol,
+                                       asks=json.dumps(asks), bids=json.dumps(bids))
+
+    async def save_recent_trades(self, timestamp, exchange, cryptocurrency, symbol, recent_trades, multiple=False):
+        if multiple:
+            return await super().save_recent_trades(timestamp, exchange, cryptocurrency, symbol, recent_trades,
+                                                    multiple=multiple)
+        await self.buffered_writer.add(backtesting_enums.ExchangeDataTables.RECENT_TRADES, timestamp,
+                                       exchange_name=exchange, cryptocurrency=cryptocurrency,
+                                       symbol=symbol, recent_trades=json.dumps(recent_trades))
+
+    async def save_ohlcv(self, timestamp, exchange, cryptocurrency, symbol, time_frame, candle, multiple=False):
+        if multiple:
+            return await super().save_ohlcv(timestamp, exchange, cryptocurrency, symbol, time_frame, candle,
+                                            multiple=multiple)
+        await self.buffered_writer.add(backtesting_enums.ExchangeDataTables.OHLCV, timestamp,
+                                       exchange_name=exchange, cryptocurrency=cryptocurrency,
+                                       symbol=symbol, time_frame=time_frame.value,
+                                       candle=json.dumps(candle))
+
+    async def save_kline(self, timestamp, exchange, cryptocurrency, symbol, time_frame, kline, multiple=False):
+        if multiple:
+            return await super().save_kline(timestamp, exchange, cryptocurrency, symbol, time_frame, kline,
+                                            multiple=multiple)
+        await self.buffered_writer.add(backtesting_enums.ExchangeDataTables.KLINE, timestamp,
+                                       exchange_name=exchange, cryptocurrency=cryptocurrency,
+                                       symbol=symbol, time_frame=time_frame.value,
+                                       candle=json.dumps(kline))
+
+    def _on_update(self, update_type, symbol):
+        key = (update_type, symbol)
+        self.received_updates[key] = self.received_updates.get(key, 0) + 1
+        if time.time() - self.last_log_time >= self.LOG_INTERVAL:
+            self._log_received_updates()
+
+    def _log_received_updates(self):
+        # log an aggregated summary instead of each update to keep logs readable
+        now = time.time()
+        elapsed = max(now - self.last_log_time, 1)
+        if self.received_updates:
+            summary = ", ".join(
+                f"{symbol} {update_type}: {count}"
+                for (update_type, symbol), count in sorted(self.received_updates.items())
+            )
+            self.logger.info(
+                f"Received {sum(self.received_updates.values())} updates in the last {round(elapsed)} "
+                f"seconds ({summary})"
+            )
+        if self.buffered_writer is not None:
+            metrics = self.buffered_writer.metrics
+            self.logger.info(
+                f"Written rows: {metrics.written_rows} "
+                f"({round((metrics.written_rows - self.last_logged_written_rows) / elapsed, 2)} rows/s), "
+                f"buffered rows: {self.buffered_writer.get_buffered_rows_count()}, "
+                f"backpressure waits: {metrics.backpressure_waits} "
+                f"({round(metrics.backpressure_wait_time, 3)}s)"
+            )
+            self.last_logged_written_rows = metrics.written_rows
+        self.received_updates = {}
+        self.last_log_time = now
+
     async def ticker_callback(self, exchange: str, exchange_id: str,
                               cryptocurrency: str, symbol: str, ticker):
-        self.logger.info(f"TICKER : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} || TICKER = {ticker}")
+        self._on_update("ticker", symbol)
         await self.save_ticker(timestamp=time.time(), exchange=exchange,
                                cryptocurrency=cryptocurrency, symbol=symbol, ticker=ticker)
 
     async def order_book_callback(self, exchange: str, exchange_id: str,
                                   cryptocurrency: str, symbol: str, asks, bids):
-        self.logger.info(f"ORDERBOOK : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} "
-                         f"|| ASKS = {asks} || BIDS = {bids}")
+        self._on_update("order book", symbol)
         await self.save_order_book(timestamp=time.time(), exchange=exchange,
                                    cryptocurrency=cryptocurrency, symbol=symbol, asks=asks, bids=bids)
 
     async def recent_trades_callback(self, exchange: str, exchange_id: str,
                                      cryptocurrency: str, symbol: str, recent_trades):
-        self.logger.info(f"RECENT TRADE : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} "
-                         f"|| RECENT TRADE = {recent_trades}")
+        self._on_update("recent trades", symbol)
         await self.save_recent_trades(timestamp=time.time(), exchange=exchange,
                                       cryptocurrency=cryptocurrency, symbol=symbol, recent_trades=recent_trades)
 
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle):
-        self.logger.info(f"OHLCV : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} "
-                         f"|| TIME FRAME = {time_frame} || CANDLE = {candle}")
+        self._on_update(f"{time_frame.value} ohlcv", symbol)
         await self.save_ohlcv(timestamp=time.time(), exchange=exchange,
                               cryptocurrency=cryptocurrency, symbol=symbol, time_frame=time_frame, candle=candle)
 
     async def kline_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, kline):
-        self.logger.info(f"KLINE : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} "
-                         f"|| TIME FRAME = {time_frame} || KLINE = {kline}")
+        self._on_update(f"{time_frame.value} kline", symbol)
         await self.save_kline(timestamp=time.time(), exchange=exchange,
                               cryptocurrency=cryptocurrency, symbol=symbol, time_frame=time_frame, kline=kline)
@@ -0,0 +1,122 @@
+#  Drakkar-Software OctoBot
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import json
+import os
+import time
+
+import pytest
+
+import octobot_commons.databases as databases
+import octobot_backtesting.enums as enums
+import tentacles.Backtesting.collectors.exchanges.exchange_live_collector.buffered_writer as buffered_writer
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+DB_FILE = "test_buffered_writer.db"
+
+
+@contextlib.asynccontextmanager
+async def database():
+    if os.path.isfile(DB_FILE):
+        os.remove(DB_FILE)
+    db = databases.SQLiteDatabase(DB_FILE)
+    try:
+        await db.initialize()
+        yield db
+    finally:
+        await db.stop()
+        if os.path.isfile(DB_FILE):
+            os.remove(DB_FILE)
+
+
+async def _add_ticker(writer, symbol, index):
+    await writer.add(enums.ExchangeDataTables.TICKER, time.time(),
+                     exchange_name="binance", cryptocurrency=symbol.split("/")[0],
+                     symbol=symbol, recent_trades=json.dumps({"close": index}))
+
+
+async def test_flush_on_rows_count():
+    async with database() as db:
+        writer = buffered_writer.BufferedDataWriter(db, flush_rows_count=10, flush_interval=1000)
+        for i in range(9):
+            await _add_ticker(writer, "BTC/USDT", i)
+        assert writer.get_buffered_rows_count() == 9
+        assert writer.metrics.written_rows == 0
+        await _add_ticker(writer, "BTC/USDT", 9)
+        assert writer.get_buffered_rows_count() == 0
+        assert writer.metrics.written_rows == 10
+        assert writer.metrics.flushes == 1
+        assert len(await db.select(enums.ExchangeDataTables.TICKER)) == 10
+
+
+async def test_flush_on_interval_and_stop():
+    async with database() as db:
+        writer = buffered_writer.BufferedDataWriter(db, flush_rows_count=1000, flush_interval=0.05)
+        writer.start()
+        await _add_ticker(writer, "BTC/USDT", 1)
+        await writer.add(enums.ExchangeDataTables.ORDER_BOOK, time.time(),
+                         exchange_name="binance", cryptocurrency="ETH", symbol="ETH/USDT",
+                         asks=json.dumps([[1, 2]]), bids=json.dumps([[0.5, 3]]))
+        await asyncio.sleep(0.2)
+        assert writer.metrics.written_rows == 2
+        assert len(await db.select(enums.ExchangeDataTables.TICKER)) == 1
+        order_books = await db.select(enums.ExchangeDataTables.ORDER_BOOK)
+        assert len(order_books) == 1
+        assert json.loads(order_books[0][-2]) == [[1, 2]]
+        await _add_ticker(writer, "BTC/USDT", 2)
+        await writer.stop()
+        assert writer.get_buffered_rows_count() == 0
+        assert len(await db.select(enums.ExchangeDataTables.TICKER)) == 2
+
+
+async def test_bounded_buffer():
+    async with database() as db:
+        writer = buffered_writer.BufferedDataWriter(db, flush_rows_count=100, flush_interval=1000,
+                                                    max_buffered_rows=100)
+        for i in range(1000):
+            await _add_ticker(writer, "BTC/USDT", i)
+            assert writer.get_buffered_rows_count() <= 100
+        await writer.stop()
+        assert writer.metrics.max_buffered_rows <= 100
+        assert writer.metrics.received_rows == writer.metrics.written_rows == 1000
+
+
+async def test_high_rate_feed_throughput():
+    symbols = [f"C{i}/USDT" for i in range(50)]
+    updates_per_symbol = 200
+    async with database() as db:
+        writer = buffered_writer.BufferedDataWriter(db, flush_rows_count=500, flush_interval=0.1,
+                                                    max_buffered_rows=2000)
+        writer.start()
+
+        async def feed(symbol):
+            for i in range(updates_per_symbol):
+                await _add_ticker(writer, symbol, i)
+                if i % 10 == 0:
+                    # let other feeds and the periodic flush run
+                    await asyncio.sleep(0)
+
+        await asyncio.gather(*(feed(symbol) for symbol in symbols))
+        await writer.stop()
+        total_rows = len(symbols) * updates_per_symbol
+        assert writer.metrics.written_rows == total_rows
+        assert len(await db.select(enums.ExchangeDataTables.TICKER)) == total_rows
+        assert writer.metrics.max_buffered_rows <= 2000
+        # rows are committed in batches instead of one commit per row
+        assert writer.metrics.flushes <= total_rows // 100
@@ -15,7 +15,6 @@
 #  License along with this library.
 import octobot_commons.constants as commons_constants
 import octobot_commons.enums as commons_enums
-import octobot_commons.tentacles_management as tentacles_management
 import octobot_evaluators.evaluators as evaluators
 import octobot_services.constants as services_constants
 import tentacles.Services.Services_feeds as Services_feeds
@@ -109,9 +108,14 @@ class RedditForumEvaluator(evaluators.SocialEvaluator):
         reddit_entry_min_length = 50
         # ignore usless (very short) entries
         if entry.selftext and len(entry.selftext) >= reddit_entry_min_length:
-            return -1 * self.sentiment_analyser.analyse(entry.selftext)
+            # shared analysis: the same entry is received by every interested cryptocurrency evaluator
+            return -1 * self.sentiment_analyser.analyse(entry.selftext, key=getattr(entry, "id", None))
         return commons_constants.START_PENDING_EVAL_NOTE
 
+    def get_feed_routing_keys(self):
+        # only receive entries from this cryptocurrency's subreddits
+        return self.subreddits_by_cryptocurrency.get(self.cryptocurrency_name, [])
+
     def _is_interested_by_this_notification(self, notification_description):
         # true if the given subreddit is in this cryptocurrency's subreddits configuration
         try:
@@ -132,4 +136,4 @@ class RedditForumEvaluator(evaluators.SocialEvaluator):
         return {}
 
     async def prepare(self):
-        self.sentiment_analyser = tentacles_management.get_single_deepest_child_class(EvaluatorUtil.TextAnalysis)()
+        self.sentiment_analyser = EvaluatorUtil.SentimentService.instance()
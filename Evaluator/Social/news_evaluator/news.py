@@ -17,10 +17,9 @@
 import octobot_commons.constants as commons_constants
 import octobot_commons.enums as commons_enums
 
-import octobot_commons.tentacles_management as tentacles_management
 import octobot_services.constants as services_constants
 import octobot_evaluators.evaluators as evaluators
-from tentacles.Evaluator.Util.text_analysis import TextAnalysis
+from tentacles.Evaluator.Util.text_analysis import SentimentService
 import tentacles.Services.Services_feeds as Services_feeds
 
 
@@ -108,7 +107,8 @@ class TwitterNewsEvaluator:
         if self._is_interested_by_this_notification(data[services_constants.CONFIG_TWEET_DESCRIPTION]):
             self.count += 1
             note = self._get_tweet_sentiment(data[services_constants.CONFIG_TWEET],
-                                             data[services_constants.CONFIG_TWEET_DESCRIPTION])
+                                             data[services_constants.CONFIG_TWEET_DESCRIPTION],
+                                             tweet_id=data[services_constants.CONFIG_TWEET].get("id"))
             tweet_url = f"https://twitter.com/ProducToken/status/{data['tweet']['id']}"
             if note != commons_constants.START_PENDING_EVAL_NOTE:
                 self._print_tweet(data[services_constants.CONFIG_TWEET_DESCRIPTION], tweet_url, note, str(self.count))
@@ -126,10 +126,10 @@ class TwitterNewsEvaluator:
     def _compute_notification_time_to_live(evaluation):
         return TwitterNewsEvaluator._EVAL_MAX_TIME_TO_LIVE * abs(evaluation)
 
-    def _get_tweet_sentiment(self, tweet, tweet_text, is_a_quote=False):
+    def _get_tweet_sentiment(self, tweet, tweet_text, is_a_quote=False, tweet_id=None):
         try:
             if is_a_quote:
-                return -1 * self.sentiment_analyser.analyse(tweet_text)
+                return -1 * self.sentiment_analyser.analyse(tweet_text, key=tweet_id)
             else:
                 padding_name = "########"
                 author_screen_name = tweet['user']['screen_name'] if "screen_name" in tweet['user'] \
@@ -137,7 +137,7 @@ class TwitterNewsEvaluator:
                 author_name = tweet['user']['name'] if "name" in tweet['user'] else padding_name
                 if author_screen_name in self.accounts_by_cryptocurrency[self.cryptocurrency_name] \
                         or author_name in self.accounts_by_cryptocurrency[self.cryptocurrency_name]:
-                    return -1 * self.sentiment_analyser.analyse(tweet_text)
+                    return -1 * self.sentiment_analyser.analyse(tweet_text, key=tweet_id)
         except KeyError:
             pass
 
@@ -177,4 +177,4 @@ class TwitterNewsEvaluator:
         return {}
 
     async def prepare(self):
-        self.sentiment_analyser = tentacles_management.get_single_deepest_child_class(TextAnalysis)()
+        self.sentiment_analyser = SentimentService.instance()
@@ -41,6 +41,10 @@ class TelegramSignalEvaluator(evaluators.SocialEvaluator):
             self.logger.debug(f"Ignored telegram feed: \"{self.symbol.lower()}\" pattern not found in "
                               f"\"{data[services_constants.CONFIG_GROUP_MESSAGE_DESCRIPTION].lower()}\"")
 
+    def get_feed_routing_keys(self):
+        # only receive messages containing this symbol
+        return [self.symbol] if self.symbol else None
+
     # return true if the given notification is relevant for this client
     def _is_interested_by_this_notification(self, notification_description):
         if self.symbol:
@@ -171,6 +175,10 @@ class TelegramChannelSignalEvaluator(evaluators.SocialEvaluator):
                 title="Market sell signal regex, ex: Side: (SELL)$"),
         }
 
+    def get_feed_routing_keys(self):
+        # only receive messages from the watched channels
+        return list(self.channels_config_by_channel_name)
+
     async def _feed_callback(self, data):
         if not data:
             return
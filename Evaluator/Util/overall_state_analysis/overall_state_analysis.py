@@ -14,21 +14,47 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 
-import numpy
+import collections
+import time
 
 import octobot_commons.constants as commons_constants
 
 
 class OverallStateAnalyser:
-    def __init__(self):
+    """
+    Weighted average of evaluations computed using running sums: adding an evaluation is O(1).
+    :param max_evaluations: when set, only the last max_evaluations evaluations are taken into account
+    :param decay_half_life: when set, evaluations weights are halved every decay_half_life seconds
+    Without max_evaluations, evaluations are not stored.
+    """
+    # recompute running sums from stored evaluations after this many removed evaluations to avoid float drift
+    RUNNING_SUMS_RESET_INTERVAL = 10000
+
+    def __init__(self, max_evaluations=None, decay_half_life=None):
         self.overall_state = commons_constants.START_PENDING_EVAL_NOTE
         self.evaluation_count = 0
-        self.evaluations = []
+        self.max_evaluations = max_evaluations
+        self.decay_half_life = decay_half_life
+        self.evaluations = collections.deque(maxlen=max_evaluations) if max_evaluations else None
+        self.weighted_sum = 0
+        self.total_weight = 0
+        self.last_evaluation_time = None
+        self._removed_evaluations_count = 0
 
     # evaluation: number between -1 and 1
     # weight: integer between 0 (not even taken into account) and X
-    def add_evaluation(self, evaluation, weight, refresh_overall_state=True):
-        self.evaluations.append(StateEvaluation(evaluation, weight))
+    # evaluation_time: time of the evaluation, used for decay only, defaults to now
+    def add_evaluation(self, evaluation, weight, refresh_overall_state=True, evaluation_time=None):
+        if self.decay_half_life:
+            evaluation_time = time.time() if evaluation_time is None else evaluation_time
+            self._apply_decay(evaluation_time)
+        if self.evaluations is not None:
+            if len(self.evaluations) == self.max_evaluations:
+                self._remove_evaluation(self.evaluations[0])
+            self.evaluations.append(StateEvaluation(evaluation, weight, evaluation_time))
+        self.weighted_sum += evaluation * weight
+        self.total_weight += weight
+        self.evaluation_count += 1
         if refresh_overall_state:
             self._refresh_overall_state()
 
@@ -37,15 +63,45 @@ class OverallStateAnalyser:
             self._refresh_overall_state()
         return self.overall_state
 
-    # computes self.overall_state using self.evaluations values and weights
+    # computes self.overall_state using running sums
     def _refresh_overall_state(self):
-        if self.evaluations:
-            self.overall_state = numpy.mean(
-                [evaluation.value for evaluation in self.evaluations for _ in range(evaluation.weight)]
-            )
+        if self.total_weight > 0:
+            self.overall_state = self.weighted_sum / self.total_weight
+
+    def _apply_decay(self, evaluation_time):
+        if self.last_evaluation_time is not None and evaluation_time > self.last_evaluation_time:
+            decay = self._get_decay(evaluation_time, self.last_evaluation_time)
+            self.weighted_sum *= decay
+            self.total_weight *= decay
+        if self.last_evaluation_time is None or evaluation_time > self.last_evaluation_time:
+            self.last_evaluation_time = evaluation_time
+
+    def _get_decay(self, current_time, evaluation_time):
+        return 0.5 ** ((current_time - evaluation_time) / self.decay_half_life)
+
+    def _get_current_weight(self, state_evaluation):
+        if self.decay_half_life:
+            return state_evaluation.weight * self._get_decay(self.last_evaluation_time, state_evaluation.time)
+        return state_evaluation.weight
+
+    def _remove_evaluation(self, state_evaluation):
+        self._removed_evaluations_count += 1
+        if self._removed_evaluations_count % self.RUNNING_SUMS_RESET_INTERVAL == 0:
+            # recompute from remaining evaluations
+            self.evaluations.popleft()
+            self.weighted_sum = self.total_weight = 0
+            for remaining_evaluation in self.evaluations:
+                weight = self._get_current_weight(remaining_evaluation)
+                self.weighted_sum += remaining_evaluation.value * weight
+                self.total_weight += weight
+        else:
+            weight = self._get_current_weight(state_evaluation)
+            self.weighted_sum -= state_evaluation.value * weight
+            self.total_weight -= weight
 
 
 class StateEvaluation:
-    def __init__(self, value, weight):
+    def __init__(self, value, weight, evaluation_time=None):
         self.value = value
         self.weight = weight
+        self.time = evaluation_time
@@ -0,0 +1,113 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import gc
+import random
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import octobot_commons.constants as commons_constants
+from tentacles.Evaluator.Util import OverallStateAnalyser
+
+
+def _expanded_mean(evaluations):
+    # previous implementation
+    return np.mean([value for value, weight in evaluations for _ in range(weight)])
+
+
+def test_unbounded_mode_matches_expanded_weights_mean():
+    analyser = OverallStateAnalyser()
+    assert analyser.get_overall_state_after_refresh() == commons_constants.START_PENDING_EVAL_NOTE
+    rng = random.Random(1)
+    evaluations = []
+    for i in range(2000):
+        evaluation = (rng.uniform(-1, 1), rng.randint(0, 10))
+        evaluations.append(evaluation)
+        analyser.add_evaluation(*evaluation, refresh_overall_state=i % 3 == 0)
+        if i % 100 == 0:
+            assert analyser.get_overall_state_after_refresh() == pytest.approx(_expanded_mean(evaluations))
+    assert analyser.get_overall_state_after_refresh() == pytest.approx(_expanded_mean(evaluations))
+    assert analyser.evaluation_count == 2000
+    # nothing is stored
+    assert analyser.evaluations is None
+
+
+def test_zero_weight_evaluations():
+    analyser = OverallStateAnalyser()
+    analyser.add_evaluation(0.5, 0)
+    assert analyser.get_overall_state_after_refresh() == commons_constants.START_PENDING_EVAL_NOTE
+    analyser.add_evaluation(0.5, 2)
+    analyser.add_evaluation(-1, 0)
+    assert analyser.get_overall_state_after_refresh() == 0.5
+
+
+def test_window_mode():
+    analyser = OverallStateAnalyser(max_evaluations=50)
+    rng = random.Random(2)
+    evaluations = []
+    for _ in range(OverallStateAnalyser.RUNNING_SUMS_RESET_INTERVAL + 500):
+        evaluation = (rng.uniform(-1, 1), rng.randint(1, 10))
+        evaluations.append(evaluation)
+        analyser.add_evaluation(*evaluation)
+        assert analyser.overall_state == pytest.approx(_expanded_mean(evaluations[-50:]))
+    assert len(analyser.evaluations) == 50
+
+
+def test_decay_mode():
+    analyser = OverallStateAnalyser(decay_half_life=10)
+    analyser.add_evaluation(1, 1, evaluation_time=0)
+    assert analyser.overall_state == 1
+    analyser.add_evaluation(-1, 1, evaluation_time=10)
+    # weight of the first evaluation is halved: (0.5 - 1) / 1.5
+    assert analyser.overall_state == pytest.approx(-1 / 3)
+    analyser.add_evaluation(-1, 1, evaluation_time=1000)
+    assert analyser.overall_state == pytest.approx(-1)
+    assert analyser.evaluations is None
+
+
+def test_window_and_decay_mode():
+    analyser = OverallStateAnalyser(max_evaluations=2, decay_half_life=10)
+    analyser.add_evaluation(1, 1, evaluation_time=0)
+    analyser.add_evaluation(0, 1, evaluation_time=10)
+    analyser.add_evaluation(-1, 2, evaluation_time=20)
+    # first evaluation is out of the window: (0 * 0.5 - 1 * 2) / (0.5 + 2)
+    assert analyser.overall_state == pytest.approx(-2 / 2.5)
+
+
+@pytest.mark.parametrize("analyser_kwargs", [{}, {"max_evaluations": 1000}, {"decay_half_life": 3600}])
+def test_long_run_memory(analyser_kwargs):
+    analyser = OverallStateAnalyser(**analyser_kwargs)
+    rng = random.Random(3)
+    chunk_size = 20000
+    memories = []
+    tracemalloc.start()
+    try:
+        for chunk in range(5):
+            for i in range(chunk_size):
+                analyser.add_evaluation(rng.uniform(-1, 1), rng.randint(0, 10), False,
+                                        evaluation_time=chunk * chunk_size + i)
+                analyser.get_overall_state_after_refresh()
+            gc.collect()
+            memories.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+    # stored evaluations are bounded by the window
+    assert analyser.evaluation_count == 5 * chunk_size
+    if analyser.evaluations is not None:
+        assert len(analyser.evaluations) == analyser_kwargs["max_evaluations"]
+    # flat memory
+    assert memories[-1] - memories[1] < 10000
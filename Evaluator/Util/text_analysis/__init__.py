@@ -1 +1,2 @@
-from .text_analysis import TextAnalysis
\ No newline at end of file
+from .text_analysis import TextAnalysis
+from .sentiment_service import SentimentService
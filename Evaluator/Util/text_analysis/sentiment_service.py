@@ -0,0 +1,122 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import collections
+import hashlib
+import threading
+
+import octobot_commons.singleton as singleton
+import octobot_commons.tentacles_management as tentacles_management
+
+import tentacles.Evaluator.Util.text_analysis.text_analysis as text_analysis
+
+
+class SentimentService(singleton.Singleton):
+    """
+    Process-wide sentiment analysis: every social evaluator shares the same TextAnalysis (and its lexicon)
+    and the scores of already analysed texts.
+    Scores are cached in a bounded LRU keyed by the given entry key (ex: a tweet or submission id)
+    or by the hash of the analysed text.
+    """
+    MAX_CACHED_SCORES = 10000
+
+    def __init__(self):
+        self.max_cached_scores = self.MAX_CACHED_SCORES
+        self.hits = 0
+        self.misses = 0
+        self._text_analysis = None
+        self._scores = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_text_analysis(self):
+        if self._text_analysis is None:
+            self._text_analysis = tentacles_management.get_single_deepest_child_class(text_analysis.TextAnalysis)()
+        return self._text_analysis
+
+    def analyse(self, text, key=None):
+        """
+        :param text: the text to analyse
+        :param key: the unique identifier of the analysed entry, the text hash is used when None
+        :return: the compound sentiment score of the text
+        """
+        key = self._get_key(text, key)
+        with self._lock:
+            try:
+                score = self._scores[key]
+                self._scores.move_to_end(key)
+                self.hits += 1
+                return score
+            except KeyError:
+                self.misses += 1
+        score = self.get_text_analysis().analyse(text)
+        with self._lock:
+            self._add_score(key, score)
+        return score
+
+    def analyse_all(self, texts, keys=None):
+        """
+        Analyse a burst of texts: each distinct text is analysed once
+        :param texts: the texts to analyse
+        :param keys: the unique identifiers of the analysed entries, texts hashes are used when None
+        :return: the compound sentiment scores of the texts, in the same order
+        """
+        keys = [
+            self._get_key(text, key)
+            for text, key in zip(texts, keys or [None] * len(texts))
+        ]
+        scores = {}
+        to_analyse = {}
+        with self._lock:
+            for text, key in zip(texts, keys):
+                if key in scores or key in to_analyse:
+                    self.hits += 1
+                elif key in self._scores:
+                    self._scores.move_to_end(key)
+                    scores[key] = self._scores[key]
+                    self.hits += 1
+                else:
+                    to_analyse[key] = text
+                    self.misses += 1
+        if to_analyse:
+            text_analysis_instance = self.get_text_analysis()
+            analysed_scores = {
+                key: text_analysis_instance.analyse(text)
+                for key, text in to_analyse.items()
+            }
+            with self._lock:
+                for key, score in analysed_scores.items():
+                    self._add_score(key, score)
+            scores.update(analysed_scores)
+        return [scores[key] for key in keys]
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+            self.hits = self.misses = 0
+
+    def get_cached_scores_count(self):
+        return len(self._scores)
+
+    def _add_score(self, key, score):
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.max_cached_scores:
+            self._scores.popitem(last=False)
+
+    @staticmethod
+    def _get_key(text, key):
+        if key is None:
+            return hashlib.blake2b(text.encode("utf-8", "ignore"), digest_size=16).digest()
+        return key
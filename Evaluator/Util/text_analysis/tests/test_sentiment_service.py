@@ -0,0 +1,117 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import gc
+import tracemalloc
+
+import pytest
+
+import octobot_commons.singleton as singleton
+from tentacles.Evaluator.Util.text_analysis import TextAnalysis, SentimentService
+
+TEXTS = [
+    "Goldman Sachs hires crypto trader as head of digital assets markets",
+    "Big news coming! Scheduled to be 27th/28th April... Have a guess...",
+    "Net Neutrality Ends! Substratum Update 4.23.18",
+    "The European Parliament has voted for regulations to prevent the use of cryptocurrencies in money "
+    "laundering and terrorism financing. As long as they have good intention i don' t care.. but how "
+    "much can we trust them??!?!",
+]
+
+
+@pytest.fixture
+def sentiment_service():
+    singleton.Singleton._instances.pop(SentimentService, None)
+    yield SentimentService.instance()
+    singleton.Singleton._instances.pop(SentimentService, None)
+
+
+def test_analyse(sentiment_service):
+    text_analysis = TextAnalysis()
+    assert SentimentService.instance() is sentiment_service
+    for text in TEXTS:
+        assert sentiment_service.analyse(text) == text_analysis.analyse(text)
+    assert sentiment_service.misses == len(TEXTS)
+    for text in TEXTS:
+        assert sentiment_service.analyse(text) == text_analysis.analyse(text)
+    assert sentiment_service.hits == len(TEXTS)
+    # entry key is used instead of the text
+    assert sentiment_service.analyse(TEXTS[1], key="id1") == text_analysis.analyse(TEXTS[1])
+    assert sentiment_service.analyse("other text", key="id1") == text_analysis.analyse(TEXTS[1])
+    assert sentiment_service.get_cached_scores_count() == len(TEXTS) + 1
+
+
+def test_analyse_all(sentiment_service):
+    text_analysis = TextAnalysis()
+    sentiment_service.analyse(TEXTS[0])
+    assert sentiment_service.analyse_all(TEXTS + TEXTS) == [text_analysis.analyse(text) for text in TEXTS + TEXTS]
+    assert sentiment_service.misses == len(TEXTS)
+    assert sentiment_service.hits == len(TEXTS) + 1
+    assert sentiment_service.analyse_all(TEXTS[:2], keys=["a", "b"]) == \
+           [text_analysis.analyse(text) for text in TEXTS[:2]]
+    assert sentiment_service.analyse_all([]) == []
+
+
+def test_bounded_cache(sentiment_service):
+    sentiment_service.max_cached_scores = 2
+    sentiment_service.analyse(TEXTS[0])
+    sentiment_service.analyse(TEXTS[1])
+    # refresh TEXTS[0]
+    sentiment_service.analyse(TEXTS[0])
+    sentiment_service.analyse(TEXTS[2])
+    assert sentiment_service.get_cached_scores_count() == 2
+    sentiment_service.clear()
+    sentiment_service.analyse(TEXTS[0])
+    sentiment_service.analyse(TEXTS[1])
+    sentiment_service.analyse(TEXTS[0])
+    sentiment_service.analyse(TEXTS[2])
+    misses = sentiment_service.misses
+    # TEXTS[0] was recently used and is still cached, TEXTS[1] was evicted
+    sentiment_service.analyse(TEXTS[0])
+    assert sentiment_service.misses == misses
+    sentiment_service.analyse(TEXTS[1])
+    assert sentiment_service.misses == misses + 1
+
+
+def test_replay_with_many_evaluators(sentiment_service):
+    evaluators_count = 40
+    # each entry is received by every evaluator
+    entries = [(f"id{i}", f"{TEXTS[i % len(TEXTS)]} {i}") for i in range(100)]
+
+    def _replay(analysers):
+        return [
+            analyser.analyse(text, key=entry_id) if isinstance(analyser, SentimentService) else analyser.analyse(text)
+            for entry_id, text in entries
+            for analyser in analysers
+        ]
+
+    tracemalloc.start()
+    try:
+        gc.collect()
+        origin = tracemalloc.get_traced_memory()[0]
+        text_analyses = [TextAnalysis() for _ in range(evaluators_count)]
+        text_analyses_memory = tracemalloc.get_traced_memory()[0] - origin
+        origin = tracemalloc.get_traced_memory()[0]
+        sentiment_service.get_text_analysis()
+        service_memory = tracemalloc.get_traced_memory()[0] - origin
+    finally:
+        tracemalloc.stop()
+    text_analyses_scores = _replay(text_analyses)
+    service_scores = _replay([sentiment_service] * evaluators_count)
+    assert service_scores == text_analyses_scores
+    # each entry is analysed once, other evaluators get the cached score
+    assert sentiment_service.misses == len(entries)
+    assert sentiment_service.hits == len(entries) * (evaluators_count - 1)
+    assert service_memory < text_analyses_memory / 10
@@ -15,6 +15,7 @@
 #  License along with this library.
 
 from .metadata import *
+from .portfolio_replay import *
 from .run_data_analysis import *
 from .backtesting_data_selector import *
 from .backtesting_settings import *
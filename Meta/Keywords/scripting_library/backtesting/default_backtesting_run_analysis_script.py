@@ -10,19 +10,22 @@ import octobot_trading.modes.script_keywords as script_keywords
 
 async def default_backtesting_analysis_script(ctx: script_keywords.Context):
     async with ctx.backtesting_results() as (run_data, run_display):
-        historical_values = await run_data_analysis.load_historical_values(run_data, None)
+        analysis_context = run_data_analysis.RunAnalysisContext(run_data)
+        # load run data once for every plot
+        await analysis_context.load()
+        historical_values = await analysis_context.get_historical_values()
         if ctx.backtesting_analysis_settings["plot_pnl_on_main_chart"]:
             with run_display.part("main-chart") as part:
                 try:
                     await run_data_analysis.plot_historical_portfolio_value(
                         run_data, part,
-                        historical_values=historical_values,
+                        analysis_context=analysis_context,
                     )
                     await run_data_analysis.plot_historical_pnl_value(
                         run_data, part, x_as_trade_count=False,
                         own_yaxis=True,
                         include_unitary=ctx.backtesting_analysis_settings["plot_trade_gains_on_main_chart"],
-                        historical_values=historical_values,
+                        analysis_context=analysis_context,
                     )
                 except Exception as err:
                     ctx.logger.exception(err, True, f"Error when computing main chant graphs {err}")
@@ -31,33 +34,34 @@ async def default_backtesting_analysis_script(ctx: script_keywords.Context):
                 if ctx.backtesting_analysis_settings.get("plot_hist_portfolio_on_backtesting_chart", True):
                     await run_data_analysis.plot_historical_portfolio_value(
                         run_data, part,
-                        historical_values=historical_values,
+                        analysis_context=analysis_context,
                     )
                 if ctx.backtesting_analysis_settings["plot_pnl_on_backtesting_chart"]:
                     await run_data_analysis.plot_historical_pnl_value(
                         run_data, part, x_as_trade_count=False,
                         own_yaxis=True,
                         include_unitary=ctx.backtesting_analysis_settings["plot_trade_gains_on_backtesting_chart"],
-                        historical_values=historical_values,
+                        analysis_context=analysis_context,
                     )
                 if ctx.backtesting_analysis_settings["plot_best_case_growth_on_backtesting_chart"]:
                     await run_data_analysis.plot_best_case_growth(
                         run_data, part, x_as_trade_count=True, own_yaxis=False,
-                        historical_values=historical_values,
+                        analysis_context=analysis_context,
                     )
                 if ctx.backtesting_analysis_settings["plot_funding_fees_on_backtesting_chart"]:
                     await run_data_analysis.plot_historical_funding_fees(
                         run_data, part, own_yaxis=True,
+                        analysis_context=analysis_context,
                     )
                 if ctx.backtesting_analysis_settings["plot_wins_and_losses_count_on_backtesting_chart"]:
                     await run_data_analysis.plot_historical_wins_and_losses(
                         run_data, part, own_yaxis=True, x_as_trade_count=False,
-                        historical_values=historical_values,
+                        analysis_context=analysis_context,
                     )
                 if ctx.backtesting_analysis_settings["plot_win_rate_on_backtesting_chart"]:
                     await run_data_analysis.plot_historical_win_rates(
                         run_data, part, own_yaxis=True, x_as_trade_count=False,
-                        historical_values=historical_values,
+                        analysis_context=analysis_context,
                     )
                 # await plot_withdrawals(run_data, part)
             except Exception as err:
@@ -66,7 +70,7 @@ async def default_backtesting_analysis_script(ctx: script_keywords.Context):
             with run_display.part("backtesting-details", "value") as part:
                 try:
                     backtesting_report = await get_backtesting_report_template(
-                        run_data, ctx.backtesting_analysis_settings, historical_values
+                        run_data, ctx.backtesting_analysis_settings, historical_values, analysis_context
                     )
                     await run_data_analysis.display_html(part, backtesting_report)
                 except Exception as err:
@@ -74,16 +78,17 @@ async def default_backtesting_analysis_script(ctx: script_keywords.Context):
         if ctx.backtesting_analysis_settings["display_trades_and_positions"]:
             with run_display.part("list-of-trades-part", "table") as part:
                 try:
-                    await run_data_analysis.plot_trades(run_data, part, historical_values=historical_values)
-                    await run_data_analysis.plot_orders(run_data, part, historical_values=historical_values)
-                    await run_data_analysis.plot_positions(run_data, part)
+                    await run_data_analysis.plot_trades(run_data, part, analysis_context=analysis_context)
+                    await run_data_analysis.plot_orders(run_data, part, analysis_context=analysis_context)
+                    await run_data_analysis.plot_positions(run_data, part, analysis_context=analysis_context)
                     # await plot_table(run_data, part, "SMA 1")  # plot any cache key as a table
                 except Exception as err:
                     ctx.logger.exception(err, True, f"Error when computing trades part {err}")
     return run_display
 
 
-async def get_backtesting_report_template(run_data, backtesting_analysis_settings, historical_values):
+async def get_backtesting_report_template(run_data, backtesting_analysis_settings, historical_values,
+                                          analysis_context=None):
     price_data, _, _, _, _, metadata = historical_values
     optimizer_id_display = get_column_display(commons_enums.BacktestingMetadata.OPTIMIZER_ID.value,
                                               commons_enums.BacktestingMetadata.OPTIMIZER_ID.value) \
@@ -93,7 +98,9 @@ async def get_backtesting_report_template(run_data, backtesting_analysis_setting
     performance_summary = ""
     reference_market = metadata[commons_enums.DBRows.REFERENCE_MARKET.value]
     if backtesting_analysis_settings.get("display_backtest_details_performances", True):
-        start_portfolio_value, end_portfolio_value = await run_data_analysis.get_portfolio_values(run_data)
+        start_portfolio_value, end_portfolio_value = await run_data_analysis.get_portfolio_values(
+            run_data, analysis_context=analysis_context
+        )
         gains = f"{pretty_printer.get_min_string_from_number(metadata[commons_enums.BacktestingMetadata.GAINS.value])} " \
                 f"({pretty_printer.get_min_string_from_number(metadata[commons_enums.BacktestingMetadata.PERCENT_GAINS.value])}%)"
         performance_summary \
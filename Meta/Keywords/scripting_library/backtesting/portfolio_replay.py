@@ -0,0 +1,191 @@
+#  Drakkar-Software OctoBot-Trading
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import numpy
+
+import octobot_trading.enums as trading_enums
+import octobot_commons.symbols.symbol_util as symbol_util
+import octobot_commons.enums as commons_enums
+
+
+_TIME = commons_enums.PriceIndexes.IND_PRICE_TIME.value
+_OPEN = commons_enums.PriceIndexes.IND_PRICE_OPEN.value
+# holdings updates are applied in this order within a candle (same order as a sequential replay)
+_TRADE_UPDATE = 0
+_FUNDING_FEE_UPDATE = 1
+
+
+class PortfolioReplay:
+    """
+    Replays trades and funding fees on the candles of the first traded pair to compute the historical portfolio
+    value. Candles and trades are aligned on a common time index and holdings are computed using cumulative sums.
+    Each trade is applied on the first candle of its pair starting at or after the trade time.
+    Funding fees are applied on the candle of their pair at the funding fee time.
+    The portfolio value is the sum, on each time, of the currencies holdings valued using the open price of the
+    first (in trades_data order) pair they are the base of, ref market holdings are added as is.
+    """
+    def __init__(self, price_data, trades_data, funding_fees_history_by_pair, portfolio):
+        self.pairs = list(trades_data)
+        self.base_and_quote_by_pair = {
+            pair: symbol_util.parse_symbol(pair).base_and_quote()
+            for pair in self.pairs
+        }
+        self.initial_holdings = portfolio
+        self.times = numpy.array([], dtype=numpy.float64)
+        self.open_prices_by_pair = {}
+        self.active_by_pair = {}
+        self._updates_by_currency = {}
+        if self.pairs:
+            self._align_candles(price_data)
+            for pair_index, pair in enumerate(self.pairs):
+                self._add_trades_updates(pair_index, pair, trades_data[pair])
+                self._add_funding_fees_updates(pair_index, pair, funding_fees_history_by_pair.get(pair, []))
+
+    def get_portfolio_values(self):
+        """
+        :return: the times and associated portfolio values
+        """
+        values = numpy.zeros(len(self.times), dtype=numpy.float64)
+        if not self.pairs:
+            return [], []
+        holdings_by_currency = {}
+        handled_by_currency = {}
+        for pair in self.pairs:
+            symbol, ref_market = self.base_and_quote_by_pair[pair]
+            active = self.active_by_pair[pair]
+            for currency, is_base in ((symbol, True), (ref_market, False)):
+                handled = handled_by_currency.get(currency, None)
+                added = active if handled is None else active & ~handled
+                if added.any():
+                    if currency not in holdings_by_currency:
+                        holdings_by_currency[currency] = self._get_holdings(currency)
+                    holdings = holdings_by_currency[currency]
+                    added_value = holdings * self.open_prices_by_pair[pair] if is_base else holdings
+                    values = values + numpy.where(added, added_value, 0)
+                handled_by_currency[currency] = active if handled is None else handled | active
+        return self.times.tolist(), values.tolist()
+
+    def _align_candles(self, price_data):
+        self.times = self._get_candles_times_and_open_prices(price_data[self.pairs[0]])[0]
+        for pair in self.pairs:
+            pair_times, pair_open_prices = self._get_candles_times_and_open_prices(price_data.get(pair, []))
+            positions = numpy.searchsorted(pair_times, self.times)
+            clipped_positions = numpy.minimum(positions, max(len(pair_times) - 1, 0))
+            if len(pair_times):
+                self.active_by_pair[pair] = (positions < len(pair_times)) & \
+                    (pair_times[clipped_positions] == self.times)
+                self.open_prices_by_pair[pair] = numpy.where(
+                    self.active_by_pair[pair], pair_open_prices[clipped_positions], 0
+                )
+            else:
+                self.active_by_pair[pair] = numpy.zeros(len(self.times), dtype=bool)
+                self.open_prices_by_pair[pair] = numpy.zeros(len(self.times), dtype=numpy.float64)
+
+    @staticmethod
+    def _get_candles_times_and_open_prices(candles):
+        if not len(candles):
+            return numpy.array([], dtype=numpy.float64), numpy.array([], dtype=numpy.float64)
+        candles = numpy.array(candles, dtype=numpy.float64)
+        # keep the last candle of each time
+        reversed_times = candles[::-1, _TIME]
+        times, reversed_indexes = numpy.unique(reversed_times, return_index=True)
+        return times, candles[::-1, _OPEN][reversed_indexes]
+
+    def _get_update_candle_indexes(self, pair, update_times, exact_time):
+        # candle index of each update, -1 when the update is not applied on any candle
+        active_indexes = numpy.flatnonzero(self.active_by_pair[pair])
+        active_times = self.times[active_indexes]
+        positions = numpy.searchsorted(active_times, update_times, side="left")
+        applied = positions < len(active_indexes)
+        clipped_positions = numpy.minimum(positions, max(len(active_indexes) - 1, 0))
+        if exact_time and len(active_indexes):
+            applied &= active_times[clipped_positions] == update_times
+        if not len(active_indexes):
+            return numpy.full(len(update_times), -1, dtype=numpy.int64)
+        return numpy.where(applied, active_indexes[clipped_positions], -1)
+
+    def _add_trades_updates(self, pair_index, pair, trades):
+        if not trades:
+            return
+        trades = sorted(trades, key=lambda tr: tr[commons_enums.PlotAttributes.X.value])
+        symbol, ref_market = self.base_and_quote_by_pair[pair]
+        candle_indexes = self._get_update_candle_indexes(
+            pair, numpy.array([trade[commons_enums.PlotAttributes.X.value] for trade in trades], dtype=numpy.float64),
+            False
+        )
+        volumes = numpy.array([trade[commons_enums.PlotAttributes.VOLUME.value] for trade in trades],
+                              dtype=numpy.float64)
+        costs = volumes * numpy.array([trade[commons_enums.PlotAttributes.Y.value] for trade in trades],
+                                      dtype=numpy.float64)
+        is_sell = numpy.array([trade[commons_enums.PlotAttributes.SIDE.value] == trading_enums.TradeOrderSide.SELL.value
+                               for trade in trades], dtype=bool)
+        fees = numpy.array([trade[commons_enums.DBRows.FEES_AMOUNT.value] for trade in trades], dtype=numpy.float64)
+        fees_currencies = numpy.array([trade[commons_enums.DBRows.FEES_CURRENCY.value] for trade in trades])
+        orders = numpy.arange(len(trades))
+        self._add_updates(symbol, candle_indexes, pair_index, _TRADE_UPDATE, orders, 0,
+                          numpy.where(is_sell, -volumes, volumes))
+        self._add_updates(ref_market, candle_indexes, pair_index, _TRADE_UPDATE, orders, 1,
+                          numpy.where(is_sell, costs, -costs))
+        for fees_currency in numpy.unique(fees_currencies):
+            mask = fees_currencies == fees_currency
+            self._add_updates(str(fees_currency), candle_indexes[mask], pair_index, _TRADE_UPDATE, orders[mask], 2,
+                              -fees[mask])
+
+    def _add_funding_fees_updates(self, pair_index, pair, funding_fees):
+        if not funding_fees:
+            return
+        candle_indexes = self._get_update_candle_indexes(
+            pair,
+            numpy.array([fee[commons_enums.PlotAttributes.X.value] for fee in funding_fees], dtype=numpy.float64),
+            True
+        )
+        currencies = numpy.array([fee[trading_enums.FeePropertyColumns.CURRENCY.value] for fee in funding_fees])
+        quantities = numpy.array([fee["quantity"] for fee in funding_fees], dtype=numpy.float64)
+        orders = numpy.arange(len(funding_fees))
+        for currency in numpy.unique(currencies):
+            mask = currencies == currency
+            self._add_updates(str(currency), candle_indexes[mask], pair_index, _FUNDING_FEE_UPDATE, orders[mask], 0,
+                              -quantities[mask])
+
+    def _add_updates(self, currency, candle_indexes, pair_index, update_type, orders, sub_order, deltas):
+        applied = candle_indexes >= 0
+        count = int(applied.sum())
+        if not count:
+            return
+        self._updates_by_currency.setdefault(currency, []).append((
+            candle_indexes[applied],
+            numpy.full(count, pair_index),
+            numpy.full(count, update_type),
+            orders[applied],
+            numpy.full(count, sub_order),
+            deltas[applied],
+        ))
+
+    def _get_holdings(self, currency):
+        initial_holdings = float(self.initial_holdings.get(currency, 0))
+        updates = self._updates_by_currency.get(currency)
+        if not updates:
+            return numpy.full(len(self.times), initial_holdings, dtype=numpy.float64)
+        candle_indexes, pair_indexes, update_types, orders, sub_orders, deltas = (
+            numpy.concatenate(column) for column in zip(*updates)
+        )
+        # sort updates in application order: candle, pair, trades before funding fees, then trade order
+        sorted_indexes = numpy.lexsort((sub_orders, orders, update_types, pair_indexes, candle_indexes))
+        candle_indexes = candle_indexes[sorted_indexes]
+        # cumulated holdings after each update, starting from initial holdings
+        cumulated_holdings = numpy.cumsum(numpy.concatenate(([initial_holdings], deltas[sorted_indexes])))
+        # holdings at each candle are the ones after the last update applied on or before this candle
+        updates_count = numpy.searchsorted(candle_indexes, numpy.arange(len(self.times)), side="right")
+        return cumulated_holdings[updates_count]
@@ -14,7 +14,7 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import json
-import sortedcontainers
+import numpy
 
 import octobot_trading.enums as trading_enums
 import octobot_trading.constants as trading_constants
@@ -31,6 +31,16 @@ import octobot_commons.errors as commons_errors
 import octobot_commons.time_frame_manager as time_frame_manager
 import octobot_commons.logging
 
+import tentacles.Meta.Keywords.scripting_library.backtesting.portfolio_replay as portfolio_replay
+
+
+PNL_TRANSACTION_TYPES = (
+    trading_enums.TransactionType.TRADING_FEE.value,
+    trading_enums.TransactionType.FUNDING_FEE.value,
+    trading_enums.TransactionType.REALISED_PNL.value,
+    trading_enums.TransactionType.CLOSE_REALISED_PNL.value,
+)
+
 
 def get_logger():
     return octobot_commons.logging.get_logger("BacktestingRunData")
@@ -131,6 +141,162 @@ async def load_historical_values(meta_database, exchange, with_candles=True,
     return price_data, trades_data, moving_portfolio_data, trading_type, metadata, run_global_metadata
 
 
+class RunAnalysisContext:
+    """
+    Loads the data of a backtesting run once to share it between analysis functions.
+    Without load(), each data is lazily loaded the first time it is required. load() reads every transaction
+    at once and later filters them in memory.
+    Derived series (realized PnL, wins and losses, paid funding fees) are computed once when first required.
+    """
+    def __init__(self, meta_database, exchange=None, historical_values=None):
+        self.meta_database = meta_database
+        self.exchange = exchange
+        self.historical_values = historical_values
+        self._metadata = None
+        self._transactions = None
+        self._transaction_types = None
+        self._transactions_by_filter = {}
+        self._trades = None
+        self._orders = None
+        self._grouped_funding_fees = {}
+        self._realised_pnl_history = None
+        self._wins_and_losses = None
+        self._paid_funding_fees = None
+
+    async def load(self):
+        await self.get_historical_values()
+        transactions = await get_transactions(self.meta_database)
+        self._transactions = transactions
+        self._transaction_types = numpy.array([transaction["type"] for transaction in transactions], dtype=object)
+
+    async def get_historical_values(self):
+        if self.historical_values is None:
+            self.historical_values = await load_historical_values(self.meta_database, self.exchange)
+        return self.historical_values
+
+    async def get_metadata(self):
+        if self._metadata is None:
+            self._metadata = self.historical_values[4] if self.historical_values \
+                else await get_metadata(self.meta_database)
+        return self._metadata
+
+    async def get_transactions(self, transaction_type=None, transaction_types=None):
+        key = (transaction_type, ) if transaction_type is not None else transaction_types
+        if key not in self._transactions_by_filter:
+            if self._transactions is None:
+                if transaction_type is not None:
+                    transactions = await get_transactions(self.meta_database, transaction_type=transaction_type)
+                elif transaction_types is not None:
+                    transactions = await get_transactions(self.meta_database, transaction_types=transaction_types)
+                else:
+                    transactions = await get_transactions(self.meta_database)
+                self._transactions_by_filter[key] = transactions
+            elif key is None:
+                self._transactions_by_filter[key] = self._transactions
+            else:
+                self._transactions_by_filter[key] = [
+                    self._transactions[index]
+                    for index in numpy.flatnonzero(numpy.isin(self._transaction_types, list(key)))
+                ]
+        return self._transactions_by_filter[key]
+
+    async def get_trades(self):
+        if self._trades is None:
+            if self.historical_values:
+                self._trades = [
+                    trade
+                    for trades in self.historical_values[1].values()
+                    for trade in trades
+                ]
+            else:
+                account_type = trading_api.get_account_type_from_run_metadata(await self.get_metadata())
+                self._trades = await self.meta_database.get_trades_db(account_type).all(
+                    commons_enums.DBTables.TRADES.value
+                )
+        return self._trades
+
+    async def get_orders(self):
+        if self._orders is None:
+            account_type = trading_api.get_account_type_from_run_metadata(await self.get_metadata())
+            self._orders = [
+                order[trading_constants.STORAGE_ORIGIN_VALUE]
+                for order in await self.meta_database.get_orders_db(account_type).all(
+                    commons_enums.DBTables.ORDERS.value
+                )
+            ]
+        return self._orders
+
+    async def get_grouped_funding_fees(self, group_key):
+        if group_key not in self._grouped_funding_fees:
+            funding_fees_history = sorted(
+                await self.get_transactions(transaction_type=trading_enums.TransactionType.FUNDING_FEE.value),
+                key=lambda f: f[commons_enums.PlotAttributes.X.value]
+            )
+            funding_fees_history_by_key = {}
+            for funding_fee in funding_fees_history:
+                funding_fees_history_by_key.setdefault(funding_fee[group_key], []).append(funding_fee)
+            self._grouped_funding_fees[group_key] = funding_fees_history_by_key
+        return self._grouped_funding_fees[group_key]
+
+    async def get_realised_pnl_history(self):
+        """
+        :return: times, pnl and cumulated pnl of each PnL related transaction
+        """
+        if self._realised_pnl_history is None:
+            transactions = await self.get_transactions(transaction_types=PNL_TRANSACTION_TYPES)
+            pnl = numpy.array(
+                [transaction["realised_pnl"] or 0 for transaction in transactions], dtype=numpy.float64
+            ) + numpy.array(
+                [transaction["quantity"] or 0 for transaction in transactions], dtype=numpy.float64
+            )
+            self._realised_pnl_history = (
+                [transaction[commons_enums.PlotAttributes.X.value] for transaction in transactions],
+                pnl.tolist(),
+                numpy.cumsum(pnl).tolist()
+            )
+        return self._realised_pnl_history
+
+    async def get_wins_and_losses(self):
+        """
+        :return: times and win (1) or loss (-1) flag of each winning or losing PnL transaction
+        """
+        if self._wins_and_losses is None:
+            transactions = await self.get_transactions(transaction_types=PNL_TRANSACTION_TYPES)
+            flags = numpy.sign(numpy.array(
+                [transaction["realised_pnl"] or 0 for transaction in transactions], dtype=numpy.float64
+            )).astype(numpy.int64)
+            closing_indexes = numpy.flatnonzero(flags)
+            self._wins_and_losses = (
+                [transactions[index][commons_enums.PlotAttributes.X.value] for index in closing_indexes],
+                flags[closing_indexes]
+            )
+        return self._wins_and_losses
+
+    async def get_paid_funding_fees(self):
+        """
+        :return: paid funding fees and their currency
+        """
+        if self._paid_funding_fees is None:
+            paid_fees = 0
+            fees_currency = None
+            for transaction in await self.get_transactions(
+                transaction_types=(trading_enums.TransactionType.FUNDING_FEE.value,)
+            ):
+                if fees_currency is None:
+                    fees_currency = transaction["currency"]
+                if transaction["currency"] != fees_currency:
+                    get_logger().error(f"Unknown funding fee value: {transaction}")
+                else:
+                    # - because funding fees are stored as negative number when paid (positive when "gained")
+                    paid_fees -= transaction["quantity"]
+            self._paid_funding_fees = (paid_fees, fees_currency)
+        return self._paid_funding_fees
+
+
+def _get_analysis_context(meta_database, exchange=None, historical_values=None, analysis_context=None):
+    return analysis_context or RunAnalysisContext(meta_database, exchange, historical_values=historical_values)
+
+
 async def backtesting_data(meta_database, data_label):
     metadata_from_run = await meta_database.get_backtesting_metadata_from_run()
     for key, value in metadata_from_run.items():
@@ -148,24 +314,10 @@ async def backtesting_data(meta_database, data_label):
     return None
 
 
-async def _get_grouped_funding_fees(meta_database, group_key):
-    funding_fees_history = await get_transactions(meta_database,
-                                                  transaction_type=trading_enums.TransactionType.FUNDING_FEE.value)
-    funding_fees_history = sorted(funding_fees_history, key=lambda f: f[commons_enums.PlotAttributes.X.value])
-    funding_fees_history_by_key = {}
-    for funding_fee in funding_fees_history:
-        try:
-            funding_fees_history_by_key[funding_fee[group_key]].append(funding_fee)
-        except KeyError:
-            funding_fees_history_by_key[funding_fee[group_key]] = [funding_fee]
-    return funding_fees_history_by_key
-
-
-async def plot_historical_funding_fees(meta_database, plotted_element, own_yaxis=True):
-    funding_fees_history_by_currency = await _get_grouped_funding_fees(
-        meta_database,
-        trading_enums.FeePropertyColumns.CURRENCY.value
-    )
+async def plot_historical_funding_fees(meta_database, plotted_element, own_yaxis=True, analysis_context=None):
+    funding_fees_history_by_currency = await _get_analysis_context(
+        meta_database, analysis_context=analysis_context
+    ).get_grouped_funding_fees(trading_enums.FeePropertyColumns.CURRENCY.value)
     for currency, fees in funding_fees_history_by_currency.items():
         cumulative_fees = []
         previous_fee = 0
@@ -220,7 +372,9 @@ def _evaluate_portfolio(portfolio, price_data, use_start_value):
     return value
 
 
-async def get_portfolio_values(meta_database, exchange=None, historical_values=None):
+async def get_portfolio_values(meta_database, exchange=None, historical_values=None, analysis_context=None):
+    if analysis_context is not None:
+        historical_values = await analysis_context.get_historical_values()
     price_data, trades_data, moving_portfolio_data, trading_type, metadata, _ = \
         historical_values or await load_historical_values(meta_database, exchange, with_portfolio=False, with_trades=False)
     starting_portfolio = json.loads(metadata[commons_enums.BacktestingMetadata.START_PORTFOLIO.value].replace("'", '"'))
@@ -237,118 +391,27 @@ async def get_portfolio_values(meta_database, exchange=None, historical_values=N
 
 
 async def plot_historical_portfolio_value(
-    meta_database, plotted_element, exchange=None, own_yaxis=False, historical_values=None
+    meta_database, plotted_element, exchange=None, own_yaxis=False, historical_values=None, analysis_context=None
 ):
+    analysis_context = _get_analysis_context(meta_database, exchange, historical_values, analysis_context)
     price_data, trades_data, moving_portfolio_data, trading_type, metadata, _ = \
-        historical_values or await load_historical_values(meta_database, exchange)
-    price_data_by_time = {}
-    for symbol, candles in price_data.items():
-        price_data_by_time[symbol] = {
-            candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value]: candle
-            for candle in candles
-        }
+        await analysis_context.get_historical_values()
     if trading_type == "future":
         # TODO: historical unrealized pnl
         pass
     for pair in trades_data:
         trades_data[pair] = sorted(trades_data[pair], key=lambda tr: tr[commons_enums.PlotAttributes.X.value])
-    funding_fees_history_by_pair = await _get_grouped_funding_fees(meta_database,
-                                                                   commons_enums.DBRows.SYMBOL.value)
-    value_data = sortedcontainers.SortedDict()
-    pairs = list(trades_data)
-    if pairs:
-        pair = pairs[0]
-        candles = price_data_by_time[pair]
-        value_data = sortedcontainers.SortedDict({
-            t: 0
-            for t in candles
-        })
-        trade_index_by_pair = {p: 0 for p in pairs}
-        funding_fees_index_by_pair = {p: 0 for p in pairs}
-        # TODO multi exchanges
-        exchange_name = metadata[commons_enums.DBRows.EXCHANGES.value][0]
-        # TODO hedge mode with multi position by pair
-        # if metadata[commons_enums.DBRows.FUTURE_CONTRACTS.value] and \
-        #         exchange_name in metadata[commons_enums.DBRows.FUTURE_CONTRACTS.value]:
-        #     positions_by_pair = {
-        #         pair: _position_factory(pair,
-        #                                 metadata[commons_enums.DBRows.FUTURE_CONTRACTS.value][exchange_name][pair])
-        #         for pair in pairs
-        #     }
-        # else:
-        #     positions_by_pair = {}
-        # TODO update position instead of portfolio when filled orders and apply position unrealized pnl to portfolio
-        for candle_time, ref_candle in candles.items():
-            current_candles = {}
-            for pair in pairs:
-                if candle_time not in price_data_by_time[pair]:
-                    # no price data for this time in this pair
-                    continue
-                other_candle = price_data_by_time[pair][candle_time]
-                current_candles[pair] = other_candle
-                symbol, ref_market = symbol_util.parse_symbol(pair).base_and_quote()
-                moving_portfolio_data[ref_market] = moving_portfolio_data.get(ref_market, 0)
-                moving_portfolio_data[symbol] = moving_portfolio_data.get(symbol, 0)
-                # part 1: compute portfolio total value after trade update when any
-                # 1.1: trades
-                # start iteration where it last stopped to reduce complexity
-                for trade_index, trade in enumerate(trades_data[pair][trade_index_by_pair[pair]:]):
-                    # handle trades that are both older and at the current candle starting from the last trade index
-                    # (older trades to handle the ones that might be from candles we dont have data on)
-                    if trade[commons_enums.PlotAttributes.X.value] <= candle_time:
-                        if trade[commons_enums.PlotAttributes.SIDE.value] == trading_enums.TradeOrderSide.SELL.value:
-                            moving_portfolio_data[symbol] -= trade[commons_enums.PlotAttributes.VOLUME.value]
-                            moving_portfolio_data[ref_market] += trade[commons_enums.PlotAttributes.VOLUME.value] * \
-                                                                 trade[commons_enums.PlotAttributes.Y.value]
-                        else:
-                            moving_portfolio_data[symbol] += trade[commons_enums.PlotAttributes.VOLUME.value]
-                            moving_portfolio_data[ref_market] -= trade[commons_enums.PlotAttributes.VOLUME.value] * \
-                                                                 trade[commons_enums.PlotAttributes.Y.value]
-                        moving_portfolio_data[trade[commons_enums.DBRows.FEES_CURRENCY.value]] -= \
-                            trade[commons_enums.DBRows.FEES_AMOUNT.value]
-
-                        # last trade case: as there is not trade afterwards, the next condition would never be filled,
-                        # force trade_index_by_pair[pair] increment
-                        if all(it_trade[commons_enums.PlotAttributes.X.value] ==
-                               trade[commons_enums.PlotAttributes.X.value]
-                               for it_trade in trades_data[pair][trade_index_by_pair[pair]:]):
-                            trade_index_by_pair[pair] += 1
-                            break
-
-                    if trade[commons_enums.PlotAttributes.X.value] > \
-                            ref_candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value]:
-                        # no need to continue iterating, save current index for new candle
-                        trade_index_by_pair[pair] += trade_index
-                        break
-                # 1.2: funding fees
-                # start iteration where it last stopped to reduce complexity
-                for funding_fee_index, funding_fee \
-                        in enumerate(funding_fees_history_by_pair.get(pair, [])[funding_fees_index_by_pair[pair]:]):
-                    if funding_fee[commons_enums.PlotAttributes.X.value] == candle_time:
-                        moving_portfolio_data[funding_fee[trading_enums.FeePropertyColumns.CURRENCY.value]] -= \
-                            funding_fee["quantity"]
-                    if funding_fee[commons_enums.PlotAttributes.X.value] > candle_time:
-                        # no need to continue iterating, save current index for new candle
-                        funding_fees_index_by_pair[pair] = funding_fee_index  # TODO
-                        break
-            # part 2: now that portfolio is up-to-date, compute portfolio total value
-            handled_currencies = []
-            for pair, other_candle in current_candles.items():
-                symbol, ref_market = symbol_util.parse_symbol(pair).base_and_quote()
-                if symbol not in handled_currencies:
-                    value_data[candle_time] = \
-                        value_data[candle_time] + \
-                        moving_portfolio_data[symbol] * other_candle[
-                            commons_enums.PriceIndexes.IND_PRICE_OPEN.value
-                        ]
-                    handled_currencies.append(symbol)
-                if ref_market not in handled_currencies:
-                    value_data[candle_time] = value_data[candle_time] + moving_portfolio_data[ref_market]
-                    handled_currencies.append(ref_market)
+    funding_fees_history_by_pair = await analysis_context.get_grouped_funding_fees(commons_enums.DBRows.SYMBOL.value)
+    # TODO multi exchanges
+    # TODO hedge mode with multi position by pair
+    # TODO update position instead of portfolio when filled orders and apply position unrealized pnl to portfolio
+    times, values = portfolio_replay.PortfolioReplay(
+        price_data, trades_data, funding_fees_history_by_pair, moving_portfolio_data
+    ).get_portfolio_values()
     plotted_element.plot(
         mode="scatter",
-        x=list(value_data.keys()),
-        y=list(value_data.values()),
+        x=times,
+        y=values,
         title="Portfolio value",
         own_yaxis=own_yaxis
     )
@@ -419,48 +482,30 @@ def _read_pnl_from_trades(x_data, pnl_data, cumulative_pnl_data, trades_history,
             get_logger().error(f"Unknown trade side: {trade}")
 
 
-def _read_pnl_from_transactions(x_data, pnl_data, cumulative_pnl_data, trading_transactions_history, x_as_trade_count):
-    previous_value = 0
-    for transaction in trading_transactions_history:
-        transaction_pnl = 0 if transaction["realised_pnl"] is None else transaction["realised_pnl"]
-        transaction_quantity = 0 if transaction["quantity"] is None else transaction["quantity"]
-        local_quantity = transaction_pnl + transaction_quantity
-        cumulated_pnl = local_quantity + previous_value
-        pnl_data.append(local_quantity)
-        cumulative_pnl_data.append(cumulated_pnl)
-        previous_value = cumulated_pnl
-        if x_as_trade_count:
-            x_data.append(len(pnl_data) - 1)
-        else:
-            x_data.append(transaction[commons_enums.PlotAttributes.X.value])
-
-
 async def _get_historical_pnl(meta_database, plotted_element, include_cumulative, include_unitary,
-                              exchange=None, x_as_trade_count=True, own_yaxis=False, historical_values=None):
+                              exchange=None, x_as_trade_count=True, own_yaxis=False, historical_values=None,
+                              analysis_context=None):
     # PNL:
     # 1. open position: consider position opening fee from PNL
     # 2. close position: consider closed amount + closing fee into PNL
     # what is a trade ?
     #   futures: when position going to 0 (from long/short) => trade is closed
     #   spot: when position lowered => trade is closed
-    price_data, trades_data, _, _, _, _ = historical_values or await load_historical_values(meta_database, exchange)
+    analysis_context = _get_analysis_context(meta_database, exchange, historical_values, analysis_context)
+    price_data, trades_data, _, _, _, _ = await analysis_context.get_historical_values()
     if not (price_data and next(iter(price_data.values()))):
         return
     x_data = [0 if x_as_trade_count
               else next(iter(price_data.values()))[0][commons_enums.PriceIndexes.IND_PRICE_TIME.value]]
     pnl_data = [0]
     cumulative_pnl_data = [0]
-    trading_transactions_history = await get_transactions(
-        meta_database,
-        transaction_types=(trading_enums.TransactionType.TRADING_FEE.value,
-                           trading_enums.TransactionType.FUNDING_FEE.value,
-                           trading_enums.TransactionType.REALISED_PNL.value,
-                           trading_enums.TransactionType.CLOSE_REALISED_PNL.value)
-    )
-    if trading_transactions_history:
+    transactions_times, transactions_pnl, transactions_cumulative_pnl = \
+        await analysis_context.get_realised_pnl_history()
+    if transactions_times:
         # can rely on pnl history
-        _read_pnl_from_transactions(x_data, pnl_data, cumulative_pnl_data,
-                                    trading_transactions_history, x_as_trade_count)
+        x_data += range(1, len(transactions_times) + 1) if x_as_trade_count else transactions_times
+        pnl_data += transactions_pnl
+        cumulative_pnl_data += transactions_cumulative_pnl
     else:
         # recreate pnl history from trades
         _read_pnl_from_trades(x_data, pnl_data, cumulative_pnl_data, trades_data, x_as_trade_count)
@@ -494,22 +539,10 @@ async def _get_historical_pnl(meta_database, plotted_element, include_cumulative
             line_shape="hv")
 
 
-async def total_paid_fees(meta_database, all_trades):
-    paid_fees = 0
-    fees_currency = None
-    trading_transactions_history = await get_transactions(
-        meta_database,
-        transaction_types=(trading_enums.TransactionType.FUNDING_FEE.value,)
-    )
-    if trading_transactions_history:
-        for transaction in trading_transactions_history:
-            if fees_currency is None:
-                fees_currency = transaction["currency"]
-            if transaction["currency"] != fees_currency:
-                get_logger().error(f"Unknown funding fee value: {transaction}")
-            else:
-                # - because funding fees are stored as negative number when paid (positive when "gained")
-                paid_fees -= transaction["quantity"]
+async def total_paid_fees(meta_database, all_trades, analysis_context=None):
+    paid_fees, fees_currency = await _get_analysis_context(
+        meta_database, analysis_context=analysis_context
+    ).get_paid_funding_fees()
     for trade in all_trades:
         currency = symbol_util.parse_symbol(trade[commons_enums.DBRows.SYMBOL.value]).base
         if trade[commons_enums.DBRows.FEES_CURRENCY.value] == currency:
@@ -529,10 +562,10 @@ async def total_paid_fees(meta_database, all_trades):
 
 async def plot_historical_pnl_value(meta_database, plotted_element, exchange=None, x_as_trade_count=True,
                                     own_yaxis=False, include_cumulative=True, include_unitary=True,
-                                    historical_values=None):
+                                    historical_values=None, analysis_context=None):
     return await _get_historical_pnl(meta_database, plotted_element, include_cumulative, include_unitary,
                                      exchange=exchange, x_as_trade_count=x_as_trade_count, own_yaxis=own_yaxis,
-                                     historical_values=historical_values)
+                                     historical_values=historical_values, analysis_context=analysis_context)
 
 
 def _plot_table_data(data, plotted_element, data_name, additional_key_to_label, additional_columns,
@@ -560,15 +593,10 @@ def _plot_table_data(data, plotted_element, data_name, additional_key_to_label,
     )
 
 
-async def plot_trades(meta_database, plotted_element, historical_values=None):
-    if historical_values:
-        _, trades_data, _, _, _, _ = historical_values
-        data = []
-        for trades in trades_data.values():
-            data += trades
-    else:
-        account_type = trading_api.get_account_type_from_run_metadata(await get_metadata(meta_database))
-        data = await meta_database.get_trades_db(account_type).all(commons_enums.DBTables.TRADES.value)
+async def plot_trades(meta_database, plotted_element, historical_values=None, analysis_context=None):
+    data = await _get_analysis_context(
+        meta_database, historical_values=historical_values, analysis_context=analysis_context
+    ).get_trades()
     key_to_label = {
         commons_enums.PlotAttributes.Y.value: "Price",
         commons_enums.PlotAttributes.TYPE.value: "Type",
@@ -594,15 +622,13 @@ async def plot_trades(meta_database, plotted_element, historical_values=None):
                      key_to_label, additional_columns, datum_columns_callback)
 
 
-async def plot_orders(meta_database, plotted_element, historical_values=None):
-    if historical_values:
-        _, _, _, _, metadata, _ = historical_values
-    else:
-        metadata = await get_metadata(meta_database)
-    account_type = trading_api.get_account_type_from_run_metadata(metadata)
+async def plot_orders(meta_database, plotted_element, historical_values=None, analysis_context=None):
+    # copy orders as displayed values are edited
     data = [
-        order[trading_constants.STORAGE_ORIGIN_VALUE]
-        for order in await meta_database.get_orders_db(account_type).all(commons_enums.DBTables.ORDERS.value)
+        dict(order)
+        for order in await _get_analysis_context(
+            meta_database, historical_values=historical_values, analysis_context=analysis_context
+        ).get_orders()
     ]
     key_to_label = {
         trading_enums.ExchangeConstantsOrderColumns.TIMESTAMP.value: "Time",
@@ -627,14 +653,13 @@ async def plot_orders(meta_database, plotted_element, historical_values=None):
                      key_to_label, additional_columns, datum_columns_callback)
 
 
-async def plot_withdrawals(meta_database, plotted_element):
-    withdrawal_history = await get_transactions(
-        meta_database,
-        transaction_types=(trading_enums.TransactionType.BLOCKCHAIN_WITHDRAWAL.value,)
-    )
+async def plot_withdrawals(meta_database, plotted_element, analysis_context=None):
     # apply quantity to y for each withdrawal
-    for withdrawal in withdrawal_history:
-        withdrawal[commons_enums.PlotAttributes.Y.value] = withdrawal["quantity"]
+    withdrawal_history = [
+        {**withdrawal, commons_enums.PlotAttributes.Y.value: withdrawal["quantity"]}
+        for withdrawal in await _get_analysis_context(meta_database, analysis_context=analysis_context)
+        .get_transactions(transaction_types=(trading_enums.TransactionType.BLOCKCHAIN_WITHDRAWAL.value,))
+    ]
     key_to_label = {
         commons_enums.PlotAttributes.Y.value: "Quantity",
         "currency": "Currency",
@@ -646,11 +671,9 @@ async def plot_withdrawals(meta_database, plotted_element):
                      key_to_label, additional_columns, None)
 
 
-async def plot_positions(meta_database, plotted_element):
-    realized_pnl_history = await get_transactions(
-        meta_database,
-        transaction_types=(trading_enums.TransactionType.CLOSE_REALISED_PNL.value,)
-    )
+async def plot_positions(meta_database, plotted_element, analysis_context=None):
+    realized_pnl_history = await _get_analysis_context(meta_database, analysis_context=analysis_context)\
+        .get_transactions(transaction_types=(trading_enums.TransactionType.CLOSE_REALISED_PNL.value,))
     key_to_label = {
         commons_enums.PlotAttributes.X.value: "Exit time",
         "first_entry_time": "Entry time",
@@ -771,22 +794,10 @@ def _get_default_searches(columns, types):
     ]
 
 
-def _get_wins_and_losses_from_transactions(x_data, wins_and_losses_data, trading_transactions_history,
+def _get_wins_and_losses_from_transactions(x_data, wins_and_losses_data, wins_and_losses_times, wins_and_losses,
                                            x_as_trade_count):
-    for transaction in trading_transactions_history:
-        transaction_pnl = 0 if transaction["realised_pnl"] is None else transaction["realised_pnl"]
-        current_cumulative_wins = wins_and_losses_data[-1] if wins_and_losses_data else 0
-        if transaction_pnl < 0:
-            wins_and_losses_data.append(current_cumulative_wins - 1)
-        elif transaction_pnl > 0:
-            wins_and_losses_data.append(current_cumulative_wins + 1)
-        else:
-            continue
-
-        if x_as_trade_count:
-            x_data.append(len(wins_and_losses_data) - 1)
-        else:
-            x_data.append(transaction[commons_enums.PlotAttributes.X.value])
+    wins_and_losses_data += numpy.cumsum(wins_and_losses).tolist()
+    x_data += range(len(wins_and_losses_data)) if x_as_trade_count else wins_and_losses_times
 
 
 def _get_wins_and_losses_from_trades(x_data, wins_and_losses_data, trades_history, x_as_trade_count):
@@ -795,23 +806,17 @@ def _get_wins_and_losses_from_trades(x_data, wins_and_losses_data, trades_histor
 
 
 async def plot_historical_wins_and_losses(meta_database, plotted_element, exchange=None, x_as_trade_count=False,
-                                          own_yaxis=True, historical_values=None):
-    price_data, trades_data, _, _, _, _ = historical_values or await load_historical_values(meta_database, exchange)
+                                          own_yaxis=True, historical_values=None, analysis_context=None):
+    analysis_context = _get_analysis_context(meta_database, exchange, historical_values, analysis_context)
+    price_data, trades_data, _, _, _, _ = await analysis_context.get_historical_values()
     if not (price_data and next(iter(price_data.values()))):
         return
     x_data = []
     wins_and_losses_data = []
-    trading_transactions_history = await get_transactions(
-        meta_database,
-        transaction_types=(trading_enums.TransactionType.TRADING_FEE.value,
-                           trading_enums.TransactionType.FUNDING_FEE.value,
-                           trading_enums.TransactionType.REALISED_PNL.value,
-                           trading_enums.TransactionType.CLOSE_REALISED_PNL.value)
-    )
-    if trading_transactions_history:
+    if await analysis_context.get_transactions(transaction_types=PNL_TRANSACTION_TYPES):
         # can rely on pnl history
         _get_wins_and_losses_from_transactions(x_data, wins_and_losses_data,
-                                               trading_transactions_history, x_as_trade_count)
+                                               *(await analysis_context.get_wins_and_losses()), x_as_trade_count)
     else:
         # recreate pnl history from trades
         return  # todo not implemented yet
@@ -827,24 +832,12 @@ async def plot_historical_wins_and_losses(meta_database, plotted_element, exchan
         line_shape="hv")
 
 
-def _get_win_rates_from_transactions(x_data, win_rates_data, trading_transactions_history,
+def _get_win_rates_from_transactions(x_data, win_rates_data, wins_and_losses_times, wins_and_losses,
                                      x_as_trade_count):
-    wins_count = 0
-    losses_count = 0
-    for transaction in trading_transactions_history:
-        transaction_pnl = 0 if transaction["realised_pnl"] is None else transaction["realised_pnl"]
-        if transaction_pnl < 0:
-            losses_count += 1
-        elif transaction_pnl > 0:
-            wins_count += 1
-        else:
-            continue
-
-        win_rates_data.append((wins_count/(losses_count+wins_count))*100)
-        if x_as_trade_count:
-            x_data.append(len(win_rates_data) - 1)
-        else:
-            x_data.append(transaction[commons_enums.PlotAttributes.X.value])
+    wins_count = numpy.cumsum(wins_and_losses > 0)
+    closed_count = numpy.arange(1, len(wins_and_losses) + 1)
+    win_rates_data += ((wins_count / closed_count) * 100).tolist()
+    x_data += range(len(win_rates_data)) if x_as_trade_count else wins_and_losses_times
 
 
 def _get_win_rates_from_trades(x_data, win_rates_data, trades_history, x_as_trade_count):
@@ -853,23 +846,18 @@ def _get_win_rates_from_trades(x_data, win_rates_data, trades_history, x_as_trad
 
 
 async def plot_historical_win_rates(meta_database, plotted_element, exchange=None,
-                                    x_as_trade_count=False, own_yaxis=True, historical_values=None):
-    price_data, trades_data, _, _, _, _ = historical_values or await load_historical_values(meta_database, exchange)
+                                    x_as_trade_count=False, own_yaxis=True, historical_values=None,
+                                    analysis_context=None):
+    analysis_context = _get_analysis_context(meta_database, exchange, historical_values, analysis_context)
+    price_data, trades_data, _, _, _, _ = await analysis_context.get_historical_values()
     if not (price_data and next(iter(price_data.values()))):
         return
     x_data = []
     win_rates_data = []
-    trading_transactions_history = await get_transactions(
-        meta_database,
-        transaction_types=(trading_enums.TransactionType.TRADING_FEE.value,
-                           trading_enums.TransactionType.FUNDING_FEE.value,
-                           trading_enums.TransactionType.REALISED_PNL.value,
-                           trading_enums.TransactionType.CLOSE_REALISED_PNL.value)
-    )
-    if trading_transactions_history:
+    if await analysis_context.get_transactions(transaction_types=PNL_TRANSACTION_TYPES):
         # can rely on pnl history
         _get_win_rates_from_transactions(x_data, win_rates_data,
-                                         trading_transactions_history, x_as_trade_count)
+                                         *(await analysis_context.get_wins_and_losses()), x_as_trade_count)
     else:
         # recreate pnl history from trades
         return  # todo not implemented yet
@@ -900,19 +888,15 @@ async def _get_best_case_growth_from_transactions(trading_transactions_history,
 
 
 async def plot_best_case_growth(meta_database, plotted_element, exchange=None,
-                                x_as_trade_count=False, own_yaxis=False, historical_values=None):
-    price_data, trades_data, _, _, _, _ = historical_values or await load_historical_values(meta_database, exchange)
+                                x_as_trade_count=False, own_yaxis=False, historical_values=None,
+                                analysis_context=None):
+    analysis_context = _get_analysis_context(meta_database, exchange, historical_values, analysis_context)
+    price_data, trades_data, _, _, _, _ = await analysis_context.get_historical_values()
     if not (price_data and next(iter(price_data.values()))):
         return
     x_data = []
     best_case_data = []
-    trading_transactions_history = await get_transactions(
-        meta_database,
-        transaction_types=(trading_enums.TransactionType.TRADING_FEE.value,
-                           trading_enums.TransactionType.FUNDING_FEE.value,
-                           trading_enums.TransactionType.REALISED_PNL.value,
-                           trading_enums.TransactionType.CLOSE_REALISED_PNL.value)
-    )
+    trading_transactions_history = await analysis_context.get_transactions(transaction_types=PNL_TRANSACTION_TYPES)
     if trading_transactions_history:
         # can rely on pnl history
         x_data, best_case_data = await _get_best_case_growth_from_transactions(trading_transactions_history,
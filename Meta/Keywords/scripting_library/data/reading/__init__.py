@@ -1,3 +1,4 @@
+from .mmap_candles_history import *
 from .exchange_public_data import *
 from .exchange_private_data import *
 from .metadata_reader import *
@@ -19,11 +19,11 @@ import octobot_trading.api as api
 import octobot_trading.constants as trading_constants
 import octobot_trading.exchange_data
 import octobot_trading.personal_data as personal_data
-import octobot_trading.exchange_data as exchange_data
 import octobot_trading.enums as trading_enums
 import octobot_backtesting.api as backtesting_api
 from octobot_trading.modes.script_keywords.basic_keywords import run_persistence as run_persistence
 from tentacles.Evaluator.Util.candles_util import CandlesUtil
+import tentacles.Meta.Keywords.scripting_library.data.reading.mmap_candles_history as mmap_candles_history
 
 
 # real time in live mode
@@ -214,16 +214,8 @@ async def _local_candles_manager(exchange_manager, symbol, time_frame, start_tim
         exchange_name=exchange_manager.exchange_name,
         symbol=symbol,
         time_frame=commons_enums.TimeFrames(time_frame))
-    chronological_candles = sorted(ohlcv_data, key=lambda candle: candle[0])
-    full_candles_history = [
-        ohlcv[-1]
-        for ohlcv in chronological_candles
-        if start_timestamp <= ohlcv[0] <= end_timestamp
-    ]
-    candles_manager = exchange_data.CandlesManager(max_candles_count=len(full_candles_history))
-    await candles_manager.initialize()
-    candles_manager.replace_all_candles(full_candles_history)
-    return candles_manager
+    # memory-mapped history: full history is not kept in RAM
+    return mmap_candles_history.MemoryMappedCandlesHistory.from_ohlcv(ohlcv_data, start_timestamp, end_timestamp)
 
 
 async def _get_candle_manager(context, symbol, time_frame, max_history):
@@ -0,0 +1,124 @@
+#  Drakkar-Software OctoBot-Trading
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import os
+import tempfile
+
+import numpy
+
+import octobot_commons.enums as commons_enums
+
+
+class MemoryMappedCandlesHistory:
+    """
+    Read-only candles history stored as one memory-mapped file per candle column.
+    Exposes the candles getters of a CandlesManager. Returned arrays are views on the mapped files:
+    no data is copied and pages are loaded by the OS only when read.
+    Arrays are mapped in copy-on-write mode: editing a returned array never changes the history.
+    """
+    COLUMNS = (
+        commons_enums.PriceIndexes.IND_PRICE_TIME,
+        commons_enums.PriceIndexes.IND_PRICE_OPEN,
+        commons_enums.PriceIndexes.IND_PRICE_HIGH,
+        commons_enums.PriceIndexes.IND_PRICE_LOW,
+        commons_enums.PriceIndexes.IND_PRICE_CLOSE,
+        commons_enums.PriceIndexes.IND_PRICE_VOL,
+    )
+
+    def __init__(self, directory):
+        # keep a reference on the directory: its files are removed when the history is garbage collected
+        self._directory = directory
+        # plain ndarray views on the mapped files (the mapping is kept alive by the views base)
+        self._columns = {
+            column: numpy.load(self._get_column_path(directory.name, column), mmap_mode="c").view(numpy.ndarray)
+            for column in self.COLUMNS
+        }
+        self.time_candles = self._columns[commons_enums.PriceIndexes.IND_PRICE_TIME]
+        self.open_candles = self._columns[commons_enums.PriceIndexes.IND_PRICE_OPEN]
+        self.high_candles = self._columns[commons_enums.PriceIndexes.IND_PRICE_HIGH]
+        self.low_candles = self._columns[commons_enums.PriceIndexes.IND_PRICE_LOW]
+        self.close_candles = self._columns[commons_enums.PriceIndexes.IND_PRICE_CLOSE]
+        self.volume_candles = self._columns[commons_enums.PriceIndexes.IND_PRICE_VOL]
+        self.time_candles_index = len(self.time_candles)
+
+    @classmethod
+    def from_ohlcv(cls, ohlcv_data, start_timestamp, end_timestamp, directory=None):
+        """
+        Creates a history from exchange importer ohlcv data: (timestamp, ..., candle) rows
+        :param ohlcv_data: the ohlcv rows, in any order
+        :param start_timestamp: the minimum timestamp of the rows to keep
+        :param end_timestamp: the maximum timestamp of the rows to keep
+        :param directory: the directory to create the column files into, the system temp folder by default
+        """
+        timestamps = numpy.fromiter((ohlcv[0] for ohlcv in ohlcv_data), dtype=numpy.float64, count=len(ohlcv_data))
+        selected_indexes = numpy.flatnonzero((start_timestamp <= timestamps) & (timestamps <= end_timestamp))
+        selected_indexes = selected_indexes[numpy.argsort(timestamps[selected_indexes], kind="stable")]
+        candles = numpy.array([ohlcv_data[index][-1] for index in selected_indexes], dtype=numpy.float64) \
+            .reshape(len(selected_indexes), len(commons_enums.PriceIndexes))
+        # as in CandlesManager, only keep the first candle of each time
+        _, first_indexes = numpy.unique(candles[:, commons_enums.PriceIndexes.IND_PRICE_TIME.value],
+                                        return_index=True)
+        candles = candles[numpy.sort(first_indexes)]
+        history_directory = tempfile.TemporaryDirectory(prefix="candles_history_", dir=directory,
+                                                        ignore_cleanup_errors=True)
+        for column in cls.COLUMNS:
+            numpy.save(cls._get_column_path(history_directory.name, column), candles[:, column.value])
+        return cls(history_directory)
+
+    @staticmethod
+    def _get_column_path(directory, column):
+        return os.path.join(directory, f"{column.name}.npy")
+
+    def get_symbol_candles_count(self):
+        return self.time_candles_index
+
+    def get_symbol_close_candles(self, limit=-1):
+        return self._extract_limited_data(self.close_candles, limit)
+
+    def get_symbol_open_candles(self, limit=-1):
+        return self._extract_limited_data(self.open_candles, limit)
+
+    def get_symbol_high_candles(self, limit=-1):
+        return self._extract_limited_data(self.high_candles, limit)
+
+    def get_symbol_low_candles(self, limit=-1):
+        return self._extract_limited_data(self.low_candles, limit)
+
+    def get_symbol_time_candles(self, limit=-1):
+        return self._extract_limited_data(self.time_candles, limit)
+
+    def get_symbol_volume_candles(self, limit=-1):
+        return self._extract_limited_data(self.volume_candles, limit)
+
+    def get_time_range_indexes(self, from_time=None, to_time=None):
+        """
+        :return: the start (included) and end (excluded) indexes of candles from from_time to to_time (included)
+        """
+        start_index = 0 if from_time is None else int(numpy.searchsorted(self.time_candles, from_time, side="left"))
+        end_index = self.time_candles_index if to_time is None \
+            else int(numpy.searchsorted(self.time_candles, to_time, side="right"))
+        return start_index, max(start_index, end_index)
+
+    def get_symbol_candles_in_time_range(self, price_index, from_time=None, to_time=None):
+        """
+        :return: a view on the price_index column values from from_time to to_time (included)
+        """
+        start_index, end_index = self.get_time_range_indexes(from_time, to_time)
+        return self._columns[commons_enums.PriceIndexes(price_index)][start_index:end_index]
+
+    def _extract_limited_data(self, data, limit):
+        if limit == -1:
+            return data[:]
+        return data[max(0, self.time_candles_index - limit):]
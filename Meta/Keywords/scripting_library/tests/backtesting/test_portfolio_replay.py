@@ -0,0 +1,92 @@
+#  Drakkar-Software OctoBot-Trading
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import octobot_trading.enums as trading_enums
+import octobot_commons.enums as commons_enums
+
+import tentacles.Meta.Keywords.scripting_library.backtesting.portfolio_replay as portfolio_replay
+
+
+def _candle(time, open_price):
+    return [time, open_price, open_price, open_price, open_price, 1]
+
+
+def _trade(time, side, price, volume, fees_amount=0, fees_currency="USDT"):
+    return {
+        commons_enums.PlotAttributes.X.value: time,
+        commons_enums.PlotAttributes.Y.value: price,
+        commons_enums.PlotAttributes.VOLUME.value: volume,
+        commons_enums.PlotAttributes.SIDE.value: side,
+        commons_enums.DBRows.FEES_AMOUNT.value: fees_amount,
+        commons_enums.DBRows.FEES_CURRENCY.value: fees_currency,
+    }
+
+
+def test_get_portfolio_values():
+    price_data = {
+        "BTC/USDT": [_candle(1, 10), _candle(2, 20), _candle(3, 30), _candle(4, 40)],
+        # no candle at 2
+        "ETH/BTC": [_candle(1, 0.5), _candle(3, 0.25), _candle(4, 0.25)],
+    }
+    trades_data = {
+        "BTC/USDT": [
+            _trade(2, trading_enums.TradeOrderSide.BUY.value, 20, 1, fees_amount=1),
+            # after the last candle: never applied
+            _trade(5, trading_enums.TradeOrderSide.SELL.value, 50, 1),
+        ],
+        "ETH/BTC": [
+            # applied on the next ETH/BTC candle
+            _trade(2, trading_enums.TradeOrderSide.BUY.value, 0.5, 2, fees_amount=0.1, fees_currency="ETH"),
+        ],
+    }
+    funding_fees = {
+        "BTC/USDT": [{commons_enums.PlotAttributes.X.value: 3,
+                      trading_enums.FeePropertyColumns.CURRENCY.value: "USDT",
+                      "quantity": 2}],
+    }
+    times, values = portfolio_replay.PortfolioReplay(
+        price_data, trades_data, funding_fees, {"USDT": 100, "BTC": 2}
+    ).get_portfolio_values()
+    assert times == [1, 2, 3, 4]
+    # 1: 2 BTC * 10 + 100 USDT (ETH: 0)
+    # 2: 3 BTC * 20 + (100 - 20 - 1) USDT
+    # 3: 2 BTC * 30 + (79 - 2) USDT + 1.9 ETH * 0.25 (trade applied on the next ETH/BTC candle)
+    # 4: 2 BTC * 40 + 77 USDT + 1.9 ETH * 0.25
+    assert values == [120, 139, 60 + 77 + 1.9 * 0.25, 80 + 77 + 1.9 * 0.25]
+
+
+def test_get_portfolio_values_with_trailing_trades_at_the_same_time():
+    price_data = {
+        "BTC/USDT": [_candle(1, 10), _candle(2, 10), _candle(3, 10)],
+    }
+    trades_data = {
+        "BTC/USDT": [
+            _trade(1.5, trading_enums.TradeOrderSide.BUY.value, 10, 1),
+            _trade(1.5, trading_enums.TradeOrderSide.BUY.value, 10, 1),
+        ],
+    }
+    times, values = portfolio_replay.PortfolioReplay(
+        price_data, trades_data, {}, {"USDT": 100}
+    ).get_portfolio_values()
+    assert times == [1, 2, 3]
+    # both trades are applied at once on the first candle after them
+    assert values == [100, 100, 100]
+    replay = portfolio_replay.PortfolioReplay(price_data, trades_data, {}, {"USDT": 100})
+    assert replay._get_holdings("BTC").tolist() == [0, 2, 2]
+    assert replay._get_holdings("USDT").tolist() == [100, 80, 80]
+
+
+def test_get_portfolio_values_without_trades():
+    assert portfolio_replay.PortfolioReplay({}, {}, {}, {"USDT": 100}).get_portfolio_values() == ([], [])
@@ -147,3 +147,71 @@ async def _test_historical_pnl_values_from_trades(price_data, trades_data, pnl_d
                 )
             else:
                 plotted_element.assert_not_called()
+
+
+async def test_run_analysis_context_on_large_run(default_spot_metadata):
+    trades_count = 100000
+    candles_count = 10000
+    price_data = {
+        "BTC/USDT": [[i * 1000, 100 + i % 7, 110, 90, 100, 1] for i in range(candles_count)]
+    }
+    trades_data = {
+        "BTC/USDT": [
+            {
+                commons_enums.PlotAttributes.X.value: (i * candles_count // trades_count) * 1000,
+                commons_enums.PlotAttributes.Y.value: 100 + i % 7,
+                commons_enums.PlotAttributes.VOLUME.value: 0.01,
+                commons_enums.PlotAttributes.SIDE.value: trading_enums.TradeOrderSide.BUY.value if i % 2
+                else trading_enums.TradeOrderSide.SELL.value,
+                commons_enums.DBRows.FEES_AMOUNT.value: 0.001,
+                commons_enums.DBRows.FEES_CURRENCY.value: "USDT",
+                commons_enums.DBRows.SYMBOL.value: "BTC/USDT",
+                "cost": 1,
+            }
+            for i in range(trades_count)
+        ]
+    }
+    transactions = [
+        {
+            "type": trading_enums.TransactionType.TRADING_FEE.value if i % 2
+            else trading_enums.TransactionType.REALISED_PNL.value,
+            commons_enums.PlotAttributes.X.value: (i * candles_count // trades_count) * 1000,
+            "realised_pnl": None if i % 2 else (i % 5) - 2,
+            "quantity": -0.001 if i % 2 else None,
+            "currency": "USDT",
+            commons_enums.DBRows.SYMBOL.value: "BTC/USDT",
+        }
+        for i in range(trades_count)
+    ]
+    plotted_element = mock.Mock(TABLE_KEY_TO_COLUMN={})
+    with mock.patch.object(run_data_analysis, "load_historical_values",
+                           mock.AsyncMock(return_value=(price_data, trades_data, {"USDT": 1000}, "spot",
+                                                        default_spot_metadata, default_spot_metadata))) \
+            as load_historical_values_mock, \
+         mock.patch.object(run_data_analysis, "get_transactions",
+                           mock.AsyncMock(return_value=transactions)) \
+            as get_transactions_mock:
+        analysis_context = run_data_analysis.RunAnalysisContext("meta_database")
+        await analysis_context.load()
+        await run_data_analysis.plot_historical_portfolio_value("meta_database", plotted_element,
+                                                                analysis_context=analysis_context)
+        for _ in range(2):
+            await run_data_analysis.plot_historical_pnl_value("meta_database", plotted_element,
+                                                              x_as_trade_count=False,
+                                                              analysis_context=analysis_context)
+        await run_data_analysis.plot_historical_funding_fees("meta_database", plotted_element,
+                                                             analysis_context=analysis_context)
+        await run_data_analysis.plot_historical_wins_and_losses("meta_database", plotted_element,
+                                                                analysis_context=analysis_context)
+        await run_data_analysis.plot_historical_win_rates("meta_database", plotted_element,
+                                                          analysis_context=analysis_context)
+        await run_data_analysis.plot_trades("meta_database", plotted_element, analysis_context=analysis_context)
+        await run_data_analysis.plot_positions("meta_database", plotted_element, analysis_context=analysis_context)
+        paid_fees = await run_data_analysis.total_paid_fees("meta_database", await analysis_context.get_trades(),
+                                                            analysis_context=analysis_context)
+        # each data is loaded once
+        load_historical_values_mock.assert_called_once_with("meta_database", None)
+        get_transactions_mock.assert_called_once_with("meta_database")
+        assert round(paid_fees, 6) == round(trades_count * 0.001, 6)
+        win_rates = plotted_element.plot.call_args_list[-1].kwargs["y"]
+        assert len(win_rates) == trades_count * 2 // 5
@@ -0,0 +1,125 @@
+#  Drakkar-Software OctoBot-Trading
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import gc
+import os
+import tracemalloc
+
+import mock
+import numpy
+import pytest
+
+import octobot_commons.enums as commons_enums
+import octobot_trading.exchange_data as exchange_data
+import tentacles.Meta.Keywords.scripting_library.data.reading.exchange_public_data as exchange_public_data
+import tentacles.Meta.Keywords.scripting_library.data.reading.mmap_candles_history as mmap_candles_history
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+def _ohlcv(candles_count, shuffled=False):
+    # importer rows: (timestamp, candle)
+    rows = [
+        (i * 60, [i * 60, i + 1, i + 2, i, i + 0.5, i * 10])
+        for i in range(candles_count)
+    ]
+    if shuffled:
+        rows = [rows[index] for index in numpy.random.default_rng(1).permutation(candles_count)]
+    return rows
+
+
+async def test_from_ohlcv(tmp_path):
+    rows = _ohlcv(100, shuffled=True)
+    # duplicated candle: first one is kept
+    rows.append((10 * 60, [10 * 60, 0, 0, 0, 0, 0]))
+    history = mmap_candles_history.MemoryMappedCandlesHistory.from_ohlcv(rows, 10 * 60, 89 * 60,
+                                                                          directory=tmp_path)
+    assert history.get_symbol_candles_count() == 80
+    assert history.get_symbol_time_candles().tolist() == [i * 60 for i in range(10, 90)]
+    assert history.get_symbol_open_candles(3).tolist() == [88, 89, 90]
+    assert history.get_symbol_high_candles(1).tolist() == [91]
+    assert history.get_symbol_low_candles(200).tolist() == list(range(10, 90))
+    assert history.get_symbol_close_candles(2).tolist() == [88.5, 89.5]
+    assert history.get_symbol_volume_candles(1).tolist() == [890]
+    assert history.get_time_range_indexes(20 * 60, 30 * 60) == (10, 21)
+    assert history.get_time_range_indexes(20 * 60 + 1, None) == (11, 80)
+    assert history.get_time_range_indexes(100 * 60, 0) == (80, 80)
+    assert history.get_symbol_candles_in_time_range(
+        commons_enums.PriceIndexes.IND_PRICE_CLOSE.value, 20 * 60, 22 * 60
+    ).tolist() == [20.5, 21.5, 22.5]
+
+    # zero-copy views, editing them does not change the history
+    close_candles = history.get_symbol_close_candles()
+    assert isinstance(close_candles, numpy.ndarray)
+    assert not close_candles.flags.owndata
+    close_candles[0] = -1
+    assert mmap_candles_history.MemoryMappedCandlesHistory(history._directory).close_candles[0] == 10.5
+
+    directory = history._directory.name
+    assert os.path.isdir(directory)
+    del history, close_candles
+    gc.collect()
+    assert not os.path.isdir(directory)
+
+
+async def test_empty_history(tmp_path):
+    history = mmap_candles_history.MemoryMappedCandlesHistory.from_ohlcv([], 0, 1, directory=tmp_path)
+    assert history.get_symbol_candles_count() == 0
+    assert history.get_symbol_close_candles().tolist() == []
+    assert history.get_symbol_close_candles(10).tolist() == []
+    assert history.get_time_range_indexes(0, 1) == (0, 0)
+
+
+async def test_time_keyword(tmp_path):
+    history = mmap_candles_history.MemoryMappedCandlesHistory.from_ohlcv(_ohlcv(10), 0, 10 * 60,
+                                                                          directory=tmp_path)
+    context = mock.Mock(symbol="BTC/USDT", time_frame=commons_enums.TimeFrames.ONE_MINUTE.value)
+    with mock.patch.object(exchange_public_data, "_get_candle_manager", mock.AsyncMock(return_value=history)):
+        close_times = await exchange_public_data.Time(context, limit=3)
+        # plotting keywords expect lists
+        assert isinstance(close_times, list)
+        assert close_times == [8 * 60, 9 * 60, 10 * 60]
+        open_times = await exchange_public_data.Time(context, limit=3, use_close_time=False)
+        assert open_times.tolist() == [7 * 60, 8 * 60, 9 * 60]
+
+
+async def test_memory_compared_to_candles_manager(tmp_path):
+    candles_count = 20000
+    rows = _ohlcv(candles_count)
+
+    tracemalloc.start()
+    try:
+        gc.collect()
+        origin = tracemalloc.get_traced_memory()[0]
+        candles_manager = exchange_data.CandlesManager(max_candles_count=candles_count)
+        await candles_manager.initialize()
+        candles_manager.replace_all_candles([row[-1] for row in rows])
+        gc.collect()
+        candles_manager_memory = tracemalloc.get_traced_memory()[0] - origin
+
+        origin = tracemalloc.get_traced_memory()[0]
+        history = mmap_candles_history.MemoryMappedCandlesHistory.from_ohlcv(rows, 0, candles_count * 60,
+                                                                              directory=tmp_path)
+        gc.collect()
+        history_memory = tracemalloc.get_traced_memory()[0] - origin
+    finally:
+        tracemalloc.stop()
+
+    numpy.testing.assert_array_equal(history.get_symbol_close_candles(), candles_manager.get_symbol_close_candles())
+    numpy.testing.assert_array_equal(history.get_symbol_time_candles(50),
+                                     candles_manager.get_symbol_time_candles(50))
+    # columns are not held in the python heap
+    assert history_memory < candles_manager_memory / 10
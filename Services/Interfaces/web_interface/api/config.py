@@ -16,6 +16,7 @@
 import flask
 
 import octobot_services.interfaces.util as interfaces_util
+import octobot_trading.api as trading_api
 import tentacles.Services.Interfaces.web_interface.login as login
 import tentacles.Services.Interfaces.web_interface.models as models
 import tentacles.Services.Interfaces.web_interface.util as util
@@ -34,6 +35,15 @@ def register(blueprint):
         return flask.jsonify(models.get_all_currencies([exchange]))
 
 
+    @blueprint.route('/search_symbols', methods=["GET"])
+    @login.login_required_when_activated
+    def search_symbols():
+        exchanges = flask.request.args.getlist("exchange") \
+            or trading_api.get_enabled_exchanges_names(interfaces_util.get_edited_config())
+        limit = flask.request.args.get("limit", None, type=int)
+        return flask.jsonify(models.search_symbols(exchanges, flask.request.args.get("prefix", ""), limit=limit))
+
+
     @blueprint.route('/set_config_currency', methods=["POST"])
     @login.login_required_when_activated
     def set_config_currency():
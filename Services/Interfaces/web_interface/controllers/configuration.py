@@ -60,7 +60,7 @@ def register(blueprint):
         display_intro = flask_util.BrowsingDataProvider.instance().get_and_unset_is_first_display(
             flask_util.BrowsingDataProvider.PROFILE
         )
-        exchange_symbols = sorted(models.get_symbol_list(enabled_exchanges or config_exchanges))
+        symbols_index = models.get_symbols_index(enabled_exchanges or config_exchanges)
         config_symbols = models.format_config_symbols(display_config)
         return flask.render_template(
             'profile.html',
@@ -80,7 +80,7 @@ def register(blueprint):
 
              real_trader_activated=interfaces_util.has_real_and_or_simulated_traders()[0],
 
-             symbol_list_by_type=models.get_all_symbols_list_by_symbol_type(exchange_symbols, config_symbols),
+             symbol_list_by_type=models.get_all_symbols_list_by_symbol_type(symbols_index, config_symbols),
              full_symbol_list=models.get_all_symbols_list(),
              evaluator_config=models.get_evaluator_detailed_config(media_url, missing_tentacles),
              strategy_config=models.get_strategy_config(media_url, missing_tentacles),
@@ -28,6 +28,7 @@ from tentacles.Services.Interfaces.web_interface.models import strategy_optimize
 from tentacles.Services.Interfaces.web_interface.models import tentacles
 from tentacles.Services.Interfaces.web_interface.models import trading
 from tentacles.Services.Interfaces.web_interface.models import web_interface_tab
+from tentacles.Services.Interfaces.web_interface.models import symbols_index
 
 
 from tentacles.Services.Interfaces.web_interface.models.backtesting import (
@@ -128,6 +129,8 @@ from tentacles.Services.Interfaces.web_interface.models.configuration import (
     get_enabled_trading_pairs,
     get_exchange_available_trading_pairs,
     get_symbol_list,
+    get_symbols_index,
+    search_symbols,
     get_all_currencies,
     get_config_time_frames,
     get_timeframes_list,
@@ -266,6 +269,9 @@ from tentacles.Services.Interfaces.web_interface.models.trading import (
 from tentacles.Services.Interfaces.web_interface.models.web_interface_tab import (
     WebInterfaceTab,
 )
+from tentacles.Services.Interfaces.web_interface.models.symbols_index import (
+    SymbolsIndex,
+)
 
 
 __all__ = [
@@ -357,6 +363,8 @@ __all__ = [
     "get_enabled_trading_pairs",
     "get_exchange_available_trading_pairs",
     "get_symbol_list",
+    "get_symbols_index",
+    "search_symbols",
     "get_all_currencies",
     "get_config_time_frames",
     "get_timeframes_list",
@@ -476,4 +484,5 @@ __all__ = [
     "get_config_required_candles_count",
     "get_sandbox_exchanges",
     "WebInterfaceTab",
+    "SymbolsIndex",
 ]
@@ -19,8 +19,6 @@ import os.path as path
 import ccxt
 import ccxt.async_support
 import copy
-import requests.adapters
-import urllib3.util.retry
 
 import aiohttp
 import gc
@@ -60,6 +58,7 @@ import octobot.databases_util as octobot_databases_util
 import tentacles.Services.Interfaces.web_interface.constants as constants
 import tentacles.Services.Interfaces.web_interface.models as models
 import tentacles.Services.Interfaces.web_interface.plugins as web_plugins
+import tentacles.Services.Interfaces.web_interface.models.symbols_index as symbols_index
 
 NAME_KEY = "name"
 SHORT_NAME_KEY = "n"
@@ -135,6 +134,10 @@ def _get_currency_dict(name, symbol, identifier):
 markets_by_exchanges = {}
 all_symbols_dict = {}
 exchange_logos = {}
+_SYMBOLS_INDEX_BY_EXCHANGES = {}
+# background fetches in progress, used to never block a request while waiting for remote data
+_PENDING_CURRENCY_LOGO_FETCHES = set()
+_PENDING_ALL_CURRENCIES_FETCH = []
 # can't fetch symbols from coinmarketcap.com (which is in ccxt but is not an exchange and has a paid api)
 exchange_symbol_fetch_blacklist = {"coinmarketcap"}
 _LOGGER = None
@@ -902,18 +905,32 @@ def get_exchange_available_trading_pairs(exchange_manager, profile=None) -> list
 
 
 def get_symbol_list(exchanges):
-    result = interfaces_util.run_in_bot_async_executor(_load_markets(exchanges))
-    return list(set(result))
+    return list(get_symbols_index(exchanges).symbols)
+
+
+def get_symbols_index(exchanges) -> symbols_index.SymbolsIndex:
+    symbols = interfaces_util.run_in_bot_async_executor(_load_markets(exchanges))
+    # markets are only parsed and indexed once per markets (re)load
+    key = tuple(sorted(set(exchanges)))
+    try:
+        return _SYMBOLS_INDEX_BY_EXCHANGES[key]
+    except KeyError:
+        _SYMBOLS_INDEX_BY_EXCHANGES[key] = symbols_index.SymbolsIndex(symbols)
+        return _SYMBOLS_INDEX_BY_EXCHANGES[key]
+
+
+def search_symbols(exchanges, prefix, limit=None):
+    return get_symbols_index(exchanges).search(prefix, limit=limit)
 
 
 def get_all_currencies(exchanges):
-    symbols = [
-        commons_symbols.parse_symbol(symbol)
-        for symbol in get_symbol_list(exchanges)
-    ]
-    return list(
-        set(symbol.base for symbol in symbols).union(set(symbol.quote for symbol in symbols))
-    )
+    return list(get_symbols_index(exchanges).currencies)
+
+
+def _set_exchange_markets(exchange, symbols):
+    markets_by_exchanges[exchange] = _get_filtered_exchange_symbols(symbols)
+    # markets changed: indexes have to be rebuilt
+    _SYMBOLS_INDEX_BY_EXCHANGES.clear()
 
 
 def _get_filtered_exchange_symbols(symbols):
@@ -934,7 +951,7 @@ async def _load_market(exchange, results):
                 await client.load_markets()
                 symbols = client.symbols
         # filter symbols with a "." or no "/" because bot can't handle them for now
-        markets_by_exchanges[exchange] = _get_filtered_exchange_symbols(symbols)
+        _set_exchange_markets(exchange, symbols)
         results.append(markets_by_exchanges[exchange])
     except Exception as e:
         _get_logger().exception(e, True, f"error when loading symbol list for {exchange}: {e}")
@@ -964,8 +981,8 @@ async def _load_markets(exchanges):
     for exchange in _add_merged_exchanges(exchanges):
         if exchange not in exchange_symbol_fetch_blacklist:
             if exchange in exchange_manager_by_exchange_name and exchange not in markets_by_exchanges:
-                markets_by_exchanges[exchange] = _get_filtered_exchange_symbols(
-                    trading_api.get_all_exchange_symbols(exchange_manager_by_exchange_name[exchange])
+                _set_exchange_markets(
+                    exchange, trading_api.get_all_exchange_symbols(exchange_manager_by_exchange_name[exchange])
                 )
             if exchange in markets_by_exchanges:
                 result += markets_by_exchanges[exchange]
@@ -1029,23 +1046,28 @@ def get_all_symbols_list():
     import tentacles.Services.Interfaces.web_interface.flask_util as flask_util
     data_provider = flask_util.BrowsingDataProvider.instance()
     all_currencies = copy.copy(data_provider.get_all_currencies())
-    if not all_currencies:
-        added_is = set()
-        request_response = None
-        base_error = "Failed to get currencies list from coingecko.com (this is a display only issue): "
-        try:
-            # inspired from https://github.com/man-c/pycoingecko
-            session = requests.Session()
-            retries = urllib3.util.retry.Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
-            session.mount('http://', requests.adapters.HTTPAdapter(max_retries=retries))
+    if not all_currencies and not _PENDING_ALL_CURRENCIES_FETCH:
+        # never wait for coingecko.com from a request: fetch in background, the list will be available next time
+        _PENDING_ALL_CURRENCIES_FETCH.append(True)
+        interfaces_util.run_in_bot_main_loop(_fetch_all_currencies(data_provider), blocking=False)
+    return all_currencies
+
+
+async def _fetch_all_currencies(data_provider):
+    all_currencies = []
+    added_is = set()
+    base_error = "Failed to get currencies list from coingecko.com (this is a display only issue): "
+    try:
+        # always use certify_aiohttp_client_session to avoid triggering rate limit with test request
+        async with aiohttp_util.certify_aiohttp_client_session() as session:
             # first fetch top 250 currencies then add all currencies and their ids
             for url in (f"{constants.CURRENCIES_LIST_URL}1", constants.ALL_SYMBOLS_URL):
-                request_response = session.get(url)
-                if request_response.status_code == 429:
+                currencies = await _fetch_currencies(session, url)
+                if currencies is None:
                     # rate limit issue
                     _get_logger().warning(f"{base_error}Too many requests, retry in a few seconds")
                     break
-                for currency_data in request_response.json():
+                for currency_data in currencies:
                     if _is_legit_currency(currency_data[NAME_KEY]):
                         currency_id = currency_data["id"]
                         if currency_id not in added_is:
@@ -1055,47 +1077,31 @@ def get_all_symbols_list():
                                 currency_data["symbol"],
                                 currency_id
                             ))
-            # fetched_all: save it
-            data_provider.set_all_currencies(all_currencies)
-        except Exception as e:
-            details = f"code: {request_response.status_code}, body: {request_response.text}" \
-                if request_response else {request_response}
-            _get_logger().exception(e, True, f"{base_error}{e}")
-            _get_logger().debug(f"coingecko.com response {details}")
-            return {}
-    return all_currencies
+        # fetched_all: save it
+        data_provider.set_all_currencies(all_currencies)
+    except Exception as e:
+        _get_logger().exception(e, True, f"{base_error}{e}")
+    finally:
+        _PENDING_ALL_CURRENCIES_FETCH.clear()
 
 
-def get_all_symbols_list_by_symbol_type(all_symbols, config_symbols):
-    spot = "SPOT trading"
-    linear = "Futures trading - linear"
-    inverse = "Futures trading - inverse"
-
-    def _is_of_type(symbol, trading_type):
-        parsed = commons_symbols.parse_symbol(symbol)
-        if parsed.is_spot():
-            return trading_type == spot
-        elif parsed.is_perpetual_future():
-            if trading_type == linear:
-                return parsed.is_linear()
-            if trading_type == inverse:
-                return parsed.is_inverse()
-        return False
-    symbols_by_type = {
-        trading_type: [symbol for symbol in all_symbols if _is_of_type(symbol, trading_type)]
-        for trading_type in (
-            spot, linear, inverse
-        )
-    }
-    symbols_in_config = set().union(*(
-        set(currency_details.get('pairs', [])) for currency_details in config_symbols.values()
-    ))
-    if symbols_in_config:
-        listed_symbols = set().union(*(set(symbols) for symbols in symbols_by_type.values()))
-        missing_symbols = symbols_in_config - listed_symbols
-        if missing_symbols:
-            symbols_by_type["Configured (missing on enabled exchanges)"] = list(missing_symbols)
-    return symbols_by_type
+async def _fetch_currencies(session, url, retries=3, backoff_factor=0.5):
+    for attempt in range(retries + 1):
+        async with session.get(url) as resp:
+            if resp.status == 429:
+                return None
+            if resp.status in (502, 503, 504) and attempt < retries:
+                await asyncio.sleep(backoff_factor * (2 ** attempt))
+                continue
+            if resp.status != 200:
+                _get_logger().debug(f"coingecko.com response code: {resp.status}, body: {await resp.text()}")
+            return await resp.json()
+
+
+def get_all_symbols_list_by_symbol_type(symbols_index_or_symbols, config_symbols):
+    index = symbols_index_or_symbols if isinstance(symbols_index_or_symbols, symbols_index.SymbolsIndex) \
+        else symbols_index.SymbolsIndex(symbols_index_or_symbols)
+    return index.get_symbols_by_type(config_symbols)
 
 
 def get_exchange_logo(exchange_name):
@@ -1145,26 +1151,36 @@ async def _fetch_currency_logo(session, data_provider, currency_id):
 
 
 async def _fetch_missing_currency_logos(data_provider, currency_ids):
-    # always use certify_aiohttp_client_session to avoid triggering rate limit with test request
-    async with aiohttp_util.certify_aiohttp_client_session() as session:
-        await asyncio.gather(
-            *(
-                _fetch_currency_logo(session, data_provider, currency_id)
-                for currency_id in currency_ids
-                if data_provider.get_currency_logo_url(currency_id) is None
+    try:
+        # always use certify_aiohttp_client_session to avoid triggering rate limit with test request
+        async with aiohttp_util.certify_aiohttp_client_session() as session:
+            await asyncio.gather(
+                *(
+                    _fetch_currency_logo(session, data_provider, currency_id)
+                    for currency_id in currency_ids
+                    if data_provider.get_currency_logo_url(currency_id) is None
+                )
             )
-        )
-    data_provider.dump_saved_data()
+        data_provider.dump_saved_data()
+    finally:
+        _PENDING_CURRENCY_LOGO_FETCHES.difference_update(currency_ids)
 
 
 def get_currency_logo_urls(currency_ids):
     import tentacles.Services.Interfaces.web_interface.flask_util as flask_util
     data_provider = flask_util.BrowsingDataProvider.instance()
-    if any(
-        data_provider.get_currency_logo_url(currency_id) is None
+    to_fetch = [
+        currency_id
         for currency_id in currency_ids
-    ):
-        interfaces_util.run_in_bot_async_executor(_fetch_missing_currency_logos(data_provider, currency_ids))
+        if data_provider.get_currency_logo_url(currency_id) is None
+        and currency_id not in _PENDING_CURRENCY_LOGO_FETCHES
+    ]
+    if to_fetch:
+        # never wait for logos from a request: missing logos will be available on next call
+        _PENDING_CURRENCY_LOGO_FETCHES.update(to_fetch)
+        interfaces_util.run_in_bot_main_loop(
+            _fetch_missing_currency_logos(data_provider, to_fetch), blocking=False
+        )
     return [
         {
             "id": currency_id,
@@ -0,0 +1,98 @@
+#  Drakkar-Software OctoBot-Interfaces
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import bisect
+
+import octobot_commons.symbols as commons_symbols
+
+
+SPOT_SYMBOLS = "SPOT trading"
+LINEAR_SYMBOLS = "Futures trading - linear"
+INVERSE_SYMBOLS = "Futures trading - inverse"
+MISSING_CONFIGURED_SYMBOLS = "Configured (missing on enabled exchanges)"
+
+
+class SymbolsIndex:
+    """
+    Symbols parsed once (when markets are (re)loaded) and indexed by trading type and by prefix
+    """
+    def __init__(self, symbols):
+        self.symbols = sorted(set(symbols))
+        self.parsed_symbols = {
+            symbol: commons_symbols.parse_symbol(symbol)
+            for symbol in self.symbols
+        }
+        self.currencies = set()
+        self.symbols_by_type = {
+            SPOT_SYMBOLS: [],
+            LINEAR_SYMBOLS: [],
+            INVERSE_SYMBOLS: [],
+        }
+        # (upper case search key, symbol) sorted by search key to allow prefix search using bisect
+        self._search_keys = []
+        self._index()
+
+    def _index(self):
+        for symbol, parsed in self.parsed_symbols.items():
+            self.currencies.add(parsed.base)
+            self.currencies.add(parsed.quote)
+            trading_type = self._get_trading_type(parsed)
+            if trading_type is not None:
+                self.symbols_by_type[trading_type].append(symbol)
+            self._search_keys.append((symbol.upper(), symbol))
+            if parsed.quote:
+                # also find symbols from their quote: "USDT" => "BTC/USDT"
+                self._search_keys.append((parsed.quote.upper(), symbol))
+        self._search_keys.sort()
+
+    @staticmethod
+    def _get_trading_type(parsed_symbol):
+        if parsed_symbol.is_spot():
+            return SPOT_SYMBOLS
+        if parsed_symbol.is_perpetual_future():
+            if parsed_symbol.is_linear():
+                return LINEAR_SYMBOLS
+            if parsed_symbol.is_inverse():
+                return INVERSE_SYMBOLS
+        return None
+
+    def get_symbols_by_type(self, config_symbols):
+        symbols_by_type = {
+            trading_type: list(symbols)
+            for trading_type, symbols in self.symbols_by_type.items()
+        }
+        symbols_in_config = set().union(*(
+            set(currency_details.get('pairs', [])) for currency_details in config_symbols.values()
+        ))
+        if symbols_in_config:
+            listed_symbols = set().union(*(set(symbols) for symbols in symbols_by_type.values()))
+            missing_symbols = symbols_in_config - listed_symbols
+            if missing_symbols:
+                symbols_by_type[MISSING_CONFIGURED_SYMBOLS] = list(missing_symbols)
+        return symbols_by_type
+
+    def search(self, prefix, limit=None):
+        """
+        :return: the sorted symbols starting with prefix or which quote starts with prefix
+        """
+        prefix = prefix.upper()
+        found = set()
+        start = bisect.bisect_left(self._search_keys, (prefix, ""))
+        for key, symbol in self._search_keys[start:]:
+            if not key.startswith(prefix):
+                break
+            found.add(symbol)
+        found = sorted(found)
+        return found if limit is None else found[:limit]
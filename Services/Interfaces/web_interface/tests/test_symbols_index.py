@@ -0,0 +1,58 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import tentacles.Services.Interfaces.web_interface.models.symbols_index as symbols_index
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "ETH/BTC", "BTC/USDT:USDT", "BTC/USD:BTC", "ETH/USDT", "BTC/USDT:USDT-240628"]
+
+
+def test_symbols_index():
+    index = symbols_index.SymbolsIndex(SYMBOLS)
+    assert index.symbols == sorted(set(SYMBOLS))
+    assert index.currencies == {"BTC", "ETH", "USDT", "USD"}
+
+
+def test_get_symbols_by_type():
+    index = symbols_index.SymbolsIndex(SYMBOLS)
+    assert index.get_symbols_by_type({}) == {
+        symbols_index.SPOT_SYMBOLS: ["BTC/USDT", "ETH/BTC", "ETH/USDT"],
+        symbols_index.LINEAR_SYMBOLS: ["BTC/USDT:USDT"],
+        symbols_index.INVERSE_SYMBOLS: ["BTC/USD:BTC"],
+    }
+    symbols_by_type = index.get_symbols_by_type({
+        "Bitcoin": {"pairs": ["BTC/USDT", "BTC/EUR"]},
+        "Ethereum": {"pairs": ["ETH/USDT"]},
+        "Solana": {},
+    })
+    assert symbols_by_type[symbols_index.MISSING_CONFIGURED_SYMBOLS] == ["BTC/EUR"]
+    # index buckets are not modified
+    assert symbols_index.MISSING_CONFIGURED_SYMBOLS not in index.symbols_by_type
+    symbols_by_type[symbols_index.SPOT_SYMBOLS].clear()
+    assert index.symbols_by_type[symbols_index.SPOT_SYMBOLS] == ["BTC/USDT", "ETH/BTC", "ETH/USDT"]
+
+
+def test_search():
+    index = symbols_index.SymbolsIndex(SYMBOLS)
+    assert index.search("btc/") == ["BTC/USD:BTC", "BTC/USDT", "BTC/USDT:USDT", "BTC/USDT:USDT-240628"]
+    assert index.search("BTC/USDT:") == ["BTC/USDT:USDT", "BTC/USDT:USDT-240628"]
+    # symbols are also found from their quote
+    assert index.search("btc") == [
+        "BTC/USD:BTC", "BTC/USDT", "BTC/USDT:USDT", "BTC/USDT:USDT-240628", "ETH/BTC"
+    ]
+    assert index.search("USDT") == ["BTC/USDT", "BTC/USDT:USDT", "BTC/USDT:USDT-240628", "ETH/USDT"]
+    assert index.search("ETH", limit=2) == ["ETH/BTC", "ETH/USDT"]
+    assert index.search("ETH", limit=1) == ["ETH/BTC"]
+    assert index.search("XRP") == []
+    assert index.search("") == sorted(set(SYMBOLS))
@@ -0,0 +1 @@
+from .notification_delivery import NotificationDeliveryQueue
\ No newline at end of file
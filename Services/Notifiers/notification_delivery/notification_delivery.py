@@ -0,0 +1,225 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import datetime
+import heapq
+import time
+
+import octobot_services.enums as services_enums
+
+
+class NotificationDeliveryQueue:
+    """
+    Notifier-side delivery queue: notifications are queued without waiting for any service API call and
+    delivered from a background task.
+    - deliveries are rate limited using a token bucket of max_deliveries_per_period deliveries per delivery_period
+    - critical and error notifications are delivered first and never coalesced
+    - the first notification of a type is delivered right away, the following ones of the same type received
+    within coalescing_delay are coalesced and delivered together as a digest
+    - deliveries throttled by the service (errors with a retry_after attribute) are retried after the given delay
+    deliver_callback(notifications) is called with the list of notifications to deliver in a single message.
+    """
+    HIGH_PRIORITY = 0
+    NORMAL_PRIORITY = 1
+    LOW_PRIORITY = 2
+    PRIORITY_BY_LEVEL = {
+        services_enums.NotificationLevel.CRITICAL: HIGH_PRIORITY,
+        services_enums.NotificationLevel.ERROR: HIGH_PRIORITY,
+        services_enums.NotificationLevel.WARNING: NORMAL_PRIORITY,
+        services_enums.NotificationLevel.SUCCESS: NORMAL_PRIORITY,
+        services_enums.NotificationLevel.INFO: LOW_PRIORITY,
+    }
+
+    def __init__(self, deliver_callback, logger, max_deliveries_per_period, delivery_period,
+                 coalescing_delay=5, max_coalesced_notifications=20, max_pending_deliveries=1000,
+                 max_delivery_attempts=3):
+        self.deliver_callback = deliver_callback
+        self.logger = logger
+        self.max_deliveries_per_period = max_deliveries_per_period
+        self.delivery_period = delivery_period
+        self.coalescing_delay = coalescing_delay
+        self.max_coalesced_notifications = max_coalesced_notifications
+        self.max_pending_deliveries = max_pending_deliveries
+        self.max_delivery_attempts = max_delivery_attempts
+        self.delivered_messages = 0
+        self.dropped_notifications = 0
+
+        self._deliveries = []
+        self._delivery_index = 0
+        # coalescing windows by notification type: [window end time, notifications received during the window]
+        self._coalescing_windows = {}
+        self._tokens = max_deliveries_per_period
+        self._last_refill_time = time.monotonic()
+        self._paused_until = 0
+        self._new_delivery = None
+        self._delivery_task = None
+
+    def put(self, notification):
+        """
+        Queues the notification for delivery, never waits for its delivery
+        """
+        priority = self._get_priority(notification)
+        if priority != self.HIGH_PRIORITY and self.coalescing_delay > 0:
+            notification_type = (notification.__class__, notification.category)
+            try:
+                window = self._coalescing_windows[notification_type]
+            except KeyError:
+                # first notification of this type: deliver it right away and coalesce the next ones
+                self._coalescing_windows[notification_type] = [time.monotonic() + self.coalescing_delay, []]
+            else:
+                window[1].append(notification)
+                if len(window[1]) >= self.max_coalesced_notifications:
+                    self._queue_delivery(window[1])
+                    window[1] = []
+                self._ensure_delivery_task()
+                return
+        self._queue_delivery([notification])
+        self._ensure_delivery_task()
+
+    def get_pending_deliveries_count(self) -> int:
+        return len(self._deliveries)
+
+    async def stop(self, flush_timeout=None):
+        """
+        Stops the delivery task
+        :param flush_timeout: when set, pending notifications, including the ones of open coalescing windows,
+        are delivered for up to flush_timeout seconds before stopping
+        """
+        if self._delivery_task is not None and not self._delivery_task.done():
+            self._delivery_task.cancel()
+            try:
+                await self._delivery_task
+            except asyncio.CancelledError:
+                pass
+        self._delivery_task = None
+        if flush_timeout is not None:
+            for window in self._coalescing_windows.values():
+                if window[1]:
+                    self._queue_delivery(window[1])
+            self._coalescing_windows = {}
+            try:
+                await asyncio.wait_for(self._flush(), flush_timeout)
+            except asyncio.TimeoutError:
+                pass
+        if self._deliveries:
+            dropped_notifications = sum(len(notifications) for _, _, notifications, _ in self._deliveries)
+            self.dropped_notifications += dropped_notifications
+            self.logger.warning(f"Stopping: {dropped_notifications} notification(s) are not delivered.")
+            self._deliveries = []
+
+    async def _flush(self):
+        while self._deliveries:
+            delay = self._get_delivery_delay(time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            await self._deliver_next()
+
+    def _ensure_delivery_task(self):
+        if self._new_delivery is None:
+            self._new_delivery = asyncio.Event()
+        self._new_delivery.set()
+        if self._delivery_task is None or self._delivery_task.done():
+            self._delivery_task = asyncio.create_task(self._deliver_notifications())
+
+    def _get_priority(self, notification) -> int:
+        return self.PRIORITY_BY_LEVEL.get(notification.level, self.NORMAL_PRIORITY)
+
+    def _queue_delivery(self, notifications, attempt=1, delivery_index=None):
+        priority = min(self._get_priority(notification) for notification in notifications)
+        if len(self._deliveries) >= self.max_pending_deliveries and priority != self.HIGH_PRIORITY:
+            self.dropped_notifications += len(notifications)
+            self.logger.warning(f"Too many pending notifications, dropping {len(notifications)} notification(s).")
+            return
+        if delivery_index is None:
+            self._delivery_index += 1
+            delivery_index = self._delivery_index
+        heapq.heappush(self._deliveries, (priority, delivery_index, notifications, attempt))
+
+    def _queue_coalesced_notifications(self, current_time):
+        for notification_type, window in list(self._coalescing_windows.items()):
+            if window[0] <= current_time:
+                if window[1]:
+                    self._queue_delivery(window[1])
+                    self._coalescing_windows[notification_type] = [current_time + self.coalescing_delay, []]
+                else:
+                    self._coalescing_windows.pop(notification_type)
+
+    def _get_next_window_end_delay(self, current_time):
+        if not self._coalescing_windows:
+            return None
+        return max(0, min(window[0] for window in self._coalescing_windows.values()) - current_time)
+
+    def _get_delivery_delay(self, current_time) -> float:
+        self._tokens = min(
+            self.max_deliveries_per_period,
+            self._tokens +
+            (current_time - self._last_refill_time) * self.max_deliveries_per_period / self.delivery_period
+        )
+        self._last_refill_time = current_time
+        if current_time < self._paused_until:
+            return self._paused_until - current_time
+        if self._tokens >= 1:
+            return 0
+        return (1 - self._tokens) * self.delivery_period / self.max_deliveries_per_period
+
+    async def _deliver_notifications(self):
+        while True:
+            current_time = time.monotonic()
+            self._queue_coalesced_notifications(current_time)
+            if not self._deliveries:
+                self._new_delivery.clear()
+                try:
+                    await asyncio.wait_for(self._new_delivery.wait(), self._get_next_window_end_delay(current_time))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            delay = self._get_delivery_delay(current_time)
+            if delay > 0:
+                # wait before popping the next delivery: higher priority ones can be queued in the meantime
+                await asyncio.sleep(delay)
+                continue
+            await self._deliver_next()
+
+    async def _deliver_next(self):
+        _, delivery_index, notifications, attempt = heapq.heappop(self._deliveries)
+        self._tokens -= 1
+        await self._deliver(notifications, attempt, delivery_index)
+
+    async def _deliver(self, notifications, attempt, delivery_index):
+        try:
+            await self.deliver_callback(notifications)
+            self.delivered_messages += 1
+        except asyncio.CancelledError:
+            # stopped while delivering: keep the notifications to deliver them when flushing
+            self._queue_delivery(notifications, attempt=attempt, delivery_index=delivery_index)
+            raise
+        except Exception as err:
+            retry_after = self._get_retry_after(err)
+            if retry_after is not None and attempt < self.max_delivery_attempts:
+                self.logger.warning(f"Notifications delivery is throttled, retrying in {retry_after} seconds.")
+                self._paused_until = time.monotonic() + retry_after
+                # retry before the following deliveries
+                self._queue_delivery(notifications, attempt=attempt + 1, delivery_index=delivery_index)
+            else:
+                self.logger.exception(err, True, f"Error when delivering {len(notifications)} notification(s): {err}")
+
+    @staticmethod
+    def _get_retry_after(err):
+        retry_after = getattr(err, "retry_after", None)
+        if isinstance(retry_after, datetime.timedelta):
+            return retry_after.total_seconds()
+        return retry_after
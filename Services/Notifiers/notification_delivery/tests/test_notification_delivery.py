@@ -0,0 +1,142 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import pytest
+
+import octobot_commons.enums as commons_enums
+import octobot_commons.logging as logging
+import octobot_services.enums as services_enums
+import octobot_services.notification as notification
+from tentacles.Services.Notifiers.notification_delivery import NotificationDeliveryQueue
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+class _FilledOrderNotification(notification.Notification):
+    pass
+
+
+def _notification(text, level=services_enums.NotificationLevel.INFO, notification_class=_FilledOrderNotification):
+    return notification_class(text, "", "", services_enums.NotificationSound.NO_SOUND,
+                              commons_enums.MarkdownFormat.NONE, level,
+                              services_enums.NotificationCategory.TRADES, None)
+
+
+class _Throttled(Exception):
+    def __init__(self, retry_after):
+        super().__init__()
+        self.retry_after = retry_after
+
+
+class _Recorder:
+    def __init__(self, throttled_deliveries=0):
+        self.deliveries = []
+        self.throttled_deliveries = throttled_deliveries
+
+    async def deliver(self, notifications):
+        if self.throttled_deliveries:
+            self.throttled_deliveries -= 1
+            raise _Throttled(0.1)
+        self.deliveries.append([n.text for n in notifications])
+
+
+def _queue(recorder, **kwargs):
+    return NotificationDeliveryQueue(recorder.deliver, logging.get_logger("NotificationDeliveryQueueTest"),
+                                     **kwargs)
+
+
+async def test_coalescing_and_priorities():
+    recorder = _Recorder()
+    queue = _queue(recorder, max_deliveries_per_period=100, delivery_period=1, coalescing_delay=0.2,
+                   max_coalesced_notifications=10)
+    try:
+        for i in range(25):
+            queue.put(_notification(f"fill {i}"))
+        queue.put(_notification("other type", notification_class=notification.Notification))
+        queue.put(_notification("error", level=services_enums.NotificationLevel.ERROR))
+        await asyncio.sleep(0.4)
+        assert recorder.deliveries == [
+            # error is delivered first, other type is not coalesced with fills
+            ["error"], ["fill 0"], [f"fill {i}" for i in range(1, 11)], [f"fill {i}" for i in range(11, 21)],
+            ["other type"], [f"fill {i}" for i in range(21, 25)],
+        ]
+        assert queue.get_pending_deliveries_count() == 0
+        # coalescing window is closed: next notification is delivered right away
+        await asyncio.sleep(0.3)
+        queue.put(_notification("fill 25"))
+        await asyncio.sleep(0.05)
+        assert recorder.deliveries[-1] == ["fill 25"]
+    finally:
+        await queue.stop()
+
+
+async def test_rate_limit_and_throttling():
+    recorder = _Recorder(throttled_deliveries=1)
+    queue = _queue(recorder, max_deliveries_per_period=5, delivery_period=0.5, coalescing_delay=0)
+    try:
+        for i in range(15):
+            queue.put(_notification(f"notification {i}"))
+        await asyncio.sleep(0.05)
+        # throttled delivery is retried after 0.1s
+        assert recorder.deliveries == []
+        await asyncio.sleep(0.45)
+        # 5 deliveries burst then 10 deliveries per second
+        assert 5 < len(recorder.deliveries) < 15
+        await asyncio.sleep(1)
+        assert recorder.deliveries == [[f"notification {i}"] for i in range(15)]
+    finally:
+        await queue.stop()
+
+
+async def test_bounded_pending_deliveries():
+    recorder = _Recorder()
+    queue = _queue(recorder, max_deliveries_per_period=1, delivery_period=10, coalescing_delay=0,
+                   max_pending_deliveries=10)
+    try:
+        for i in range(20):
+            queue.put(_notification(f"notification {i}"))
+        queue.put(_notification("critical", level=services_enums.NotificationLevel.CRITICAL))
+        assert queue.dropped_notifications == 10
+        assert queue.get_pending_deliveries_count() == 11
+        await asyncio.sleep(0.05)
+        assert recorder.deliveries[0] == ["critical"]
+    finally:
+        await queue.stop()
+
+
+async def test_stop():
+    recorder = _Recorder()
+    queue = _queue(recorder, max_deliveries_per_period=100, delivery_period=1, coalescing_delay=10)
+    for i in range(3):
+        queue.put(_notification(f"fill {i}"))
+    await asyncio.sleep(0.05)
+    # coalesced notifications are delivered when stopping
+    await queue.stop(flush_timeout=1)
+    assert recorder.deliveries == [["fill 0"], ["fill 1", "fill 2"]]
+    assert queue.dropped_notifications == 0
+
+    recorder = _Recorder()
+    queue = _queue(recorder, max_deliveries_per_period=1, delivery_period=10, coalescing_delay=0)
+    for i in range(3):
+        queue.put(_notification(f"notification {i}"))
+    await asyncio.sleep(0.05)
+    # rate limited: pending notifications can't be delivered in time
+    await queue.stop(flush_timeout=0.1)
+    assert recorder.deliveries == [["notification 0"]]
+    assert queue.dropped_notifications == 2
+    assert queue.get_pending_deliveries_count() == 0
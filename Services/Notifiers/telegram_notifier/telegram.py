@@ -13,29 +13,90 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import telegram.constants
+
 import octobot_commons.enums as commons_enums
 import octobot_services.notification as notification
 import octobot_services.notifier as notifier
 import tentacles.Services.Services_bases as Services_bases
+import tentacles.Services.Notifiers.notification_delivery as notification_delivery
 
 
 class TelegramNotifier(notifier.AbstractNotifier):
     REQUIRED_SERVICES = [Services_bases.TelegramService]
     NOTIFICATION_TYPE_KEY = "telegram"
     USE_MAIN_LOOP = True
+    # telegram bots should not send more than 20 messages per minute to the same group
+    MAX_MESSAGES_PER_PERIOD = 20
+    MESSAGES_PERIOD = 60
+    # notifications of the same type received within this delay are sent in a single message
+    COALESCING_DELAY = 5
+    DIGEST_SEPARATOR = "\n\n"
+    MAX_MESSAGE_LENGTH = telegram.constants.MessageLimit.MAX_TEXT_LENGTH
+    # maximum time to send pending notifications when stopping
+    STOP_FLUSH_TIMEOUT = 10
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.delivery_queue = notification_delivery.NotificationDeliveryQueue(
+            self._deliver_notifications, self.logger, self.MAX_MESSAGES_PER_PERIOD, self.MESSAGES_PERIOD,
+            coalescing_delay=self.COALESCING_DELAY
+        )
+
+    async def _initialize_impl(self, backtesting_enabled, edited_config) -> bool:
+        if await super()._initialize_impl(backtesting_enabled, edited_config):
+            self.services[0].register_stop_callback(self.stop)
+            return True
+        return False
+
+    async def stop(self):
+        # send pending notifications while the telegram service is still connected
+        await self.delivery_queue.stop(
+            flush_timeout=self.STOP_FLUSH_TIMEOUT if self.services and self.services[0].connected else None
+        )
 
     async def _handle_notification(self, notification: notification.Notification):
-        self.logger.debug(f"sending notification: {notification}")
-        text, use_markdown = self._get_message_text(notification)
-        await self._send_message(notification, text, use_markdown)
-
-    async def _send_message(self, notification, text, use_markdown):
-        try:
-            previous_message_id = notification.linked_notification.metadata[self.NOTIFICATION_TYPE_KEY].message_id \
-                if notification.linked_notification and \
-                   self.NOTIFICATION_TYPE_KEY in notification.linked_notification.metadata else None
-        except (KeyError, AttributeError):
-            previous_message_id = None
+        self.logger.debug(f"queuing notification: {notification}")
+        self.delivery_queue.put(notification)
+
+    async def _deliver_notifications(self, notifications):
+        for message_notifications in self._split_by_message(notifications):
+            if len(message_notifications) == 1:
+                text, use_markdown = self._get_message_text(message_notifications[0])
+            else:
+                text, use_markdown = self._get_digest_text(message_notifications)
+            await self._send_message(message_notifications, text, use_markdown)
+
+    @classmethod
+    def _split_by_message(cls, notifications):
+        """
+        :return: notifications grouped in digests that fit in a telegram message
+        """
+        digests = [[]]
+        digest_length = 0
+        for notification in notifications:
+            # count the longest text between the markdown and the regular one
+            text_length = max(
+                len(cls._get_message_text(notification)[0]),
+                len(f"{notification.title}\n{notification.text}" if notification.title else notification.text)
+            )
+            if digests[-1] and digest_length + len(cls.DIGEST_SEPARATOR) + text_length > cls.MAX_MESSAGE_LENGTH:
+                digests.append([])
+                digest_length = 0
+            digest_length += (len(cls.DIGEST_SEPARATOR) if digests[-1] else 0) + text_length
+            digests[-1].append(notification)
+        return digests
+
+    async def _send_message(self, notifications, text, use_markdown):
+        # a digest replies to the message of its first linked notification
+        previous_message_id = None
+        for notification in notifications:
+            try:
+                previous_message_id = notification.linked_notification.metadata[self.NOTIFICATION_TYPE_KEY]\
+                    .message_id
+                break
+            except (KeyError, AttributeError):
+                pass
         sent_message = await self.services[0].send_message(text,
                                                            markdown=use_markdown,
                                                            reply_to_message_id=previous_message_id)
@@ -45,7 +106,19 @@ class TelegramNotifier(notifier.AbstractNotifier):
             sent_message = await self.services[0].send_message(text,
                                                                markdown=use_markdown,
                                                                reply_to_message_id=None)
-        notification.metadata[self.NOTIFICATION_TYPE_KEY] = sent_message
+        for notification in notifications:
+            notification.metadata[self.NOTIFICATION_TYPE_KEY] = sent_message
+
+    @classmethod
+    def _get_digest_text(cls, notifications):
+        texts, use_markdowns = zip(*(cls._get_message_text(notification) for notification in notifications))
+        use_markdown = all(use_markdowns)
+        if not use_markdown:
+            texts = [
+                f"{notification.title}\n{notification.text}" if notification.title else notification.text
+                for notification in notifications
+            ]
+        return cls.DIGEST_SEPARATOR.join(texts), use_markdown
 
     @staticmethod
     def _get_message_text(notification):
@@ -0,0 +1,200 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import json
+import time
+import types
+
+import aiohttp.web
+import mock
+import pytest
+import telegram
+
+import octobot_commons.enums as commons_enums
+import octobot_commons.logging as logging
+import octobot_commons.singleton as singleton
+import octobot_services.enums as services_enums
+import octobot_services.notification as notification
+import tentacles.Services.Services_bases as Services_bases
+from tentacles.Services.Notifiers.telegram_notifier import TelegramNotifier
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+TOKEN = "123:fake"
+
+
+class _FilledOrderNotification(notification.Notification):
+    pass
+
+
+def _notification(text, level=services_enums.NotificationLevel.INFO, linked_notification=None):
+    return _FilledOrderNotification(text, "Order update", "", services_enums.NotificationSound.NO_SOUND,
+                                    commons_enums.MarkdownFormat.IGNORE, level,
+                                    services_enums.NotificationCategory.TRADES, linked_notification)
+
+
+class _FakeTelegramEndpoint:
+    def __init__(self, throttled_messages=0):
+        self.messages = []
+        self.throttled_messages = throttled_messages
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = aiohttp.web.Application()
+        app.router.add_post(f"/bot{TOKEN}/{{method}}", self._handle)
+        self.runner = aiohttp.web.AppRunner(app)
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/bot"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _handle(self, request):
+        method = request.match_info["method"]
+        if method == "getMe":
+            return aiohttp.web.json_response({"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "OctoBot", "username": "octobot_bot"
+            }})
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        if self.throttled_messages:
+            self.throttled_messages -= 1
+            return aiohttp.web.json_response({
+                "ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1}
+            }, status=429)
+        self.messages.append(params)
+        return aiohttp.web.json_response({"ok": True, "result": {
+            "message_id": len(self.messages), "date": int(time.time()),
+            "chat": {"id": int(params["chat_id"]), "type": "private"}, "text": params["text"],
+        }})
+
+
+async def _notifier(endpoint):
+    singleton.Singleton._instances.pop(Services_bases.TelegramService, None)
+    service = Services_bases.TelegramService.instance()
+    service.logger = logging.get_logger(Services_bases.TelegramService.get_name())
+    service.chat_id = 42
+    bot = telegram.Bot(TOKEN, base_url=endpoint.url)
+    await bot.initialize()
+    # only the bot of the telegram application is used to send messages
+    service.telegram_app = types.SimpleNamespace(bot=bot)
+    notifier = TelegramNotifier({})
+    notifier.services = [service]
+    return notifier, bot
+
+
+async def test_grid_fills_burst():
+    endpoint = _FakeTelegramEndpoint(throttled_messages=1)
+    await endpoint.start()
+    notifier = bot = None
+    try:
+        notifier, bot = await _notifier(endpoint)
+        notifier.delivery_queue.coalescing_delay = 0.5
+        notifier.delivery_queue.max_pending_deliveries = 100
+        created_order_notification = _notification("order created")
+        await notifier._handle_notification(created_order_notification)
+        await asyncio.sleep(1.5)
+        assert created_order_notification.metadata[TelegramNotifier.NOTIFICATION_TYPE_KEY].message_id == 1
+
+        # 50 fills within a second, the first one is linked to the created order message
+        fills = [
+            _notification(f"fill {i}", linked_notification=created_order_notification if i == 0 else None)
+            for i in range(50)
+        ]
+        for i, fill in enumerate(fills):
+            await notifier._handle_notification(fill)
+            if i == 25:
+                await notifier._handle_notification(
+                    _notification("exchange error", level=services_enums.NotificationLevel.ERROR)
+                )
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(1)
+        assert notifier.delivery_queue.get_pending_deliveries_count() == 0
+
+        texts = [params["text"] for params in endpoint.messages]
+        assert texts[0] == "`Order update`\norder created"
+        assert texts[1] == "`Order update`\nfill 0"
+        assert json.loads(endpoint.messages[1]["reply_parameters"])["message_id"] == 1
+        # error is not coalesced and sent before the fills received after it
+        error_index = texts.index("`Order update`\nexchange error")
+        assert all("fill 49" not in text for text in texts[:error_index])
+        # 52 notifications in a few messages
+        assert len(texts) < 10
+        # every fill is sent once
+        assert sorted(
+            int(line.split(" ")[-1]) for text in texts[1:] for line in text.split("\n") if line.startswith("fill")
+        ) == list(range(50))
+        assert all(fill.metadata[TelegramNotifier.NOTIFICATION_TYPE_KEY] is not None for fill in fills)
+    finally:
+        if notifier is not None:
+            await notifier.delivery_queue.stop()
+        if bot is not None:
+            await bot.shutdown()
+        await endpoint.stop()
+        singleton.Singleton._instances.pop(Services_bases.TelegramService, None)
+
+
+async def test_stop_sends_pending_digest():
+    endpoint = _FakeTelegramEndpoint()
+    await endpoint.start()
+    notifier = bot = None
+    try:
+        notifier, bot = await _notifier(endpoint)
+        service = notifier.services[0]
+        service.connected = True
+        service.telegram_app.shutdown = mock.AsyncMock()
+        service.telegram_app.post_shutdown = None
+        service.register_stop_callback(notifier.stop)
+        fills = [_notification(f"fill {i}") for i in range(3)]
+        for fill in fills:
+            await notifier._handle_notification(fill)
+        await asyncio.sleep(0.1)
+        assert len(endpoint.messages) == 1
+        # stopping the service sends the pending digest before disconnecting
+        await service.stop()
+        service.telegram_app.shutdown.assert_awaited_once()
+        assert [params["text"] for params in endpoint.messages] == [
+            "`Order update`\nfill 0", "`Order update`\nfill 1\n\n`Order update`\nfill 2"
+        ]
+        assert all(fill.metadata[TelegramNotifier.NOTIFICATION_TYPE_KEY] is not None for fill in fills)
+    finally:
+        if notifier is not None:
+            await notifier.delivery_queue.stop()
+        if bot is not None:
+            await bot.shutdown()
+        await endpoint.stop()
+        singleton.Singleton._instances.pop(Services_bases.TelegramService, None)
+
+
+async def test_digests_fit_in_telegram_messages():
+    notifications = [_notification(f"fill {i} " + "x" * 1000) for i in range(10)]
+    digests = TelegramNotifier._split_by_message(notifications)
+    assert [len(digest) for digest in digests] == [4, 4, 2]
+    assert [notification for digest in digests for notification in digest] == notifications
+    assert all(
+        len(TelegramNotifier._get_digest_text(digest)[0]) <= TelegramNotifier.MAX_MESSAGE_LENGTH == 4096
+        for digest in digests
+    )
+    # a single notification is never split
+    long_notification = _notification("x" * 5000)
+    assert TelegramNotifier._split_by_message([long_notification]) == [[long_notification]]
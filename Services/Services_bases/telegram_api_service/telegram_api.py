@@ -144,8 +144,11 @@ class TelegramApiService(services.AbstractService):
             self.logger.error(f"Failed to send message : {e}")
         return None
 
+    def get_downloads_folder(self, source=""):
+        return os.path.join(self.tentacle_resources_path, self.DOWNLOADS_FOLDER, source)
+
     async def download_media_from_message(self, message, source=""):
-        downloads_folder = os.path.join(self.tentacle_resources_path, self.DOWNLOADS_FOLDER, source)
+        downloads_folder = self.get_downloads_folder(source)
         if not os.path.exists(downloads_folder):
             os.makedirs(downloads_folder)
         await self.telegram_client.download_media(message=message, file=downloads_folder)
@@ -38,6 +38,7 @@ class TelegramService(services.AbstractService):
         self.chat_id = None
         self.users = []
         self.text_chat_dispatcher = {}
+        self.stop_callbacks = []
         self._bot_url = None
         self.connected = False
 
@@ -151,6 +152,9 @@ class TelegramService(services.AbstractService):
             telegram.ext.MessageHandler(telegram.ext.filters.TEXT, self.text_handler)
         )
 
+    def register_stop_callback(self, callback):
+        self.stop_callbacks.append(callback)
+
     def add_handlers(self, handlers):
         self.telegram_app.add_handlers(handlers)
 
@@ -185,6 +189,9 @@ class TelegramService(services.AbstractService):
         return self.telegram_app
 
     async def stop(self):
+        # let service users send their last messages before disconnecting
+        for stop_callback in self.stop_callbacks:
+            await stop_callback()
         if self.connected:
             if self._has_bot:
                 await self._stop_bot()
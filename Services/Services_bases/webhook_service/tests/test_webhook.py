@@ -0,0 +1,145 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import socket
+
+import aiohttp
+import pytest
+
+import octobot_commons.logging as logging
+
+from tentacles.Services.Services_bases.webhook_service import WebHookService
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+FEED_NAME = "test_feed"
+TOKEN = "123"
+
+
+def _get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _start_service(batch_callback, intake_queue_size=None):
+    service = WebHookService()
+    service.logger = logging.get_logger(WebHookService.get_name())
+    service.use_web_interface_for_webhook = False
+    service.ngrok_enabled = False
+    service.webhook_host = "127.0.0.1"
+    service.webhook_port = _get_free_port()
+    if intake_queue_size is not None:
+        service.INTAKE_QUEUE_SIZE = intake_queue_size
+
+    async def _callback(_):
+        raise AssertionError("batch callback should be used")
+
+    service.subscribe_feed(FEED_NAME, _callback, lambda data: f"TOKEN={TOKEN}" in data, batch_callback=batch_callback)
+    assert await service.start_webhooks() is True
+    return service
+
+
+async def _post(session, url, data):
+    async with session.post(url, data=data) as response:
+        await response.read()
+        return response.status
+
+
+async def _wait_for_dispatch(service, expected_count):
+    stats = service.get_feed_stats(FEED_NAME)
+    for _ in range(500):
+        if stats.dispatched >= expected_count:
+            return
+        await asyncio.sleep(0.01)
+
+
+async def test_invalid_calls():
+    received = []
+
+    async def _batch_callback(data_list):
+        received.extend(data_list)
+
+    service = await _start_service(_batch_callback)
+    try:
+        async with aiohttp.ClientSession() as session:
+            assert await _post(session, f"{service.get_subscribe_url(FEED_NAME)}", "TOKEN=1") == 400
+            assert await _post(session, f"{service.webhook_public_url}/other", f"TOKEN={TOKEN}") == 400
+            assert await _post(session, f"{service.get_subscribe_url(FEED_NAME)}", f"a\nTOKEN={TOKEN}") == 200
+        await _wait_for_dispatch(service, 1)
+        assert received == [f"a\nTOKEN={TOKEN}"]
+        assert service.get_feed_stats(FEED_NAME).invalid == 1
+    finally:
+        await service.stop()
+    assert service.webhook_runner is None
+
+
+async def test_overloaded_intake_queue():
+    received = []
+
+    async def _slow_batch_callback(data_list):
+        await asyncio.sleep(0.1)
+        received.extend(data_list)
+
+    service = await _start_service(_slow_batch_callback, intake_queue_size=10)
+    try:
+        async with aiohttp.ClientSession() as session:
+            statuses = await asyncio.gather(*(
+                _post(session, service.get_subscribe_url(FEED_NAME), f"signal={i}\nTOKEN={TOKEN}")
+                for i in range(100)
+            ))
+        # excess requests are rejected right away instead of waiting for the feed
+        assert statuses.count(429) > 0
+        assert statuses.count(200) + statuses.count(429) == 100
+        await _wait_for_dispatch(service, statuses.count(200))
+        stats = service.get_feed_stats(FEED_NAME)
+        assert len(received) == stats.dispatched == statuses.count(200)
+        assert stats.rejected == statuses.count(429)
+    finally:
+        await service.stop()
+
+
+async def test_signals_burst_load():
+    requests_count = 5000
+    concurrency = 50
+    received = []
+
+    async def _batch_callback(data_list):
+        # simulate feed processing time
+        await asyncio.sleep(0.001)
+        received.extend(data_list)
+
+    service = await _start_service(_batch_callback)
+    try:
+        url = service.get_subscribe_url(FEED_NAME)
+        statuses = []
+
+        async def _client(session, client_index):
+            for i in range(client_index, requests_count, concurrency):
+                statuses.append(await _post(session, url, f"EXCHANGE=binance\nSYMBOL=BTCUSDT\nSIGNAL=BUY\n"
+                                                          f"ID={i}\nTOKEN={TOKEN}"))
+
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+            await asyncio.gather(*(_client(session, i) for i in range(concurrency)))
+        await _wait_for_dispatch(service, requests_count)
+        stats = service.get_feed_stats(FEED_NAME)
+        assert statuses == [200] * requests_count
+        assert len(received) == stats.dispatched == requests_count
+        # calls are dispatched in batches
+        assert stats.dispatched_batches < requests_count
+    finally:
+        await service.stop()
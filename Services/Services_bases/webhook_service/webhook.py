@@ -14,12 +14,13 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import collections
 import logging
 import os
 import time
+import aiohttp.web
 import flask
-import threading
-import gevent.pywsgi
+import numpy
 import pyngrok.ngrok as ngrok
 import pyngrok.exception
 
@@ -34,9 +35,64 @@ import octobot.constants as constants
 import octobot.community.errors as community_errors
 
 
+class WebhookFeedStats:
+    """
+    Throughput and latency counters of a webhook feed.
+    Latency is the time between the reception of a request and the end of its feed callback.
+    """
+    MAX_STORED_LATENCIES = 10000
+
+    def __init__(self):
+        self.received = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.dispatched = 0
+        self.dispatched_batches = 0
+        self.latencies = collections.deque(maxlen=self.MAX_STORED_LATENCIES)
+        self.first_received_time = None
+        self.last_dispatched_time = None
+
+    def on_received(self, reception_time):
+        self.received += 1
+        if self.first_received_time is None:
+            self.first_received_time = reception_time
+
+    def on_dispatched(self, reception_times, dispatched_time):
+        self.dispatched += len(reception_times)
+        self.dispatched_batches += 1
+        self.latencies.extend(dispatched_time - reception_time for reception_time in reception_times)
+        self.last_dispatched_time = dispatched_time
+
+    def get_dispatched_per_second(self) -> float:
+        if self.first_received_time is None or self.last_dispatched_time is None \
+                or self.last_dispatched_time <= self.first_received_time:
+            return 0
+        return self.dispatched / (self.last_dispatched_time - self.first_received_time)
+
+    def get_latency_percentile(self, percentile) -> float:
+        if not self.latencies:
+            return 0
+        return float(numpy.percentile(self.latencies, percentile))
+
+    def to_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "dispatched": self.dispatched,
+            "dispatched_batches": self.dispatched_batches,
+            "dispatched_per_second": self.get_dispatched_per_second(),
+            "latency_p50": self.get_latency_percentile(50),
+            "latency_p99": self.get_latency_percentile(99),
+        }
+
+
 class WebHookService(services.AbstractService):
     CONNECTION_TIMEOUT = 8  # can take up to 5s on slow setups
-    LOGGERS = ["pyngrok.ngrok", "werkzeug"]
+    LOGGERS = ["pyngrok.ngrok", "aiohttp.access"]
+    # received webhooks waiting for their feed callback, requests are rejected with a 429 when full
+    INTAKE_QUEUE_SIZE = 1000
+    MAX_DISPATCHED_BATCH_SIZE = 100
 
     def get_fields_description(self):
         if self.use_web_interface_for_webhook:
@@ -77,13 +133,15 @@ class WebHookService(services.AbstractService):
 
         self.service_feed_webhooks = {}
         self.service_feed_auth_callbacks = {}
+        self.service_feed_batch_callbacks = {}
+        self.service_feed_stats = {}
 
         self.webhook_app = None
         self.webhook_host = None
         self.webhook_port = None
-        self.webhook_server = None
-        self.webhook_server_context = None
-        self.webhook_server_thread = None
+        self.webhook_runner = None
+        self.intake_queue = None
+        self.dispatch_task = None
         self.connected = None
 
     @staticmethod
@@ -155,16 +213,21 @@ class WebHookService(services.AbstractService):
         """
         return ngrok.connect(port, protocol, domain=domain)
 
-    def subscribe_feed(self, service_feed_name, service_feed_callback, auth_callback) -> None:
+    def subscribe_feed(self, service_feed_name, service_feed_callback, auth_callback,
+                       batch_callback=None) -> None:
         """
         Subscribe a service feed to the webhook
         :param service_feed_name: the service feed name
         :param service_feed_callback: the service feed callback reference
+        :param auth_callback: the service feed request authentication callback
+        :param batch_callback: optional async callback called with every queued data of this feed at once
         :return: the service feed webhook url
         """
         if service_feed_name not in self.service_feed_webhooks:
             self.service_feed_webhooks[service_feed_name] = service_feed_callback
             self.service_feed_auth_callbacks[service_feed_name] = auth_callback
+            self.service_feed_batch_callbacks[service_feed_name] = batch_callback
+            self.service_feed_stats[service_feed_name] = WebhookFeedStats()
             return
         raise KeyError(f"Service feed has already subscribed to a webhook : {service_feed_name}")
 
@@ -173,31 +236,77 @@ class WebHookService(services.AbstractService):
             return self._get_community_feed_webhook_url()
         return f"{self.webhook_public_url}/{service_feed_name}"
 
-    def _prepare_webhook_server(self):
+    def get_feed_stats(self, service_feed_name) -> WebhookFeedStats:
+        return self.service_feed_stats[service_feed_name]
+
+    async def _prepare_webhook_server(self):
         try:
             self.logger.debug(f"Starting local webhook server at {self.webhook_host}:{self.webhook_port}")
-            self.webhook_server = gevent.pywsgi.WSGIServer(
-                (self.webhook_host, self.webhook_port),
-                self.webhook_app,
-                log=None
-            )
-            self.webhook_server_context = self.webhook_app.app_context()
-            self.webhook_server_context.push()
+            self.webhook_runner = aiohttp.web.AppRunner(self.webhook_app, access_log=None)
+            await self.webhook_runner.setup()
+            await aiohttp.web.TCPSite(self.webhook_runner, self.webhook_host, self.webhook_port).start()
+            return True
         except OSError as e:
-            self.webhook_server = None
+            await self._stop_webhook_server()
             self.logger.exception(e, False, f"Fail to start webhook : {e}")
+            return False
 
-    def _register_webhook_routes(self, blueprint) -> None:
-        @blueprint.route('/')
-        def index():
+    def _register_webhook_routes(self, app) -> None:
+        async def index(_):
             """
             Route to check if webhook server is online
             """
-            return ''
+            return aiohttp.web.Response()
+
+        app.router.add_get('/', index)
+        app.router.add_post('/webhook/{webhook_name}', self._aiohttp_webhook_call)
+
+    async def _aiohttp_webhook_call(self, request):
+        reception_time = time.time()
+        webhook_name = request.match_info["webhook_name"]
+        data = await request.text()
+        if not self.is_valid_webhook_call(webhook_name, data):
+            if webhook_name in self.service_feed_stats:
+                self.service_feed_stats[webhook_name].invalid += 1
+            return aiohttp.web.Response(text='invalid or missing input parameters', status=400)
+        stats = self.service_feed_stats[webhook_name]
+        stats.on_received(reception_time)
+        try:
+            # answer right away, feed callbacks are called from the dispatch task
+            self.intake_queue.put_nowait((webhook_name, data, reception_time))
+        except asyncio.QueueFull:
+            stats.rejected += 1
+            return aiohttp.web.Response(text='too many requests', status=429)
+        return aiohttp.web.Response()
+
+    async def _dispatch_webhook_calls(self):
+        while True:
+            queued_calls = [await self.intake_queue.get()]
+            # handle every already received call in one go
+            while len(queued_calls) < self.MAX_DISPATCHED_BATCH_SIZE and not self.intake_queue.empty():
+                queued_calls.append(self.intake_queue.get_nowait())
+            calls_by_webhook_name = {}
+            for webhook_name, data, reception_time in queued_calls:
+                calls_by_webhook_name.setdefault(webhook_name, []).append((data, reception_time))
+            for webhook_name, calls in calls_by_webhook_name.items():
+                try:
+                    await self._dispatch_feed_calls(webhook_name, [data for data, _ in calls])
+                except Exception as e:
+                    self.logger.exception(e, True, f"Error when calling {webhook_name} webhook callback: {e}")
+                self.service_feed_stats[webhook_name].on_dispatched(
+                    [reception_time for _, reception_time in calls], time.time()
+                )
 
-        @blueprint.route('/webhook/<webhook_name>', methods=['POST'])
-        def webhook(webhook_name):
-            return self._flask_webhook_call(webhook_name)
+    async def _dispatch_feed_calls(self, webhook_name, data_list):
+        if self.service_feed_batch_callbacks[webhook_name] is not None:
+            await self.service_feed_batch_callbacks[webhook_name](data_list)
+            return
+        callback = self.service_feed_webhooks[webhook_name]
+        for data in data_list:
+            if asyncio.iscoroutinefunction(callback):
+                await callback(data)
+            else:
+                callback(data)
 
     def _flask_webhook_call(self, webhook_name):
         if flask.request.method == 'POST':
@@ -271,37 +380,36 @@ class WebHookService(services.AbstractService):
             self.webhook_port = int(
                 os.getenv(services_constants.ENV_WEBHOOK_PORT, services_constants.DEFAULT_WEBHOOK_SERVER_PORT))
 
-    def _start_server(self):
+    async def _start_server(self):
         try:
-            self._prepare_webhook_server()
+            self.webhook_app = aiohttp.web.Application()
             self._register_webhook_routes(self.webhook_app)
+            self.intake_queue = asyncio.Queue(maxsize=self.INTAKE_QUEUE_SIZE)
+            if not await self._prepare_webhook_server():
+                return False
+            self.dispatch_task = asyncio.create_task(self._dispatch_webhook_calls())
             self.webhook_public_url = f"http://{self.webhook_host}:{self.webhook_port}/webhook"
             if self.ngrok_enabled:
-                self.ngrok_tunnel = self.connect(self.webhook_port, protocol="http", domain=self.ngrok_domain)
+                # ngrok starts its own process: don't block the bot loop
+                self.ngrok_tunnel = await asyncio.get_event_loop().run_in_executor(
+                    None, lambda: self.connect(self.webhook_port, protocol="http", domain=self.ngrok_domain)
+                )
                 self.webhook_public_url = f"{self.ngrok_tunnel.public_url}/webhook"
-            if self.webhook_server:
-                self.connected = True
-                self.webhook_server.serve_forever()
+            return True
         except pyngrok.exception.PyngrokNgrokError as e:
             self.logger.error(f"Error when starting webhook service: Your ngrok.com token might be invalid. ({e})")
         except Exception as e:
             self.logger.exception(e, True, f"Error when running webhook service: ({e})")
-        self.connected = False
+        await self._stop_webhook_server()
+        return False
 
     async def _start_isolated_server(self):
         if self.webhook_app is None:
-            self.webhook_app = flask.Flask(__name__)
-            # gevent WSGI server has to be created in the thread it is started: create everything in this thread
-            self.webhook_server_thread = threading.Thread(target=self._start_server, name=self.get_name())
-            self.webhook_server_thread.start()
-            start_time = time.time()
-            timeout = False
-            while self.connected is None and not timeout:
-                time.sleep(0.1)
-                timeout = time.time() - start_time > self.CONNECTION_TIMEOUT
-            if timeout:
+            try:
+                self.connected = await asyncio.wait_for(self._start_server(), self.CONNECTION_TIMEOUT)
+            except asyncio.TimeoutError:
                 self.logger.error("Webhook took too long to start, now stopping it.")
-                await self.stop()
+                await self._stop_webhook_server()
                 self.connected = False
             return self.connected is True
         return True
@@ -379,11 +487,18 @@ class WebHookService(services.AbstractService):
             webhook_endpoint = "OctoBot cloud network"
         return f"Webhook configured on {webhook_endpoint}", self._is_healthy()
 
+    async def _stop_webhook_server(self):
+        if self.dispatch_task is not None:
+            self.dispatch_task.cancel()
+            self.dispatch_task = None
+        if self.webhook_runner is not None:
+            try:
+                await self.webhook_runner.cleanup()
+            except Exception as err:
+                self.logger.warning(f"Error when stopping webhook server: {err}")
+            self.webhook_runner = None
+
     async def stop(self):
         if not self.use_web_interface_for_webhook and self.connected:
             ngrok.kill()
-            if self.webhook_server:
-                try:
-                    self.webhook_server.stop()
-                except Exception as err:
-                    self.logger.warning(f"Error when stopping webhook server: {err}")
+            await self._stop_webhook_server()
@@ -0,0 +1 @@
+from .feed_routing import FeedRoutingIndex, RoutedServiceFeedChannel, get_consumer_routing_keys
@@ -0,0 +1,164 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import re
+
+import octobot_services.channel as services_channel
+
+
+class FeedRoutingIndex:
+    """
+    Index of the routing keys of service feed consumers (ex: subreddits, symbols, channel names).
+    Returns the consumers a message should be sent to without iterating over every consumer:
+    - exact_match: the message routing key is looked up in the index
+    - otherwise: every registered key contained in the message is found in a single pass using a compiled
+    multi-pattern matcher
+    Consumers registered without routing keys receive every message.
+    """
+    def __init__(self, exact_match=False):
+        self.exact_match = exact_match
+        self.wildcard_consumers = []
+        self.consumers_by_key = {}
+        self._matcher = None
+        self._shorter_keys_by_key = {}
+
+    def add_consumer(self, consumer, keys):
+        """
+        :param consumer: the consumer to route messages to
+        :param keys: the routing keys of this consumer, it will receive every message when None
+        """
+        if keys is None:
+            self.wildcard_consumers.append(consumer)
+            return
+        for key in {key.lower() for key in keys if key}:
+            self.consumers_by_key.setdefault(key, []).append(consumer)
+        self._matcher = None
+
+    def remove_consumer(self, consumer):
+        if consumer in self.wildcard_consumers:
+            self.wildcard_consumers.remove(consumer)
+        for key, consumers in list(self.consumers_by_key.items()):
+            if consumer in consumers:
+                consumers.remove(consumer)
+                if not consumers:
+                    self.consumers_by_key.pop(key)
+        self._matcher = None
+
+    def get_consumers(self, routing_text) -> list:
+        """
+        :param routing_text: the routing key or text of the message, every consumer is returned when None
+        :return: the consumers interested by the message
+        """
+        if routing_text is None:
+            return self.get_all_consumers()
+        routing_text = routing_text.lower()
+        if self.exact_match:
+            return self.wildcard_consumers + self.consumers_by_key.get(routing_text, [])
+        return self.wildcard_consumers + self._get_keys_consumers(self.get_matching_keys(routing_text))
+
+    def get_matching_keys(self, text) -> set:
+        if not self.consumers_by_key:
+            return set()
+        if self._matcher is None:
+            self._build_matcher()
+        matching_keys = set()
+        search = self._matcher.search
+        match = search(text)
+        while match is not None:
+            # match is the longest key starting at this position, shorter ones are its prefixes
+            matching_keys.update(self._shorter_keys_by_key[match.group()])
+            # also look for keys overlapping this one
+            match = search(text, match.start() + 1)
+        return matching_keys
+
+    def get_all_consumers(self) -> list:
+        return self.wildcard_consumers + self._get_keys_consumers(self.consumers_by_key)
+
+    def _get_keys_consumers(self, keys) -> list:
+        if len(keys) == 1:
+            return list(self.consumers_by_key[next(iter(keys))])
+        # a consumer can be registered on many keys: send each message once
+        return list(dict.fromkeys(
+            consumer
+            for key in keys
+            for consumer in self.consumers_by_key[key]
+        ))
+
+    def _build_matcher(self):
+        keys = list(self.consumers_by_key)
+        trie = {}
+        for key in keys:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[_KEY_END] = True
+        self._matcher = re.compile(_get_trie_pattern(trie))
+        self._shorter_keys_by_key = {
+            key: [other_key for other_key in keys if key.startswith(other_key)]
+            for key in keys
+        }
+
+
+_KEY_END = ""
+
+
+def _get_trie_pattern(node):
+    # keys sharing a prefix share their pattern: each text position is checked against each prefix once
+    # instead of against each key
+    alternatives = [
+        f"{re.escape(char)}{_get_trie_pattern(child)}"
+        for char, child in node.items()
+        if char != _KEY_END
+    ]
+    if _KEY_END in node:
+        # try longer keys first
+        alternatives.append("")
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return f"(?:{'|'.join(alternatives)})"
+
+
+def get_consumer_routing_keys(consumer):
+    """
+    :return: the routing keys of the consumer callback owner (ex: a social evaluator) when it defines
+    get_feed_routing_keys(), None otherwise
+    """
+    owner = getattr(consumer.callback, "__self__", None)
+    get_feed_routing_keys = getattr(owner, "get_feed_routing_keys", None)
+    return None if get_feed_routing_keys is None else get_feed_routing_keys()
+
+
+class RoutedServiceFeedChannel(services_channel.AbstractServiceFeedChannel):
+    """
+    Service feed channel indexing its consumers routing keys.
+    Use send_to_routed_consumers from the service feed to only wake up interested consumers.
+    """
+    ROUTING_EXACT_MATCH = False
+
+    def __init__(self):
+        super().__init__()
+        self.routing_index = FeedRoutingIndex(exact_match=self.ROUTING_EXACT_MATCH)
+
+    def add_new_consumer(self, consumer, consumer_filters) -> None:
+        super().add_new_consumer(consumer, consumer_filters)
+        self.routing_index.add_consumer(consumer, get_consumer_routing_keys(consumer))
+
+    async def remove_consumer(self, consumer) -> None:
+        self.routing_index.remove_consumer(consumer)
+        await super().remove_consumer(consumer)
+
+    async def send_to_routed_consumers(self, data, routing_text):
+        for consumer in self.routing_index.get_consumers(routing_text):
+            await consumer.queue.put(data)
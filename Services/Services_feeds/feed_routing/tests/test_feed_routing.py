@@ -0,0 +1,136 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import random
+
+import pytest
+
+import async_channel.channels as channels
+from tentacles.Services.Services_feeds.feed_routing import FeedRoutingIndex, RoutedServiceFeedChannel
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+class _TestRoutedChannel(RoutedServiceFeedChannel):
+    pass
+
+
+class _Evaluator:
+    def __init__(self, routing_keys):
+        self.routing_keys = routing_keys
+        self.received = []
+
+    def get_feed_routing_keys(self):
+        return self.routing_keys
+
+    def is_interested(self, text):
+        # what the evaluator filter would accept
+        return self.routing_keys is None or any(key.lower() in text for key in self.routing_keys)
+
+    async def feed_callback(self, data):
+        self.received.append(data)
+
+
+def test_exact_match():
+    index = FeedRoutingIndex(exact_match=True)
+    index.add_consumer("btc", ["Bitcoin", "BTC"])
+    index.add_consumer("eth", ["ethereum"])
+    index.add_consumer("all", None)
+    assert index.get_consumers("bitcoin") == ["all", "btc"]
+    assert index.get_consumers("ETHEREUM") == ["all", "eth"]
+    assert index.get_consumers("bitcoin ethereum") == ["all"]
+    assert sorted(index.get_consumers(None)) == ["all", "btc", "eth"]
+    index.remove_consumer("all")
+    index.remove_consumer("btc")
+    assert index.get_consumers("bitcoin") == []
+    assert index.consumers_by_key == {"ethereum": ["eth"]}
+
+
+def test_substring_match():
+    index = FeedRoutingIndex()
+    assert index.get_consumers("btc/usdt") == []
+    index.add_consumer("btc", ["btc"])
+    index.add_consumer("btc/usdt", ["BTC/USDT"])
+    index.add_consumer("eth/btc", ["eth/btc", "eth"])
+    index.add_consumer("c.b", ["c.b"])
+    # overlapping keys and keys prefixes of each other are all found
+    assert index.get_matching_keys("buy btc/usdt and eth/btc") == {"btc", "btc/usdt", "eth/btc", "eth"}
+    assert sorted(index.get_consumers("buy BTC/USDT and eth/btc")) == ["btc", "btc/usdt", "eth/btc"]
+    assert index.get_consumers("eth") == ["eth/btc"]
+    # keys are escaped
+    assert index.get_consumers("cxb") == []
+    assert index.get_consumers("c.b") == ["c.b"]
+    index.remove_consumer("btc")
+    assert sorted(index.get_consumers("btc/usdt")) == ["btc/usdt"]
+
+
+async def test_routed_channel():
+    routed_channel = channels.set_chan(_TestRoutedChannel(), None)
+    try:
+        btc_evaluator = _Evaluator(["BTC/USDT"])
+        eth_evaluator = _Evaluator(["ETH/USDT"])
+        await routed_channel.new_consumer(btc_evaluator.feed_callback)
+        eth_consumer = await routed_channel.new_consumer(eth_evaluator.feed_callback)
+        # not an evaluator: receives everything
+        received = []
+
+        async def _callback(data):
+            received.append(data)
+
+        await routed_channel.new_consumer(_callback)
+        await routed_channel.send_to_routed_consumers({"data": 1}, "signal btc/usdt [1]")
+        await routed_channel.send_to_routed_consumers({"data": 2}, "signal xrp/usdt [1]")
+        await routed_channel.remove_consumer(eth_consumer)
+        await routed_channel.send_to_routed_consumers({"data": 3}, "signal eth/usdt [1]")
+        await asyncio.sleep(0.1)
+        assert btc_evaluator.received == [1]
+        assert eth_evaluator.received == []
+        assert received == [1, 2, 3]
+    finally:
+        await routed_channel.stop()
+        channels.del_chan(_TestRoutedChannel.get_name())
+
+
+def test_firehose_routing():
+    currencies_count = 100
+    rng = random.Random(1)
+    currencies = [f"coin{i}" for i in range(currencies_count)]
+    evaluators = [
+        _Evaluator([f"{currency}/usdt", f"#{currency}"])
+        for currency in currencies
+    ]
+    index = FeedRoutingIndex()
+    for evaluator in evaluators:
+        index.add_consumer(evaluator, evaluator.get_feed_routing_keys())
+    words = ["buy", "sell", "moon", "pump", "now", "signal", "target", "stop", "long", "short"]
+    firehose = [
+        " ".join(rng.choice(words) for _ in range(20)) + (
+            f" {rng.choice(currencies)}/usdt" if i % 10 == 0 else ""
+        )
+        for i in range(5000)
+    ]
+
+    routed_deliveries = [index.get_consumers(message) for message in firehose]
+    # every evaluator gets every message and filters it
+    broadcast_deliveries = [
+        [evaluator for evaluator in evaluators if evaluator.is_interested(message)]
+        for message in firehose
+    ]
+    assert [set(consumers) for consumers in routed_deliveries] == \
+           [set(consumers) for consumers in broadcast_deliveries]
+    # 500 consumer wakeups instead of 500000 when broadcasting
+    assert sum(len(consumers) for consumers in routed_deliveries) == len(firehose) // 10
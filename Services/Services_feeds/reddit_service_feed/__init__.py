@@ -1 +1,2 @@
-from .reddit_feed import RedditServiceFeed
\ No newline at end of file
+from .reddit_feed import RedditServiceFeed
+from .reconnect_policy import ReconnectPolicy
@@ -0,0 +1,60 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import random
+import time
+
+
+class ReconnectPolicy:
+    """
+    Reconnection policy for service feeds: gives the delay to wait before each reconnection attempt using a
+    jittered exponential backoff.
+    After failures_before_open_circuit consecutive failures, the circuit opens: the next attempt is delayed by
+    open_circuit_delay instead. A failure of this attempt re-opens the circuit right away, a success closes it.
+    """
+    def __init__(self, base_delay=1, max_delay=300, failures_before_open_circuit=8, open_circuit_delay=900,
+                 jitter_ratio=0.5):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failures_before_open_circuit = failures_before_open_circuit
+        self.open_circuit_delay = open_circuit_delay
+        self.jitter_ratio = jitter_ratio
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.open_circuit_until = None
+
+    def on_success(self):
+        self.consecutive_failures = 0
+        self.open_circuit_until = None
+
+    def on_failure(self) -> float:
+        """
+        Registers a failed attempt
+        :return: the delay to wait before the next attempt
+        """
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        if self.consecutive_failures >= self.failures_before_open_circuit:
+            self.open_circuit_until = time.time() + self.open_circuit_delay
+            return self.open_circuit_delay
+        return self.get_backoff_delay()
+
+    def get_backoff_delay(self) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** max(self.consecutive_failures - 1, 0))
+        # randomize delays to avoid every client reconnecting at the same time
+        return delay * (1 - self.jitter_ratio * random.random())
+
+    def is_circuit_open(self) -> bool:
+        return self.open_circuit_until is not None and time.time() < self.open_circuit_until
@@ -14,19 +14,22 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import collections
 import time
 import asyncprawcore.exceptions
 import logging
 
 import octobot_commons.constants as commons_constants
-import octobot_services.channel as services_channel
 import octobot_services.constants as services_constants
 import octobot_services.service_feeds as service_feeds
 import tentacles.Services.Services_bases as Services_bases
+import tentacles.Services.Services_feeds.feed_routing as feed_routing
+import tentacles.Services.Services_feeds.reddit_service_feed.reconnect_policy as reconnect_policy
 
 
-class RedditServiceFeedChannel(services_channel.AbstractServiceFeedChannel):
-    pass
+class RedditServiceFeedChannel(feed_routing.RoutedServiceFeedChannel):
+    # entries are routed by subreddit
+    ROUTING_EXACT_MATCH = True
 
 
 class RedditServiceFeed(service_feeds.AbstractServiceFeed):
@@ -34,6 +37,8 @@ class RedditServiceFeed(service_feeds.AbstractServiceFeed):
     REQUIRED_SERVICES = [Services_bases.RedditService]
 
     MAX_CONNECTION_ATTEMPTS = 10
+    # streams replay up to 100 entries on reconnection
+    MAX_NOTIFIED_ENTRY_IDS = 2000
 
     def __init__(self, config, main_async_loop, bot_id):
         service_feeds.AbstractServiceFeed.__init__(self, config, main_async_loop, bot_id)
@@ -42,6 +47,10 @@ class RedditServiceFeed(service_feeds.AbstractServiceFeed):
         self.connect_attempts = 0
         self.credentials_ok = False
         self.listener_task = None
+        self.reconnect_policy = reconnect_policy.ReconnectPolicy(
+            base_delay=self._SLEEPING_TIME_BEFORE_RECONNECT_ATTEMPT_SEC
+        )
+        self.notified_entry_ids = collections.OrderedDict()
 
     # merge new config into existing config
     def update_feed_config(self, config):
@@ -53,6 +62,10 @@ class RedditServiceFeed(service_feeds.AbstractServiceFeed):
             self.feed_config[services_constants.CONFIG_REDDIT_SUBREDDITS] = config[
                 services_constants.CONFIG_REDDIT_SUBREDDITS]
 
+    async def send(self, data):
+        # only wake up consumers following this entry's subreddit
+        await self.channel.send_to_routed_consumers(data, data["data"][services_constants.FEED_METADATA])
+
     def _init_subreddits(self):
         self.subreddits = ""
         for symbol in self.feed_config[services_constants.CONFIG_REDDIT_SUBREDDITS]:
@@ -98,6 +111,9 @@ class RedditServiceFeed(service_feeds.AbstractServiceFeed):
         async for entry in subreddit.stream.submissions():
             self.credentials_ok = True
             self.connect_attempts = 0
+            self.reconnect_policy.on_success()
+            if not self._is_new_entry(entry):
+                continue
             self.counter += 1
             # check if we are in the 100 history or if it's a new entry (new posts are more valuables)
             # the older the entry is, the les weight it gets
@@ -115,19 +131,19 @@ class RedditServiceFeed(service_feeds.AbstractServiceFeed):
         while not self.should_stop and self.connect_attempts < self.MAX_CONNECTION_ATTEMPTS:
             try:
                 await self._start_listener()
+                # stream ended without error: reconnect
+                await self._wait_before_reconnecting()
             except asyncprawcore.exceptions.RequestException:
                 # probably a connexion loss, try again
-                time.sleep(self._SLEEPING_TIME_BEFORE_RECONNECT_ATTEMPT_SEC)
+                await self._wait_before_reconnecting()
             except asyncprawcore.exceptions.InvalidToken as e:
                 # expired, try again
                 self.logger.exception(e, True, f"Error when receiving Reddit feed: '{e}'")
-                self.logger.info(f"Try to continue after {self._SLEEPING_TIME_BEFORE_RECONNECT_ATTEMPT_SEC} seconds.")
-                time.sleep(self._SLEEPING_TIME_BEFORE_RECONNECT_ATTEMPT_SEC)
+                await self._wait_before_reconnecting()
             except asyncprawcore.exceptions.ServerError as e:
                 # server error, try again
-                self.logger.exception(e, True, "Error when receiving Reddit feed: '{e}'")
-                self.logger.info(f"Try to continue after {self._SLEEPING_TIME_BEFORE_RECONNECT_ATTEMPT_SEC} seconds.")
-                time.sleep(self._SLEEPING_TIME_BEFORE_RECONNECT_ATTEMPT_SEC)
+                self.logger.exception(e, True, f"Error when receiving Reddit feed: '{e}'")
+                await self._wait_before_reconnecting()
             except asyncprawcore.exceptions.OAuthException as e:
                 self.logger.exception(e, True, f"Error when receiving Reddit feed: '{e}' this may mean that reddit "
                                                f"login info in config.json are wrong")
@@ -135,15 +151,14 @@ class RedditServiceFeed(service_feeds.AbstractServiceFeed):
                 self.should_stop = True
             except asyncprawcore.exceptions.ResponseException as e:
                 message_complement = "this may mean that reddit login info in config.json are invalid." \
-                    if not self.credentials_ok else \
-                    f"Try to continue after {self._SLEEPING_TIME_BEFORE_RECONNECT_ATTEMPT_SEC} seconds."
+                    if not self.credentials_ok else "Trying to reconnect."
                 self.logger.exception(e, True,
                                       f"Error when receiving Reddit feed: '{e}' this may mean {message_complement}")
                 if not self.credentials_ok:
                     self.connect_attempts += 1
                 else:
                     self.connect_attempts += 0.1
-                time.sleep(self._SLEEPING_TIME_BEFORE_RECONNECT_ATTEMPT_SEC)
+                await self._wait_before_reconnecting()
             except Exception as e:
                 self.logger.error(f"Error when receiving Reddit feed: '{e}'")
                 self.logger.exception(e, True, f"Error when receiving Reddit feed: '{e}'")
@@ -151,6 +166,27 @@ class RedditServiceFeed(service_feeds.AbstractServiceFeed):
                 self.should_stop = True
         return False
 
+    async def _wait_before_reconnecting(self):
+        if self.should_stop:
+            return
+        delay = self.reconnect_policy.on_failure()
+        if self.reconnect_policy.is_circuit_open():
+            self.logger.warning(f"Reddit feed failed {self.reconnect_policy.consecutive_failures} times in a row, "
+                                f"pausing reconnection for {round(delay)} seconds.")
+        else:
+            self.logger.info(f"Reconnecting to Reddit feed in {round(delay, 1)} seconds.")
+        # never block the event loop while waiting
+        await asyncio.sleep(delay)
+
+    def _is_new_entry(self, entry):
+        # the stream replays its latest entries when (re)connecting: skip already notified ones
+        if entry.id in self.notified_entry_ids:
+            return False
+        self.notified_entry_ids[entry.id] = None
+        if len(self.notified_entry_ids) > self.MAX_NOTIFIED_ENTRY_IDS:
+            self.notified_entry_ids.popitem(last=False)
+        return True
+
     async def _start_service_feed(self):
         self.listener_task = asyncio.create_task(self._start_listener_task())
         return True
@@ -0,0 +1,146 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import time
+import types
+
+import asyncprawcore.exceptions
+import pytest
+
+import async_channel.channels as channels
+import octobot_services.constants as services_constants
+from tentacles.Services.Services_feeds.reddit_service_feed import RedditServiceFeed, ReconnectPolicy
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+class _FakeSubreddit:
+    def __init__(self, entries, stream_attempts):
+        self.entries = entries
+        self.stream_attempts = stream_attempts
+        self.stream = self
+
+    async def submissions(self):
+        self.stream_attempts.append(time.time())
+        for entry in self.entries:
+            yield entry
+        raise asyncprawcore.exceptions.RequestException(ConnectionError("connection lost"), (), {})
+
+
+class _FakeRedditService:
+    def __init__(self, subreddit):
+        self.subreddit_instance = subreddit
+
+    def get_endpoint(self):
+        return self
+
+    async def subreddit(self, _):
+        return self.subreddit_instance
+
+
+def _entry(entry_id):
+    return types.SimpleNamespace(id=entry_id, created_utc=time.time(),
+                                 subreddit=types.SimpleNamespace(display_name="Bitcoin"))
+
+
+@pytest.fixture
+def reddit_feed():
+    feed = RedditServiceFeed({}, asyncio.get_event_loop(), "bot_id")
+    yield feed
+    channels.del_chan(RedditServiceFeed.FEED_CHANNEL.get_name())
+
+
+def test_reconnect_policy():
+    policy = ReconnectPolicy(base_delay=1, max_delay=4, failures_before_open_circuit=5, open_circuit_delay=100,
+                             jitter_ratio=0)
+    assert [policy.on_failure() for _ in range(4)] == [1, 2, 4, 4]
+    assert not policy.is_circuit_open()
+    assert policy.on_failure() == 100
+    assert policy.is_circuit_open()
+    # half-open attempt failed: circuit opens again
+    assert policy.on_failure() == 100
+    policy.on_success()
+    assert not policy.is_circuit_open()
+    assert policy.on_failure() == 1
+    assert policy.total_failures == 7
+
+    policy = ReconnectPolicy(base_delay=10, jitter_ratio=0.5)
+    policy.on_failure()
+    assert all(5 <= policy.get_backoff_delay() <= 10 for _ in range(100))
+
+
+async def test_reconnect_without_blocking_the_event_loop(reddit_feed):
+    stream_attempts = []
+    feed = reddit_feed
+    feed.services = [_FakeRedditService(_FakeSubreddit([_entry("a"), _entry("b")], stream_attempts))]
+    feed.reconnect_policy = ReconnectPolicy(base_delay=0.05, max_delay=0.05, jitter_ratio=0)
+    notified_entries = []
+
+    async def _notify(data):
+        notified_entries.append(data[services_constants.CONFIG_REDDIT_ENTRY].id)
+        assert data[services_constants.FEED_METADATA] == "bitcoin"
+        assert data[services_constants.CONFIG_REDDIT_ENTRY_WEIGHT] == 4
+
+    feed._async_notify_consumers = _notify
+    ticks = 0
+
+    async def _ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticks_at_attempts = []
+    start_listener = feed._start_listener
+
+    async def _start_listener():
+        ticks_at_attempts.append(ticks)
+        await start_listener()
+
+    feed._start_listener = _start_listener
+    ticker_task = asyncio.create_task(_ticker())
+    listener_task = asyncio.create_task(feed._start_listener_task())
+    try:
+        await asyncio.sleep(0.5)
+        assert len(stream_attempts) > 3
+        # the event loop kept running while the feed was waiting to reconnect
+        assert all(previous < following for previous, following in zip(ticks_at_attempts, ticks_at_attempts[1:]))
+        assert feed.reconnect_policy.total_failures >= len(stream_attempts) - 1
+        # replayed entries are notified only once
+        assert notified_entries == ["a", "b"]
+        assert feed.counter == 2
+    finally:
+        feed.should_stop = True
+        await asyncio.wait_for(listener_task, 1)
+        ticker_task.cancel()
+
+
+async def test_stop_reconnecting_on_invalid_credentials(reddit_feed):
+    stream_attempts = []
+    subreddit = _FakeSubreddit([], stream_attempts)
+
+    async def _submissions():
+        stream_attempts.append(time.time())
+        raise asyncprawcore.exceptions.ResponseException(types.SimpleNamespace(status=401))
+        yield
+
+    subreddit.submissions = _submissions
+    feed = reddit_feed
+    feed.services = [_FakeRedditService(subreddit)]
+    feed.reconnect_policy = ReconnectPolicy(base_delay=0.001, max_delay=0.001, open_circuit_delay=0.001)
+    assert await asyncio.wait_for(feed._start_listener_task(), 1) is False
+    assert len(stream_attempts) == RedditServiceFeed.MAX_CONNECTION_ATTEMPTS
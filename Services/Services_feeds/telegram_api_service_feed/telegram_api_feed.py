@@ -13,58 +13,148 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
+import collections
+import os
+
 import telethon
 
-import octobot_services.channel as services_channel
 import octobot_services.constants as services_constants
 import octobot_services.service_feeds as service_feeds
 import tentacles.Services.Services_bases as Services_bases
+import tentacles.Services.Services_feeds.feed_routing as feed_routing
 
 
-class TelegramApiServiceFeedChannel(services_channel.AbstractServiceFeedChannel):
-    pass
+class TelegramApiServiceFeedChannel(feed_routing.RoutedServiceFeedChannel):
+    # messages are routed by sender
+    ROUTING_EXACT_MATCH = True
 
 
 class TelegramApiServiceFeed(service_feeds.AbstractServiceFeed):
     FEED_CHANNEL = TelegramApiServiceFeedChannel
     REQUIRED_SERVICES = [Services_bases.TelegramApiService]
 
+    # resolved with the downloaded media path, or None when the media is not downloaded, cancelled when the feed stops
+    MEDIA_DOWNLOAD_KEY = "media-download"
+    MAX_PENDING_MEDIA_DOWNLOADS = 50
+    MEDIA_DOWNLOAD_WORKERS = 2
+    MAX_MEDIA_SIZE = 20 * 1024 * 1024
+    MEDIA_DOWNLOADS_QUOTA = 1024 * 1024 * 1024
+    MAX_CACHED_DISPLAY_NAMES = 10000
+
     def __init__(self, config, main_async_loop, bot_id):
         super().__init__(config, main_async_loop, bot_id)
         self.feed_config = {
             services_constants.CONFIG_TELEGRAM_ALL_CHANNEL: True,
         }
+        self.display_names_by_sender_id = collections.OrderedDict()
+        self.media_downloads_queue = None
+        self.media_download_tasks = []
+        self.media_downloads_size = None
 
     def update_feed_config(self, config):
         pass
 
+    async def send(self, data):
+        # only wake up consumers following this message's sender
+        await self.channel.send_to_routed_consumers(
+            data, data["data"].get(services_constants.CONFIG_MESSAGE_SENDER)
+        )
+
     def _add_event_handler(self):
         self.services[0].add_event_handler(self.message_handler, telethon.events.NewMessage)
 
     async def message_handler(self, event):
         try:
-            display_name = self.get_display_name(await event.get_sender())
+            display_name = await self._get_sender_display_name(event)
             if self.feed_config[services_constants.CONFIG_TELEGRAM_ALL_CHANNEL]:
-                media_output_path = None
+                data = {
+                    services_constants.CONFIG_MESSAGE_SENDER: display_name,
+                    services_constants.CONFIG_MESSAGE_CONTENT: event.text,
+                    services_constants.CONFIG_IS_GROUP_MESSAGE: event.is_group,
+                    services_constants.CONFIG_IS_CHANNEL_MESSAGE: event.is_channel,
+                    services_constants.CONFIG_IS_PRIVATE_MESSAGE: event.is_private,
+                    # set when the media is downloaded
+                    services_constants.CONFIG_MEDIA_PATH: None,
+                }
                 if event.message.media is not None:
-                    media_output_path = await self.services[0].download_media_from_message(message=event.message,
-                                                                                           source=display_name)
-                await self.feed_send_coroutine(
-                    {
-                        services_constants.CONFIG_MESSAGE_SENDER: display_name,
-                        services_constants.CONFIG_MESSAGE_CONTENT: event.text,
-                        services_constants.CONFIG_IS_GROUP_MESSAGE: event.is_group,
-                        services_constants.CONFIG_IS_CHANNEL_MESSAGE: event.is_channel,
-                        services_constants.CONFIG_IS_PRIVATE_MESSAGE: event.is_private,
-                        services_constants.CONFIG_MEDIA_PATH: media_output_path,
-                    }
-                )
+                    data[self.MEDIA_DOWNLOAD_KEY] = self._schedule_media_download(event.message, display_name, data)
+                # don't make the message text wait for its media
+                await self.feed_send_coroutine(data)
             else:
                 self.logger.debug(f"Ignored message from {display_name}: not in followed telegram users "
                                   f"(message: {event.text})")
         except Exception as e:
             self.logger.error(f"Fail to parse incoming message : {e}")
 
+    async def _get_sender_display_name(self, event):
+        sender_id = event.sender_id
+        try:
+            display_name = self.display_names_by_sender_id[sender_id]
+            self.display_names_by_sender_id.move_to_end(sender_id)
+            return display_name
+        except KeyError:
+            display_name = self.get_display_name(await event.get_sender())
+            if sender_id is not None:
+                self.display_names_by_sender_id[sender_id] = display_name
+                if len(self.display_names_by_sender_id) > self.MAX_CACHED_DISPLAY_NAMES:
+                    self.display_names_by_sender_id.popitem(last=False)
+            return display_name
+
+    def _schedule_media_download(self, message, display_name, data) -> asyncio.Future:
+        media_download = asyncio.get_event_loop().create_future()
+        media_size = getattr(message.file, "size", None) or 0
+        if media_size > self.MAX_MEDIA_SIZE:
+            self.logger.debug(f"Ignored {media_size} bytes media from {display_name}: media is too large")
+            media_download.set_result(None)
+            return media_download
+        if self.media_downloads_queue is None:
+            self._start_media_download_workers()
+        try:
+            self.media_downloads_queue.put_nowait((message, display_name, data, media_download, media_size))
+        except asyncio.QueueFull:
+            self.logger.warning(f"Ignored media from {display_name}: too many pending media downloads")
+            media_download.set_result(None)
+        return media_download
+
+    def _start_media_download_workers(self):
+        self.media_downloads_queue = asyncio.Queue(maxsize=self.MAX_PENDING_MEDIA_DOWNLOADS)
+        self.media_download_tasks = [
+            asyncio.create_task(self._media_download_worker())
+            for _ in range(self.MEDIA_DOWNLOAD_WORKERS)
+        ]
+
+    async def _media_download_worker(self):
+        while True:
+            message, display_name, data, media_download, media_size = await self.media_downloads_queue.get()
+            media_output_path = None
+            try:
+                if self._get_media_downloads_size() + media_size > self.MEDIA_DOWNLOADS_QUOTA:
+                    self.logger.warning(f"Ignored media from {display_name}: media downloads quota is reached")
+                else:
+                    self.media_downloads_size += media_size
+                    media_output_path = await self.services[0].download_media_from_message(message=message,
+                                                                                           source=display_name)
+                    data[services_constants.CONFIG_MEDIA_PATH] = media_output_path
+            except asyncio.CancelledError:
+                media_download.cancel()
+                raise
+            except Exception as e:
+                self.logger.exception(e, True, f"Error when downloading media from {display_name}: {e}")
+            finally:
+                if not media_download.done():
+                    media_download.set_result(media_output_path)
+
+    def _get_media_downloads_size(self):
+        if self.media_downloads_size is None:
+            # previously downloaded media are counted in the quota
+            self.media_downloads_size = sum(
+                os.path.getsize(os.path.join(root, file_name))
+                for root, _, file_names in os.walk(self.services[0].get_downloads_folder())
+                for file_name in file_names
+            )
+        return self.media_downloads_size
+
     def get_display_name(self, entity):
         if isinstance(entity, telethon.types.User):
             if entity.last_name and entity.first_name:
@@ -91,3 +181,15 @@ class TelegramApiServiceFeed(service_feeds.AbstractServiceFeed):
 
     async def _start_service_feed(self):
         return True
+
+    async def stop(self):
+        for task in self.media_download_tasks:
+            task.cancel()
+        await asyncio.gather(*self.media_download_tasks, return_exceptions=True)
+        self.media_download_tasks = []
+        if self.media_downloads_queue is not None:
+            # don't let consumers wait for media that will never be downloaded
+            while not self.media_downloads_queue.empty():
+                self.media_downloads_queue.get_nowait()[3].cancel()
+            self.media_downloads_queue = None
+        await super().stop()
@@ -0,0 +1,147 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import types
+
+import pytest
+import telethon
+
+import async_channel.channels as channels
+import octobot_services.constants as services_constants
+from tentacles.Services.Services_feeds.telegram_api_service_feed import TelegramApiServiceFeed
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+# simulated download speed
+BYTES_PER_SECOND = 20 * 1024 * 1024
+
+
+class _FakeTelegramApiService:
+    def __init__(self, downloads_folder):
+        self.downloads_folder = downloads_folder
+        self.downloaded_sizes = []
+
+    def get_downloads_folder(self, source=""):
+        return str(self.downloads_folder)
+
+    async def download_media_from_message(self, message, source=""):
+        await asyncio.sleep(message.file.size / BYTES_PER_SECOND)
+        self.downloaded_sizes.append(message.file.size)
+        return f"{self.downloads_folder}/{source}"
+
+
+class _FakeEvent:
+    def __init__(self, text, sender_id=1, media_size=None):
+        self.text = text
+        self.sender_id = sender_id
+        self.is_group = False
+        self.is_channel = True
+        self.is_private = False
+        self.get_sender_calls = 0
+        self.message = types.SimpleNamespace(
+            media=None if media_size is None else object(),
+            file=None if media_size is None else types.SimpleNamespace(size=media_size),
+        )
+
+    async def get_sender(self):
+        self.get_sender_calls += 1
+        await asyncio.sleep(0.01)
+        return telethon.types.User(id=self.sender_id, first_name="Signals", last_name=f"{self.sender_id}")
+
+
+@contextlib.asynccontextmanager
+async def _feed(tmp_path):
+    feed = TelegramApiServiceFeed({}, asyncio.get_event_loop(), "bot_id")
+    feed.services = [_FakeTelegramApiService(tmp_path)]
+    feed.sent_data = []
+
+    async def _feed_send_coroutine(data):
+        # downloaded media count when the message is sent
+        feed.sent_data.append((len(feed.services[0].downloaded_sizes), data))
+
+    feed.feed_send_coroutine = _feed_send_coroutine
+    try:
+        yield feed
+    finally:
+        await feed.stop()
+        channels.del_chan(TelegramApiServiceFeed.FEED_CHANNEL.get_name())
+
+
+async def test_text_does_not_wait_for_media(tmp_path):
+    async with _feed(tmp_path) as feed:
+        for media_size in (None, 1024, 10 * 1024 * 1024):
+            event = _FakeEvent(f"Pair: BTC/USDT\nSide: BUY ({media_size})", media_size=media_size)
+            await feed.message_handler(event)
+            downloaded_media_count, data = feed.sent_data[-1]
+            assert data[services_constants.CONFIG_MESSAGE_CONTENT] == event.text
+            assert data[services_constants.CONFIG_MESSAGE_SENDER] == "Signals 1"
+            assert data[services_constants.CONFIG_MEDIA_PATH] is None
+            if media_size is not None:
+                # message is sent before its media is downloaded
+                assert not data[TelegramApiServiceFeed.MEDIA_DOWNLOAD_KEY].done()
+                assert downloaded_media_count == len(feed.services[0].downloaded_sizes)
+                # media path is attached once downloaded
+                media_path = await asyncio.wait_for(data[TelegramApiServiceFeed.MEDIA_DOWNLOAD_KEY], 2)
+                assert media_path == data[services_constants.CONFIG_MEDIA_PATH] == \
+                    f"{feed.services[0].downloads_folder}/Signals 1"
+        assert feed.services[0].downloaded_sizes == [1024, 10 * 1024 * 1024]
+
+
+async def test_cached_display_names(tmp_path):
+    async with _feed(tmp_path) as feed:
+        events = [_FakeEvent("hello", sender_id=sender_id) for sender_id in (1, 2, 1, 1, 2)]
+        for event in events:
+            await feed.message_handler(event)
+        assert [event.get_sender_calls for event in events] == [1, 1, 0, 0, 0]
+        assert [data[services_constants.CONFIG_MESSAGE_SENDER] for _, data in feed.sent_data] == \
+               ["Signals 1", "Signals 2", "Signals 1", "Signals 1", "Signals 2"]
+
+
+async def test_media_download_limits(tmp_path):
+    async with _feed(tmp_path) as feed:
+        feed.MAX_PENDING_MEDIA_DOWNLOADS = 2
+        feed.MEDIA_DOWNLOAD_WORKERS = 1
+        feed.MAX_MEDIA_SIZE = 1024 * 1024
+        feed.MEDIA_DOWNLOADS_QUOTA = 3 * 1024 * 1024
+        (feed.services[0].downloads_folder / "previous_media").write_bytes(b"0" * 1024 * 1024)
+        # too large
+        await feed.message_handler(_FakeEvent("1", media_size=2 * 1024 * 1024))
+        for text in ("2", "3", "4", "5"):
+            await feed.message_handler(_FakeEvent(text, media_size=1024 * 1024))
+        media_paths = [
+            await asyncio.wait_for(data[TelegramApiServiceFeed.MEDIA_DOWNLOAD_KEY], 2)
+            for _, data in feed.sent_data
+        ]
+        # 1: too large, 2: downloading, 3 and 4: queued, 5: queue is full
+        # 4: downloads quota reached, including the already downloaded media
+        assert [media_path is not None for media_path in media_paths] == [False, True, True, False, False]
+        assert feed.services[0].downloaded_sizes == [1024 * 1024, 1024 * 1024]
+
+
+async def test_stop_cancels_pending_media_downloads(tmp_path):
+    async with _feed(tmp_path) as feed:
+        feed.MEDIA_DOWNLOAD_WORKERS = 1
+        for text in ("1", "2", "3"):
+            await feed.message_handler(_FakeEvent(text, media_size=10 * 1024 * 1024))
+        media_downloads = [data[TelegramApiServiceFeed.MEDIA_DOWNLOAD_KEY] for _, data in feed.sent_data]
+        # 1: downloading, 2 and 3: queued
+        await asyncio.sleep(0.01)
+        await feed.stop()
+        assert all(media_download.cancelled() for media_download in media_downloads)
+        assert feed.media_download_tasks == []
+        assert feed.services[0].downloaded_sizes == []
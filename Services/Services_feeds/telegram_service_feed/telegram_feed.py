@@ -16,13 +16,13 @@
 import telegram
 import telegram.ext
 
-import octobot_services.channel as services_channel
 import octobot_services.constants as services_constants
 import octobot_services.service_feeds as service_feeds
 import tentacles.Services.Services_bases as Services_bases
+import tentacles.Services.Services_feeds.feed_routing as feed_routing
 
 
-class TelegramServiceFeedChannel(services_channel.AbstractServiceFeedChannel):
+class TelegramServiceFeedChannel(feed_routing.RoutedServiceFeedChannel):
     pass
 
 
@@ -52,6 +52,12 @@ class TelegramServiceFeed(service_feeds.AbstractServiceFeed):
     def set_listen_to_all_groups_and_channels(self, activate=True):
         self.feed_config[services_constants.CONFIG_TELEGRAM_ALL_CHANNEL] = activate
 
+    async def send(self, data):
+        # only wake up consumers whose routing keys (ex: symbols) are in the message
+        await self.channel.send_to_routed_consumers(
+            data, data["data"][services_constants.CONFIG_GROUP_MESSAGE_DESCRIPTION]
+        )
+
     def _register_to_service(self):
         if not self.services[0].is_registered(self.get_name()):
             self.services[0].register_user(self.get_name())
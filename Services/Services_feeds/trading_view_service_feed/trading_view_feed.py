@@ -26,6 +26,7 @@ class TradingViewServiceFeedChannel(services_channel.AbstractServiceFeedChannel)
 class TradingViewServiceFeed(service_feeds.AbstractServiceFeed):
     FEED_CHANNEL = TradingViewServiceFeedChannel
     REQUIRED_SERVICES = [Services_bases.WebHookService, Services_bases.TradingViewService]
+    TOKEN_KEY = "TOKEN="
 
     def __init__(self, config, main_async_loop, bot_id):
         super().__init__(config, main_async_loop, bot_id)
@@ -37,11 +38,14 @@ class TradingViewServiceFeed(service_feeds.AbstractServiceFeed):
 
     def ensure_callback_auth(self, data) -> bool:
         if self.services[1].requires_token:
-            split_result = data.split("TOKEN=")
-            if len(split_result) > 1:
-                token = split_result[1].strip().split("\n")[0]
-                return self.services[1].token == token
-            return False
+            # only look at the token part of the signal
+            token_start = data.find(self.TOKEN_KEY)
+            if token_start == -1:
+                return False
+            token_start += len(self.TOKEN_KEY)
+            token_end = data.find(self.TOKEN_KEY, token_start)
+            token = data[token_start:token_end if token_end != -1 else None].strip().split("\n", 1)[0]
+            return self.services[1].token == token
         # no token expected
         return True
 
@@ -61,12 +65,24 @@ class TradingViewServiceFeed(service_feeds.AbstractServiceFeed):
             }
         )
 
+    async def async_webhook_batch_callback(self, data_list):
+        self.logger.debug(f"Received {len(data_list)} signals : {data_list}")
+        for data in data_list:
+            await self._async_notify_consumers(
+                {
+                    services_constants.FEED_METADATA: data,
+                }
+            )
+
     def _register_to_service(self):
         service = self.services[0]
         if not service.is_subscribed(self.webhook_service_name):
-            callback = self.async_webhook_callback if service.use_octobot_cloud_webhook else self.webhook_callback
+            # the web interface webhook is called from the web interface thread
+            callback = self.webhook_callback if service.use_web_interface_for_webhook \
+                else self.async_webhook_callback
             service.subscribe_feed(
-                self.webhook_service_name, callback, self.ensure_callback_auth
+                self.webhook_service_name, callback, self.ensure_callback_auth,
+                batch_callback=self.async_webhook_batch_callback
             )
 
     def _initialize(self):
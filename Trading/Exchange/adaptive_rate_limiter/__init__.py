@@ -0,0 +1,2 @@
+from .adaptive_rate_limiter import AdaptiveRateLimiter, AdaptiveRateLimiters
+from .rate_limited_connector import AdaptiveRateLimitedCCXTConnector
\ No newline at end of file
@@ -0,0 +1,124 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import time
+
+import octobot_commons.singleton as singleton
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every request sent to an exchange.
+    Its rate follows an AIMD (additive increase, multiplicative decrease) policy: it is increased by increase_step
+    after each successful request and multiplied by decrease_factor when the exchange is throttling requests.
+    Throttled requests are retried after waiting for a new token, up to max_attempts times.
+    """
+    def __init__(self, max_rate, min_rate=1, increase_step=0.5, decrease_factor=0.5, decrease_interval=1,
+                 max_attempts=5):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self.max_attempts = max_attempts
+        self.rate = max_rate
+        # requests waiting for a token
+        self.queue_depth = 0
+        self.requests_count = 0
+        self.throttle_events = 0
+        self._tokens = max(1, max_rate)
+        self._last_refill_time = time.monotonic()
+        self._last_decrease_time = 0
+
+    async def call(self, request_factory, is_throttling_error):
+        """
+        :param request_factory: function returning the request coroutine, called at each attempt
+        :param is_throttling_error: function returning True when the given error is a throttling error
+        :return: the request result
+        """
+        last_error = None
+        for _ in range(self.max_attempts):
+            await self.acquire()
+            self.requests_count += 1
+            try:
+                result = await request_factory()
+            except Exception as err:
+                if not is_throttling_error(err):
+                    raise
+                self.on_throttled()
+                last_error = err
+            else:
+                self.on_success()
+                return result
+        raise last_error
+
+    async def acquire(self):
+        self.queue_depth += 1
+        try:
+            while True:
+                throttle_events = self.throttle_events
+                delay = self._reserve_token()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if throttle_events == self.throttle_events:
+                    return
+                # throttled while waiting: reserved token is not valid anymore
+        finally:
+            self.queue_depth -= 1
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttled(self):
+        self.throttle_events += 1
+        now = time.monotonic()
+        if now - self._last_decrease_time >= self.decrease_interval:
+            # concurrent requests are throttled together: decrease rate once for all of them
+            self._last_decrease_time = now
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        # cancel reservations: waiting requests will reserve a token at the new rate
+        self._tokens = 0
+        self._last_refill_time = now
+
+    def _reserve_token(self) -> float:
+        """
+        :return: the time to wait for the reserved token to be available
+        """
+        now = time.monotonic()
+        self._tokens = min(max(1, self.rate), self._tokens + (now - self._last_refill_time) * self.rate)
+        self._last_refill_time = now
+        self._tokens -= 1
+        return max(0, -self._tokens / self.rate)
+
+
+class AdaptiveRateLimiters(singleton.Singleton):
+    """
+    Process-wide AdaptiveRateLimiter by key: every client using the same key shares its rate limiter
+    """
+    def __init__(self):
+        self.rate_limiters = {}
+
+    def get_rate_limiter(self, key, **rate_limiter_kwargs) -> AdaptiveRateLimiter:
+        """
+        :param key: identifier of the rate limit, ex: exchange name, exchange type and account
+        :param rate_limiter_kwargs: AdaptiveRateLimiter arguments, used when creating the rate limiter
+        :return: the rate limiter of the key
+        """
+        try:
+            return self.rate_limiters[key]
+        except KeyError:
+            rate_limiter = self.rate_limiters[key] = AdaptiveRateLimiter(**rate_limiter_kwargs)
+            return rate_limiter
@@ -0,0 +1,72 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import octobot_trading.exchanges.connectors.ccxt.ccxt_connector as ccxt_connector
+import octobot_trading.exchanges.util.exchange_util as exchange_util
+
+import tentacles.Trading.Exchange.adaptive_rate_limiter.adaptive_rate_limiter as adaptive_rate_limiter
+
+
+class AdaptiveRateLimitedCCXTConnector(ccxt_connector.CCXTConnector):
+    """
+    CCXTConnector sending every REST request of its ccxt clients through an AdaptiveRateLimiter shared by the
+    clients of the same exchange, exchange type and account.
+    Override is_throttling_error to identify throttling errors.
+    """
+    THROTTLED_REQUEST_MAX_ATTEMPTS = 5
+    # requests per second when the exchange is not throttling requests, uses ccxt rate limit when None
+    RATE_LIMITER_MAX_RATE = None
+    RATE_LIMITER_MIN_RATE = 1
+
+    def is_throttling_error(self, client, error) -> bool:
+        raise NotImplementedError("is_throttling_error is not implemented")
+
+    def get_rate_limiter(self, client=None) -> adaptive_rate_limiter.AdaptiveRateLimiter:
+        client = client or self.client
+        return adaptive_rate_limiter.AdaptiveRateLimiters.instance().get_rate_limiter(
+            self._get_rate_limiter_key(client),
+            max_rate=self.RATE_LIMITER_MAX_RATE or 1000 / client.rateLimit,
+            min_rate=self.RATE_LIMITER_MIN_RATE,
+            max_attempts=self.THROTTLED_REQUEST_MAX_ATTEMPTS,
+        )
+
+    def _get_rate_limiter_key(self, client) -> tuple:
+        # exchanges rate limits are by account and by exchange type (ex: spot and futures APIs)
+        return (
+            self.exchange_manager.exchange_name,
+            exchange_util.get_exchange_type(self.exchange_manager),
+            client.apiKey or None,
+        )
+
+    def _client_factory(self, force_unauth, keys_adapter=None) -> tuple:
+        client, is_authenticated = super()._client_factory(force_unauth, keys_adapter=keys_adapter)
+        return self._limit_client_requests(client), is_authenticated
+
+    def unauthenticated_exchange_fallback(self, err):
+        return self._limit_client_requests(super().unauthenticated_exchange_fallback(err))
+
+    def _limit_client_requests(self, client):
+        rate_limiter = self.get_rate_limiter(client)
+        # every ccxt REST request goes through fetch2, which signs requests: retried requests are signed again
+        fetch2 = client.fetch2
+
+        async def rate_limited_fetch2(*args, **kwargs):
+            return await rate_limiter.call(
+                lambda: fetch2(*args, **kwargs),
+                lambda error: self.is_throttling_error(client, error)
+            )
+
+        client.fetch2 = rate_limited_fetch2
+        return client
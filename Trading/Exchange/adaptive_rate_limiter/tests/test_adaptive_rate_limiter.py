@@ -0,0 +1,110 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import mock
+import pytest
+
+import octobot_commons.singleton as singleton
+from tentacles.Trading.Exchange.adaptive_rate_limiter import AdaptiveRateLimiter, AdaptiveRateLimiters
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+class _ThrottlingError(Exception):
+    pass
+
+
+def _is_throttling_error(error):
+    return isinstance(error, _ThrottlingError)
+
+
+async def test_aimd_rate():
+    rate_limiter = AdaptiveRateLimiter(10, min_rate=2, increase_step=1, decrease_interval=60)
+    rate_limiter.on_throttled()
+    assert rate_limiter.rate == 5
+    # decreased at most once per decrease_interval
+    rate_limiter.on_throttled()
+    assert rate_limiter.rate == 5
+    assert rate_limiter.throttle_events == 2
+    rate_limiter.on_success()
+    assert rate_limiter.rate == 6
+    for _ in range(10):
+        rate_limiter.on_success()
+    assert rate_limiter.rate == 10
+    rate_limiter.decrease_interval = 0
+    for _ in range(10):
+        rate_limiter.on_throttled()
+    assert rate_limiter.rate == 2
+
+
+async def test_call():
+    rate_limiter = AdaptiveRateLimiter(1000, max_attempts=3)
+    calls = []
+
+    async def _request(errors):
+        calls.append(None)
+        if len(calls) <= errors:
+            raise _ThrottlingError(len(calls))
+        return len(calls)
+
+    assert await rate_limiter.call(lambda: _request(2), _is_throttling_error) == 3
+    assert rate_limiter.requests_count == 3
+    assert rate_limiter.throttle_events == 2
+
+    calls.clear()
+    with pytest.raises(_ThrottlingError, match="3"):
+        await rate_limiter.call(lambda: _request(5), _is_throttling_error)
+    assert len(calls) == 3
+
+    calls.clear()
+    # not a throttling error: not retried
+    with pytest.raises(_ThrottlingError):
+        await rate_limiter.call(lambda: _request(5), lambda _: False)
+    assert len(calls) == 1
+
+
+async def test_acquire_rate():
+    rate_limiter = AdaptiveRateLimiter(50)
+    queue_depths = []
+
+    async def _acquire():
+        await rate_limiter.acquire()
+        queue_depths.append(rate_limiter.queue_depth)
+
+    with mock.patch.object(asyncio, "sleep", mock.AsyncMock(wraps=asyncio.sleep)) as sleep_mock:
+        await asyncio.gather(*(_acquire() for _ in range(100)))
+    # 50 requests burst, then 50 requests per second
+    assert sleep_mock.await_count == 50
+    assert 0.9 < max(call.args[0] for call in sleep_mock.await_args_list) <= 1
+    assert max(queue_depths) >= 40
+    assert rate_limiter.queue_depth == 0
+
+
+async def test_rate_limiters():
+    singleton.Singleton._instances.pop(AdaptiveRateLimiters, None)
+    try:
+        rate_limiter = AdaptiveRateLimiters.instance().get_rate_limiter(("kucoin", "spot"), max_rate=10)
+        assert rate_limiter.max_rate == 10
+        assert AdaptiveRateLimiters.instance().get_rate_limiter(("kucoin", "spot"), max_rate=20) is rate_limiter
+        futures_rate_limiter = AdaptiveRateLimiters.instance().get_rate_limiter(("kucoin", "future"), max_rate=20)
+        assert futures_rate_limiter is not rate_limiter
+        assert futures_rate_limiter.max_rate == 20
+        assert AdaptiveRateLimiters.instance().get_rate_limiter(("coinbase", "spot"), max_rate=20) \
+            is not rate_limiter
+    finally:
+        singleton.Singleton._instances.pop(AdaptiveRateLimiters, None)
@@ -13,10 +13,10 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
-import octobot_trading.exchanges as exchanges
+import tentacles.Trading.Exchange.bulk_ticker_poller as bulk_ticker_poller
 
 
-class Bitstamp(exchanges.RestExchange):
+class Bitstamp(bulk_ticker_poller.BulkTickersRestExchange):
     DESCRIPTION = ""
 
     FIX_MARKET_STATUS = True
@@ -0,0 +1,2 @@
+from .ticker_poller import BulkTickerPoller
+from .bulk_tickers_exchange import BulkTickersRestExchange
\ No newline at end of file
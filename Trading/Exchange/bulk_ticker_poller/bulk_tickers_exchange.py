@@ -0,0 +1,81 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import typing
+import ccxt
+
+import octobot_commons.html_util as html_util
+import octobot_trading.constants as trading_constants
+import octobot_trading.errors as trading_errors
+import octobot_trading.exchanges as exchanges
+import octobot_trading.exchanges.exchange_websocket_factory as exchange_websocket_factory
+
+import tentacles.Trading.Exchange.bulk_ticker_poller.ticker_poller as ticker_poller
+
+
+class BulkTickersRestExchange(exchanges.RestExchange):
+    """
+    RestExchange fetching the tickers of every symbol at once when tickers are not managed by websocket and the
+    connector supports it: each ticker refresh cycle then costs a single request instead of one request per symbol.
+    """
+    # max age of bulk fetched tickers: should be lower than the tickers refresh interval
+    BULK_TICKERS_MAX_AGE = 5
+
+    def __init__(
+        self, config, exchange_manager, exchange_config_by_exchange: typing.Optional[dict[str, dict]],
+        connector_class=None
+    ):
+        super().__init__(config, exchange_manager, exchange_config_by_exchange, connector_class=connector_class)
+        self.bulk_ticker_poller = ticker_poller.BulkTickerPoller(
+            self.get_latest_price_tickers, self.BULK_TICKERS_MAX_AGE
+        )
+
+    async def get_price_ticker(self, symbol: str, **kwargs: dict) -> typing.Optional[dict]:
+        if not kwargs and self.use_bulk_tickers():
+            if (ticker := await self.bulk_ticker_poller.get_ticker(symbol)) is not None:
+                return ticker
+            # missing from all tickers: fetch it on its own
+        return await super().get_price_ticker(symbol, **kwargs)
+
+    async def get_latest_price_tickers(self) -> dict:
+        """
+        :return: the tickers of the latest all tickers request only, get_all_currencies_price_ticker also returns
+        tickers of symbols that are missing from the latest request
+        """
+        try:
+            with self.connector.error_describer():
+                tickers = {
+                    symbol: self.connector.adapter.adapt_ticker(ticker)
+                    for symbol, ticker in (await self.connector.client.fetch_tickers()).items()
+                }
+            self.connector.all_currencies_price_ticker.update(tickers)
+            return tickers
+        except ccxt.NotSupported as err:
+            raise trading_errors.NotSupported(err) from err
+        except ccxt.BaseError as err:
+            raise trading_errors.FailedRequest(
+                f"Failed to get_latest_price_tickers {html_util.get_html_summary_if_relevant(err)}"
+            ) from err
+
+    def use_bulk_tickers(self) -> bool:
+        return self.is_supporting_bulk_tickers() and not exchange_websocket_factory.is_channel_managed_by_websocket(
+            self.exchange_manager, trading_constants.TICKER_CHANNEL
+        )
+
+    def is_supporting_bulk_tickers(self) -> bool:
+        """
+        :return: True when the connector can fetch every ticker in a single request
+        """
+        return self.connector.client.has.get("fetchTickers") is True
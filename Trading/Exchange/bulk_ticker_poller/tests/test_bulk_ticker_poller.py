@@ -0,0 +1,212 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+
+import aiohttp.web
+import pytest
+
+import octobot_commons.constants as commons_constants
+import octobot_trading.enums as trading_enums
+import octobot_trading.errors as trading_errors
+import octobot_trading.exchanges as exchanges
+from tentacles.Trading.Exchange.bulk_ticker_poller import BulkTickerPoller
+from tentacles.Trading.Exchange.bitstamp import Bitstamp
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+ROUND_TRIP_TIME = 0.02
+ALL_TICKERS_PATH = "/api/v2/ticker/"
+SYMBOLS = [f"C{index}/USD" for index in range(150)]
+
+
+async def test_concurrent_calls_share_a_single_request():
+    calls = []
+
+    async def _fetch_all_tickers():
+        calls.append(None)
+        await asyncio.sleep(0.05)
+        return {symbol: {"symbol": symbol, "call": len(calls)} for symbol in SYMBOLS}
+
+    poller = BulkTickerPoller(_fetch_all_tickers, 0.2)
+    tickers = await asyncio.gather(*(poller.get_ticker(symbol) for symbol in SYMBOLS))
+    # fanned out to each symbol
+    assert [ticker["symbol"] for ticker in tickers] == SYMBOLS
+    assert len(calls) == poller.requests_count == 1
+    assert await poller.get_ticker("unknown") is None
+    assert (await poller.get_ticker(SYMBOLS[0]))["call"] == 1
+    await asyncio.sleep(0.2)
+    # outdated tickers
+    assert (await poller.get_ticker(SYMBOLS[0]))["call"] == 2
+    poller.reset()
+    assert (await poller.get_ticker(SYMBOLS[0]))["call"] == 3
+
+
+async def test_failed_and_cancelled_refresh():
+    calls = []
+
+    async def _fetch_all_tickers():
+        calls.append(None)
+        await asyncio.sleep(0.05)
+        if len(calls) == 1:
+            raise trading_errors.FailedRequest("error")
+        return {SYMBOLS[0]: {"call": len(calls)}}
+
+    poller = BulkTickerPoller(_fetch_all_tickers, 10)
+    results = await asyncio.gather(poller.get_ticker(SYMBOLS[0]), poller.get_ticker(SYMBOLS[1]),
+                                   return_exceptions=True)
+    # every waiting call gets the error
+    assert all(isinstance(result, trading_errors.FailedRequest) for result in results)
+    assert not poller.is_up_to_date()
+    # cancelling a call does not cancel the request awaited by other calls
+    cancelled = asyncio.create_task(poller.get_ticker(SYMBOLS[0]))
+    await asyncio.sleep(0.01)
+    other = asyncio.create_task(poller.get_ticker(SYMBOLS[0]))
+    cancelled.cancel()
+    assert await other == {"call": 2}
+    assert len(calls) == 2
+
+
+class _FakeBitstampRestServer:
+    def __init__(self):
+        self.requests = []
+        # last symbol is missing from all tickers
+        self.missing_symbols = {SYMBOLS[-1]}
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = aiohttp.web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        self.runner = aiohttp.web.AppRunner(app)
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _handle(self, request):
+        self.requests.append(request.path)
+        await asyncio.sleep(ROUND_TRIP_TIME)
+        if request.path == ALL_TICKERS_PATH:
+            return aiohttp.web.json_response(
+                [self._ticker(symbol) for symbol in SYMBOLS if symbol not in self.missing_symbols]
+            )
+        pair = request.path.split("/")[-2]
+        return aiohttp.web.json_response(
+            self._ticker(next(symbol for symbol in SYMBOLS if _market_id(symbol) == pair))
+        )
+
+    @staticmethod
+    def _ticker(symbol):
+        price = str(SYMBOLS.index(symbol) + 1)
+        return {
+            "pair": symbol, "timestamp": "1700000000", "last": price, "open": price, "high": price, "low": price,
+            "bid": price, "ask": price, "vwap": price, "volume": "100", "open_24": price, "percent_change_24": "0",
+        }
+
+
+def _market_id(symbol):
+    return symbol.replace("/", "").lower()
+
+
+@contextlib.asynccontextmanager
+async def _bitstamp_exchange():
+    server = _FakeBitstampRestServer()
+    await server.start()
+    config = {commons_constants.CONFIG_EXCHANGES: {Bitstamp.get_name(): {}}}
+    exchange_manager = exchanges.ExchangeManager(config, Bitstamp.get_name())
+    exchange = exchange_manager.exchange = Bitstamp(config, exchange_manager, None)
+    client = exchange.connector.client
+    try:
+        client.urls["api"]["public"] = f"{server.url}/api"
+        client.enableRateLimit = False
+        client.set_markets([
+            {
+                "id": _market_id(symbol), "symbol": symbol, "base": symbol.split("/")[0], "quote": "USD",
+                "settle": None, "baseId": symbol.split("/")[0].lower(), "quoteId": "usd", "settleId": None,
+                "type": "spot", "spot": True, "margin": False, "swap": False, "future": False, "option": False,
+                "active": True, "contract": False, "linear": None, "inverse": None, "contractSize": None,
+                "precision": {"amount": 0.0001, "price": 0.01}, "limits": {}, "info": {},
+            }
+            for symbol in SYMBOLS
+        ])
+        yield exchange, server
+    finally:
+        await client.close()
+        await server.stop()
+
+
+def _close(ticker):
+    return ticker[trading_enums.ExchangeConstantsTickersColumns.CLOSE.value]
+
+
+async def test_price_tickers_refresh_cycle():
+    async with _bitstamp_exchange() as (exchange, server):
+        assert exchange.use_bulk_tickers()
+
+        async def _refresh_cycle(get_price_ticker):
+            # same as TickerUpdater: initial concurrent refresh then one refresh per symbol
+            server.requests.clear()
+            tickers = list(await asyncio.gather(*(get_price_ticker(exchange, symbol) for symbol in SYMBOLS)))
+            for symbol in SYMBOLS:
+                tickers.append(await get_price_ticker(exchange, symbol))
+            return tickers, len(server.requests)
+
+        previous_tickers, previous_requests = await _refresh_cycle(exchanges.RestExchange.get_price_ticker)
+        tickers, requests = await _refresh_cycle(Bitstamp.get_price_ticker)
+        assert [_close(ticker) for ticker in tickers] == [_close(ticker) for ticker in previous_tickers] \
+            == [float(index + 1) for index in range(len(SYMBOLS))] * 2
+        assert previous_requests == len(SYMBOLS) * 2
+        # one all tickers request and per-symbol requests for the ticker missing from all tickers
+        assert requests == 3
+        assert server.requests.count(ALL_TICKERS_PATH) == 1
+
+        # outdated tickers: refreshed at once
+        exchange.bulk_ticker_poller.reset()
+        server.requests.clear()
+        await exchange.get_price_ticker(SYMBOLS[0])
+        await exchange.get_price_ticker(SYMBOLS[1])
+        assert server.requests == [ALL_TICKERS_PATH]
+        # ticker params: fetched on its own
+        server.requests.clear()
+        await exchange.get_price_ticker(SYMBOLS[0], type="spot")
+        assert server.requests == [f"/api/v2/ticker/{_market_id(SYMBOLS[0])}/"]
+
+        # connector not supporting all tickers requests: use per-symbol requests
+        exchange.connector.client.has["fetchTickers"] = False
+        server.requests.clear()
+        await exchange.get_price_ticker(SYMBOLS[0])
+        assert server.requests == [f"/api/v2/ticker/{_market_id(SYMBOLS[0])}/"]
+
+
+async def test_ticker_missing_from_latest_all_tickers():
+    async with _bitstamp_exchange() as (exchange, server):
+        assert _close(await exchange.get_price_ticker(SYMBOLS[0])) == 1
+        # symbol is not in all tickers anymore: fetched on its own at the next refresh cycle
+        server.missing_symbols.add(SYMBOLS[0])
+        exchange.bulk_ticker_poller.last_refresh_time -= Bitstamp.BULK_TICKERS_MAX_AGE
+        server.requests.clear()
+        assert _close(await exchange.get_price_ticker(SYMBOLS[0])) == 1
+        assert server.requests == [ALL_TICKERS_PATH, f"/api/v2/ticker/{_market_id(SYMBOLS[0])}/"]
+        assert await exchange.bulk_ticker_poller.get_ticker(SYMBOLS[0]) is None
+        # other symbols are still up to date
+        server.requests.clear()
+        assert _close(await exchange.get_price_ticker(SYMBOLS[1])) == 2
+        assert server.requests == []
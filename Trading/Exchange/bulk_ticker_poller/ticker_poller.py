@@ -0,0 +1,62 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import time
+import typing
+
+
+class BulkTickerPoller:
+    """
+    Refreshes the tickers of every symbol using a single all tickers request per refresh cycle.
+    Tickers are considered up to date for max_tickers_age seconds. Concurrent per-symbol calls share the same request
+    and each of them receives its symbol ticker.
+    """
+    def __init__(self, fetch_all_tickers, max_tickers_age):
+        self.fetch_all_tickers = fetch_all_tickers
+        self.max_tickers_age = max_tickers_age
+        self.tickers = {}
+        self.last_refresh_time = None
+        self.requests_count = 0
+        self._refresh_task = None
+
+    async def get_ticker(self, symbol: str) -> typing.Optional[dict]:
+        """
+        :param symbol: the ticker symbol
+        :return: the up to date symbol ticker or None when it is missing from all tickers
+        """
+        if not self.is_up_to_date():
+            await self.refresh()
+        return self.tickers.get(symbol)
+
+    def is_up_to_date(self) -> bool:
+        return self.last_refresh_time is not None \
+            and time.monotonic() - self.last_refresh_time < self.max_tickers_age
+
+    async def refresh(self) -> dict:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        # shielded: a cancelled caller should not cancel the request awaited by others
+        return await asyncio.shield(self._refresh_task)
+
+    def reset(self):
+        self.tickers = {}
+        self.last_refresh_time = None
+
+    async def _refresh(self) -> dict:
+        self.requests_count += 1
+        self.tickers = await self.fetch_all_tickers() or {}
+        self.last_refresh_time = time.monotonic()
+        return self.tickers
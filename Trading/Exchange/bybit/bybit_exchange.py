@@ -13,6 +13,7 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
 import decimal
 import typing
 
@@ -26,6 +27,7 @@ import octobot_trading.exchanges.connectors.ccxt.constants as ccxt_constants
 import octobot_trading.constants as constants
 import octobot_trading.personal_data as trading_personal_data
 import octobot_trading.errors
+import tentacles.Trading.Exchange.order_location_cache as order_location_cache
 
 
 class Bybit(exchanges.RestExchange):
@@ -105,6 +107,8 @@ class Bybit(exchanges.RestExchange):
         super().__init__(config, exchange_manager, exchange_config_by_exchange, connector_class=connector_class)
         self.order_quantity_by_amount = {}
         self.order_quantity_by_id = {}
+        # open or closed orders and stop orders filter of each fetched order
+        self.order_location_cache = order_location_cache.OrderLocationCache([self.ORDER_FILTER])
 
     def get_additional_connector_config(self):
         connector_config = {
@@ -160,16 +164,38 @@ class Bybit(exchanges.RestExchange):
 
     async def get_open_orders(self, symbol: str = None, since: int = None,
                               limit: int = None, **kwargs: dict) -> list:
-        orders = await super().get_open_orders(symbol=symbol, since=since, limit=limit, **kwargs)
-        if not self.exchange_manager.is_future:
-            kwargs = kwargs or {}
-            # include stop orders
-            kwargs[self.ORDER_FILTER] = self.SPOT_STOP_ORDERS_FILTER
-            orders += await super().get_open_orders(symbol=symbol, since=since, limit=limit, **kwargs)
+        if self.exchange_manager.is_future:
+            return await self._get_located_orders(True, {}, symbol=symbol, since=since, limit=limit, **kwargs)
+        # include stop orders
+        regular_orders, stop_orders = await asyncio.gather(
+            self._get_located_orders(True, {}, symbol=symbol, since=since, limit=limit, **kwargs),
+            self._get_located_orders(
+                True, {self.ORDER_FILTER: self.SPOT_STOP_ORDERS_FILTER},
+                symbol=symbol, since=since, limit=limit, **kwargs
+            ),
+        )
+        return regular_orders + stop_orders
+
+    async def get_closed_orders(self, symbol: str = None, since: int = None,
+                                limit: int = None, **kwargs: dict) -> list:
+        return await self._get_located_orders(False, {}, symbol=symbol, since=since, limit=limit, **kwargs)
+
+    async def _get_located_orders(self, is_open, location_params, symbol=None, since=None, limit=None, **kwargs):
+        kwargs = {**kwargs, **location_params}
+        if is_open:
+            orders = await super().get_open_orders(symbol=symbol, since=since, limit=limit, **kwargs)
+        else:
+            orders = await super().get_closed_orders(symbol=symbol, since=since, limit=limit, **kwargs)
+        self.order_location_cache.add_orders(orders, is_open, kwargs)
         return orders
 
     async def get_order(self, exchange_order_id: str, symbol: str = None, **kwargs: dict) -> dict:
-        # regular get order is not supported
+        # regular get order is not supported: look for the order where it was last seen first
+        async def _fetch_location_orders(is_open, location_params):
+            return await self._get_located_orders(is_open, location_params, symbol=symbol, **kwargs)
+
+        if order := await self.order_location_cache.find_order(exchange_order_id, _fetch_location_orders):
+            return order
         return await self.get_order_from_open_and_closed_orders(exchange_order_id, symbol=symbol, **kwargs)
 
     async def cancel_order(
@@ -0,0 +1,157 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+
+import aiohttp.web
+import pytest
+
+import octobot_commons.constants as commons_constants
+import octobot_trading.enums as trading_enums
+import octobot_trading.exchanges as exchanges
+from tentacles.Trading.Exchange.bybit import Bybit
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+SYMBOL = "BTC/USDT"
+# longer than ccxt rate limit delays: concurrent requests overlap
+ROUND_TRIP_TIME = 0.2
+OPEN_ORDERS_PATH = "/v5/order/realtime"
+CLOSED_ORDERS_PATH = "/v5/order/history"
+
+
+def _order(order_id, status="New", order_filter="Order"):
+    return {
+        "orderId": str(order_id), "orderLinkId": "", "symbol": "BTCUSDT", "price": "30000", "qty": "0.01",
+        "side": "Buy", "orderStatus": status, "orderType": "Limit", "timeInForce": "GTC",
+        "createdTime": "1700000000000", "updatedTime": "1700000000000", "cumExecQty": "0", "cumExecValue": "0",
+        "avgPrice": "", "triggerPrice": "29000" if order_filter == "StopOrder" else "", "orderFilter": order_filter,
+    }
+
+
+class _FakeBybitRestServer:
+    def __init__(self):
+        # orders by (path, orderFilter)
+        self.orders = {}
+        self.requests = []
+        self.sent_orders = 0
+        self.pending_requests = 0
+        self.max_concurrent_requests = 0
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = aiohttp.web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        self.runner = aiohttp.web.AppRunner(app)
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _handle(self, request):
+        self.requests.append(request.path_qs)
+        orders = self.orders.get((request.path, request.query.get("orderFilter", "Order")), [])
+        self.sent_orders += len(orders)
+        self.pending_requests += 1
+        self.max_concurrent_requests = max(self.max_concurrent_requests, self.pending_requests)
+        await asyncio.sleep(ROUND_TRIP_TIME)
+        self.pending_requests -= 1
+        return aiohttp.web.json_response(
+            {"retCode": 0, "retMsg": "OK", "result": {"list": orders}, "time": 1700000000000}
+        )
+
+
+@contextlib.asynccontextmanager
+async def _bybit_spot_exchange():
+    server = _FakeBybitRestServer()
+    await server.start()
+    config = {commons_constants.CONFIG_EXCHANGES: {Bybit.get_name(): {}}}
+    exchange_manager = exchanges.ExchangeManager(config, Bybit.get_name())
+    exchange = exchange_manager.exchange = Bybit(config, exchange_manager, None)
+    client = exchange.connector.client
+    try:
+        for api in list(client.urls["api"]):
+            client.urls["api"][api] = server.url
+        client.apiKey, client.secret = "key", "secret"
+        client.set_markets([{
+            "id": "BTCUSDT", "symbol": SYMBOL, "base": "BTC", "quote": "USDT", "settle": None,
+            "baseId": "BTC", "quoteId": "USDT", "settleId": None, "type": "spot", "spot": True, "margin": False,
+            "swap": False, "future": False, "option": False, "active": True, "contract": False, "linear": None,
+            "inverse": None, "contractSize": None, "precision": {"amount": 0.0001, "price": 0.01}, "limits": {},
+            "info": {"symbol": "BTCUSDT"},
+        }])
+        yield exchange, server
+    finally:
+        await client.close()
+        await server.stop()
+
+
+def _exchange_id(order):
+    return order[trading_enums.ExchangeConstantsOrderColumns.EXCHANGE_ID.value] if order else None
+
+
+async def test_get_order_from_last_seen_location():
+    async with _bybit_spot_exchange() as (exchange, server):
+        server.orders = {
+            (OPEN_ORDERS_PATH, "Order"): [_order(i) for i in range(200)],
+            (OPEN_ORDERS_PATH, "StopOrder"): [_order("stop", order_filter="StopOrder")],
+            (CLOSED_ORDERS_PATH, "Order"): [_order(i, status="Cancelled") for i in range(1000, 1300)],
+        }
+
+        async def _get_order(exchange_order_id):
+            server.requests.clear()
+            server.sent_orders = 0
+            server.max_concurrent_requests = 0
+            order = await exchange.get_order(exchange_order_id, SYMBOL)
+            return order, len(server.requests), server.sent_orders, server.max_concurrent_requests
+
+        # unknown locations: full scan
+        open_full_scan = await _get_order("stop")
+        assert _exchange_id(open_full_scan[0]) == "stop"
+        closed_full_scan = await _get_order("1250")
+        assert _exchange_id(closed_full_scan[0]) == "1250"
+        # open stop orders and regular orders are fetched concurrently
+        assert open_full_scan[3] == 2
+
+        open_cached = await _get_order("stop")
+        assert _exchange_id(open_cached[0]) == "stop"
+        assert server.requests == [f"{OPEN_ORDERS_PATH}?symbol=BTCUSDT&category=spot&orderFilter=StopOrder"]
+        closed_cached = await _get_order("1250")
+        assert _exchange_id(closed_cached[0]) == "1250"
+        assert server.requests == [f"{CLOSED_ORDERS_PATH}?symbol=BTCUSDT&category=spot&orderStatus=Filled"]
+        assert open_cached[2] < open_full_scan[2] / 100
+        assert closed_cached[2] < closed_full_scan[2] / 1.5
+        # one request instead of a scan of every location
+        assert open_cached[1] == closed_cached[1] == 1
+        assert closed_full_scan[1] > 1
+
+        # order 10 has been filled: found in closed orders of the same location
+        server.orders[(OPEN_ORDERS_PATH, "Order")].pop(10)
+        server.orders[(CLOSED_ORDERS_PATH, "Order")].append(_order(10, status="Cancelled"))
+        order, requests_count, _, _ = await _get_order("10")
+        assert _exchange_id(order) == "10"
+        assert requests_count == 2
+        assert exchange.order_location_cache.get_location("10").is_open is False
+
+        # unknown order: full scan after the location cache miss
+        misses = exchange.order_location_cache.misses
+        assert (await _get_order("unknown"))[0] is None
+        assert exchange.order_location_cache.misses == misses + 1
@@ -14,10 +14,10 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 
-import octobot_trading.exchanges as exchanges
+import tentacles.Trading.Exchange.bulk_ticker_poller as bulk_ticker_poller
 
 
-class Hitbtc(exchanges.RestExchange):
+class Hitbtc(bulk_ticker_poller.BulkTickersRestExchange):
     DESCRIPTION = ""
 
     FIX_MARKET_STATUS = True
@@ -13,21 +13,14 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
-import cachetools
-import aiohttp
 import typing
 
 import octobot_commons.logging as commons_logging
-import octobot_commons.constants
 import octobot_trading.exchanges as exchanges
 import octobot_trading.errors as errors
 import octobot_tentacles_manager.api
 from ..hollaex.hollaex_exchange import hollaex
-
-
-_EXCHANGE_REMOTE_CONFIG_BY_EXCHANGE_KIT_URL: cachetools.TTLCache[str, dict] = cachetools.TTLCache(
-    maxsize=50, ttl=octobot_commons.constants.DAYS_TO_SECONDS
-)
+from .kit_cache import HollaexKitCache
 
 
 class HollaexAutofilled(hollaex):
@@ -57,9 +50,9 @@ class HollaexAutofilled(hollaex):
         self._apply_config(
             self._parse_autofilled_exchange_details(
                 self.tentacle_config,
-                _EXCHANGE_REMOTE_CONFIG_BY_EXCHANGE_KIT_URL[
+                HollaexKitCache.instance().get_cached_kit(
                     self._get_kit_url(self.tentacle_config, exchange_manager.exchange_name)
-                ],
+                ),
                 exchange_manager.exchange_name
             )
         )
@@ -90,15 +83,7 @@ class HollaexAutofilled(hollaex):
             exchange_kit_url = cls._get_kit_url(tentacle_config, exchange_name)
         except KeyError:
             raise errors.NotSupported(f"{exchange_name} is not supported by {cls.get_name()}")
-        if exchange_kit_url in _EXCHANGE_REMOTE_CONFIG_BY_EXCHANGE_KIT_URL:
-            return _EXCHANGE_REMOTE_CONFIG_BY_EXCHANGE_KIT_URL[exchange_kit_url]
-        commons_logging.get_logger(cls.get_name()).info(
-            f"Fetching {exchange_name} HollaEx kit from {exchange_kit_url}"
-        )
-        async with aiohttp.ClientSession() as session:
-            async with session.get(exchange_kit_url) as response:
-                _EXCHANGE_REMOTE_CONFIG_BY_EXCHANGE_KIT_URL[exchange_kit_url] = await response.json()
-        return _EXCHANGE_REMOTE_CONFIG_BY_EXCHANGE_KIT_URL[exchange_kit_url]
+        return await HollaexKitCache.instance().get_kit(exchange_kit_url)
 
     def _supports_autofill(self, exchange_name):
         try:
@@ -0,0 +1,126 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import os
+import time
+
+import aiohttp
+
+import octobot_commons.constants as commons_constants
+import octobot_commons.json_util as json_util
+import octobot_commons.logging as commons_logging
+import octobot_commons.singleton as singleton
+
+
+class HollaexKitCache(singleton.Singleton):
+    """
+    Process-wide HollaEx kits cache, persisted in the user folder to be available on restart.
+    Kits are considered up to date during KIT_TTL. Older kits are returned right away and refreshed in
+    background until they reach KIT_MAX_STALE_AGE, after which they are fetched again before being returned.
+    Concurrent fetches of the same kit share the same request and every request shares the same session.
+    """
+    KIT_TTL = commons_constants.DAYS_TO_SECONDS
+    KIT_MAX_STALE_AGE = 7 * commons_constants.DAYS_TO_SECONDS
+    TIMESTAMP = "timestamp"
+    VALUE = "value"
+
+    def __init__(self):
+        self.logger = commons_logging.get_logger(self.__class__.__name__)
+        self.file_path = os.path.join(commons_constants.USER_FOLDER, f"{self.__class__.__name__}.json")
+        self.kits = None
+        self._fetch_tasks = {}
+        self._session = None
+        self._session_users = 0
+
+    async def get_kit(self, kit_url) -> dict:
+        """
+        :return: the cached kit when up to date or stale, the fetched kit otherwise
+        """
+        cached_kit = self._get_cached_kits().get(kit_url)
+        if cached_kit is not None:
+            age = time.time() - cached_kit[self.TIMESTAMP]
+            if age < self.KIT_TTL:
+                return cached_kit[self.VALUE]
+            if age < self.KIT_MAX_STALE_AGE:
+                # stale-while-revalidate: errors are logged by _fetch_kit
+                self._get_fetch_task(kit_url).add_done_callback(
+                    lambda task: task.cancelled() or task.exception()
+                )
+                return cached_kit[self.VALUE]
+        try:
+            return await asyncio.shield(self._get_fetch_task(kit_url))
+        except Exception as err:
+            if cached_kit is None:
+                raise
+            self.logger.warning(f"Failed to fetch {kit_url} kit, using the kit cached {cached_kit[self.TIMESTAMP]}: "
+                                f"{err} ({err.__class__.__name__})")
+            return cached_kit[self.VALUE]
+
+    def get_cached_kit(self, kit_url) -> dict:
+        return self._get_cached_kits()[kit_url][self.VALUE]
+
+    def _get_fetch_task(self, kit_url) -> asyncio.Task:
+        if kit_url not in self._fetch_tasks:
+            self._fetch_tasks[kit_url] = asyncio.create_task(self._fetch_kit(kit_url))
+        return self._fetch_tasks[kit_url]
+
+    async def _fetch_kit(self, kit_url) -> dict:
+        try:
+            self.logger.info(f"Fetching HollaEx kit from {kit_url}")
+            async with self._shared_session() as session:
+                async with session.get(kit_url) as response:
+                    response.raise_for_status()
+                    kit = await response.json()
+            self._get_cached_kits()[kit_url] = {
+                self.TIMESTAMP: time.time(),
+                self.VALUE: kit,
+            }
+            self._save_kits()
+            return kit
+        except Exception as err:
+            self.logger.warning(f"Error when fetching HollaEx kit from {kit_url}: {err} ({err.__class__.__name__})")
+            raise
+        finally:
+            self._fetch_tasks.pop(kit_url, None)
+
+    @contextlib.asynccontextmanager
+    async def _shared_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        self._session_users += 1
+        try:
+            yield self._session
+        finally:
+            self._session_users -= 1
+            if self._session_users == 0:
+                # close when unused not to keep a session bound to the current event loop
+                session = self._session
+                self._session = None
+                await session.close()
+
+    def _get_cached_kits(self) -> dict:
+        if self.kits is None:
+            self.kits = json_util.read_file(self.file_path, raise_errors=False, on_error_value={}) \
+                if os.path.isfile(self.file_path) else {}
+        return self.kits
+
+    def _save_kits(self):
+        try:
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+            json_util.safe_dump(self.kits, self.file_path)
+        except Exception as err:
+            self.logger.exception(err, True, f"Error when saving HollaEx kits cache: {err}")
@@ -0,0 +1,155 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import os
+
+import aiohttp
+import aiohttp.web
+import pytest
+
+import octobot_commons.singleton as singleton
+from tentacles.Trading.Exchange.hollaex_autofilled import HollaexAutofilled
+from tentacles.Trading.Exchange.hollaex_autofilled.kit_cache import HollaexKitCache
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+KIT_DELAY = 0.3
+EXCHANGES = ["exchange_1", "exchange_2", "exchange_3"]
+
+
+class _KitServer:
+    def __init__(self):
+        self.requests_by_exchange = {exchange: 0 for exchange in EXCHANGES}
+        self.api_name_suffix = ""
+        self.pending_requests = 0
+        self.max_concurrent_requests = 0
+
+    async def kit(self, request):
+        exchange = request.match_info["exchange"]
+        self.requests_by_exchange[exchange] += 1
+        self.pending_requests += 1
+        self.max_concurrent_requests = max(self.max_concurrent_requests, self.pending_requests)
+        await asyncio.sleep(KIT_DELAY)
+        self.pending_requests -= 1
+        return aiohttp.web.json_response({
+            "api_name": f"{exchange}{self.api_name_suffix}", "logo_image": f"https://{exchange}/logo.png",
+            "links": {"referral_link": f"https://{exchange}", "api": f"https://api.{exchange}"},
+        })
+
+
+@contextlib.asynccontextmanager
+async def _kit_server():
+    server = _KitServer()
+    app = aiohttp.web.Application()
+    app.router.add_get("/{exchange}/v2/kit", server.kit)
+    runner = aiohttp.web.AppRunner(app)
+    await runner.setup()
+    site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    tentacle_config = {
+        HollaexAutofilled.AUTO_FILLED_KEY: {
+            exchange: {HollaexAutofilled.URL_KEY: f"{url}/{exchange}"}
+            for exchange in EXCHANGES
+        }
+    }
+    try:
+        yield server, tentacle_config
+    finally:
+        await runner.cleanup()
+
+
+def _new_kit_cache(file_path):
+    # same as on restart: kits are only available on disk
+    singleton.Singleton._instances.pop(HollaexKitCache, None)
+    HollaexKitCache.instance().file_path = file_path
+    return HollaexKitCache.instance()
+
+
+@pytest.fixture
+def kits_file(tmp_path):
+    yield os.path.join(tmp_path, "kits.json")
+    singleton.Singleton._instances.pop(HollaexKitCache, None)
+
+
+async def _fetch_kits_with_new_sessions(tentacle_config):
+    # previous implementation: serial fetches, each using a new session
+    kits = []
+    for exchange in EXCHANGES:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(HollaexAutofilled._get_kit_url(tentacle_config, exchange)) as response:
+                kits.append(await response.json())
+    return kits
+
+
+async def _fetch_kits(tentacle_config, fetches_by_exchange=1):
+    return await asyncio.gather(*(
+        HollaexAutofilled._cached_fetch_autofilled_config(tentacle_config, exchange)
+        for exchange in EXCHANGES
+        for _ in range(fetches_by_exchange)
+    ))
+
+
+async def test_startup_requests(kits_file):
+    async with _kit_server() as (server, tentacle_config):
+        previous_kits = await _fetch_kits_with_new_sessions(tentacle_config)
+        assert server.max_concurrent_requests == 1
+        server.requests_by_exchange = {exchange: 0 for exchange in EXCHANGES}
+
+        # cold start: concurrent and de-duplicated fetches
+        _new_kit_cache(kits_file)
+        kits = await _fetch_kits(tentacle_config, fetches_by_exchange=3)
+        assert kits == [kit for kit in previous_kits for _ in range(3)]
+        assert server.requests_by_exchange == {exchange: 1 for exchange in EXCHANGES}
+        assert server.max_concurrent_requests == len(EXCHANGES)
+        assert HollaexKitCache.instance()._session is None
+
+        # restart: kits are read from disk
+        _new_kit_cache(kits_file)
+        assert await _fetch_kits(tentacle_config) == previous_kits
+        assert server.requests_by_exchange == {exchange: 1 for exchange in EXCHANGES}
+
+
+async def test_stale_while_revalidate(kits_file):
+    async with _kit_server() as (server, tentacle_config):
+        kit_cache = _new_kit_cache(kits_file)
+        kit_url = HollaexAutofilled._get_kit_url(tentacle_config, EXCHANGES[0])
+        assert (await kit_cache.get_kit(kit_url))["api_name"] == EXCHANGES[0]
+        server.api_name_suffix = "_updated"
+
+        # stale kit: returned right away and refreshed in background
+        kit_cache.kits[kit_url][kit_cache.TIMESTAMP] -= kit_cache.KIT_TTL
+        assert (await kit_cache.get_kit(kit_url))["api_name"] == EXCHANGES[0]
+        assert not kit_cache._fetch_tasks[kit_url].done()
+        await kit_cache._fetch_tasks[kit_url]
+        assert (await kit_cache.get_kit(kit_url))["api_name"] == f"{EXCHANGES[0]}_updated"
+        assert _new_kit_cache(kits_file).get_cached_kit(kit_url)["api_name"] == f"{EXCHANGES[0]}_updated"
+        assert server.requests_by_exchange[EXCHANGES[0]] == 2
+
+        # expired kit: fetched again
+        kit_cache = HollaexKitCache.instance()
+        server.api_name_suffix = "_expired"
+        kit_cache.kits[kit_url][kit_cache.TIMESTAMP] -= kit_cache.KIT_MAX_STALE_AGE
+        assert (await kit_cache.get_kit(kit_url))["api_name"] == f"{EXCHANGES[0]}_expired"
+        assert server.requests_by_exchange[EXCHANGES[0]] == 3
+
+    # unreachable kit server: expired kit is used
+    kit_cache.kits[kit_url][kit_cache.TIMESTAMP] -= kit_cache.KIT_MAX_STALE_AGE
+    assert (await kit_cache.get_kit(kit_url))["api_name"] == f"{EXCHANGES[0]}_expired"
+    with pytest.raises(aiohttp.ClientError):
+        await kit_cache.get_kit(HollaexAutofilled._get_kit_url(tentacle_config, EXCHANGES[1]))
@@ -14,59 +14,92 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import collections
 import time
 import decimal
 import typing
 import ccxt
 
-import octobot_commons.logging as logging
 import octobot_trading.errors
 import octobot_trading.exchanges as exchanges
-import octobot_trading.exchanges.connectors.ccxt.ccxt_connector as ccxt_connector
+import octobot_trading.exchanges.connectors.ccxt.ccxt_client_util as ccxt_client_util
 import octobot_trading.exchanges.connectors.ccxt.enums as ccxt_enums
 import octobot_trading.exchanges.connectors.ccxt.constants as ccxt_constants
 import octobot_commons.constants as commons_constants
+import octobot_commons.html_util as html_util
 import octobot_trading.constants as constants
 import octobot_trading.enums as trading_enums
 
+import tentacles.Trading.Exchange.adaptive_rate_limiter as adaptive_rate_limiter
 
-def _kucoin_retrier(f):
-    async def kucoin_retrier_wrapper(*args, **kwargs):
-        last_error = None
-        for i in range(0, Kucoin.FAKE_DDOS_ERROR_INSTANT_RETRY_COUNT):
-            try:
-                return await f(*args, **kwargs)
-            except (octobot_trading.errors.FailedRequest, ccxt.ExchangeError) as err:
-                last_error = err
-                rest_exchange = args[0]  # self
-                if (rest_exchange.connector is not None) and \
-                    rest_exchange.connector.client.last_http_response and \
-                    Kucoin.INSTANT_RETRY_ERROR_CODE in rest_exchange.connector.client.last_http_response:
-                    # should retry instantly, error on kucoin side
-                    # see https://github.com/Drakkar-Software/OctoBot/issues/2000
-                    logging.get_logger(Kucoin.get_name()).debug(
-                        f"{Kucoin.INSTANT_RETRY_ERROR_CODE} error on {f.__name__}(args={args[1:]} kwargs={kwargs}) "
-                        f"request, retrying now. Attempt {i+1} / {Kucoin.FAKE_DDOS_ERROR_INSTANT_RETRY_COUNT}, "
-                        f"error: {err} ({last_error.__class__.__name__})."
-                    )
-                else:
-                    raise
-        last_error = last_error or RuntimeError("Unknown Kucoin error")  # to be able to "raise from" in next line
-        raise octobot_trading.errors.FailedRequest(
-            f"Failed Kucoin request after {Kucoin.FAKE_DDOS_ERROR_INSTANT_RETRY_COUNT} "
-            f"retries on {f.__name__}(args={args[1:]} kwargs={kwargs}) due "
-            f"to {Kucoin.INSTANT_RETRY_ERROR_CODE} error code. "
-            f"Last error: {last_error} ({last_error.__class__.__name__})"
-        ) from last_error
-    return kucoin_retrier_wrapper
 
+class KucoinConnector(adaptive_rate_limiter.AdaptiveRateLimitedCCXTConnector):
+    # kucoin returns the last 100 trades
+    MAX_RECENT_TRADES_BUFFER_SIZE = 100
 
-class KucoinConnector(ccxt_connector.CCXTConnector):
+    def __init__(self, config, exchange_manager, adapter_class=None, additional_config=None, rest_name=None,
+                 force_auth=False):
+        # last parsed trade sequence and parsed recent trades by symbol
+        self._last_recent_trade_sequence_by_symbol = {}
+        self._recent_trades_by_symbol = {}
+        super().__init__(
+            config, exchange_manager, adapter_class=adapter_class, additional_config=additional_config,
+            rest_name=rest_name, force_auth=force_auth
+        )
+
+    @ccxt_client_util.converted_ccxt_common_errors
+    async def get_recent_trades(self, symbol: str, limit: int = 50, **kwargs: dict) -> typing.Optional[list]:
+        """
+        Only parses trades that were not returned by the previous call on this symbol:
+        parsed trades are kept in a bounded buffer.
+        :return: the buffered recent trades, from the oldest to the most recent one
+        """
+        if kwargs:
+            # custom requests are not incremental
+            return await super().get_recent_trades(symbol, limit=limit, **kwargs)
+        try:
+            with self.error_describer():
+                market = self.client.market(symbol)
+                request = {"symbol": market["id"]}
+                if self.exchange_manager.is_future:
+                    response = await self.client.futuresPublicGetTradeHistory(request)
+                else:
+                    response = await self.client.publicGetMarketHistories(request)
+                self._add_recent_trades(symbol, market, self.client.safe_list(response, "data", []))
+        except (ccxt.NotSupported, ccxt.ArgumentsRequired) as err:
+            raise octobot_trading.errors.NotSupported(err)
+        except ccxt.BaseError as err:
+            raise octobot_trading.errors.FailedRequest(
+                f"Failed to get_recent_trades {html_util.get_html_summary_if_relevant(err)}"
+            ) from err
+        recent_trades = list(self._recent_trades_by_symbol[symbol])
+        return recent_trades if limit is None else recent_trades[-limit:]
+
+    def _add_recent_trades(self, symbol, market, raw_trades):
+        last_sequence = self._last_recent_trade_sequence_by_symbol.get(symbol, -1)
+        if raw_trades and max(int(raw_trade["sequence"]) for raw_trade in raw_trades) < last_sequence:
+            # sequence reset on kucoin side: every returned trade is new
+            last_sequence = -1
+        new_raw_trades = [
+            raw_trade
+            for raw_trade in raw_trades
+            if int(raw_trade["sequence"]) > last_sequence
+        ]
+        recent_trades = self._recent_trades_by_symbol.get(symbol)
+        if recent_trades is None:
+            recent_trades = self._recent_trades_by_symbol[symbol] = \
+                collections.deque(maxlen=self.MAX_RECENT_TRADES_BUFFER_SIZE)
+        if new_raw_trades:
+            new_raw_trades.sort(key=lambda raw_trade: int(raw_trade["sequence"]))
+            self._last_recent_trade_sequence_by_symbol[symbol] = int(new_raw_trades[-1]["sequence"])
+            recent_trades.extend(
+                self.adapter.adapt_public_recent_trades(self.client.parse_trades(new_raw_trades, market))
+            )
 
-    @_kucoin_retrier
-    async def _load_markets(self, client, reload: bool):
-        # override for retrier
-        await client.load_markets(reload=reload)
+    def is_throttling_error(self, client, error) -> bool:
+        # error on kucoin side, see https://github.com/Drakkar-Software/OctoBot/issues/2000
+        return isinstance(error, ccxt.BaseError) and bool(client.last_http_response) and \
+            Kucoin.THROTTLING_ERROR_CODE in client.last_http_response
 
 
 class Kucoin(exchanges.RestExchange):
@@ -79,8 +112,7 @@ class Kucoin(exchanges.RestExchange):
     CAN_HAVE_DELAYED_CANCELLED_ORDERS = True
     DEFAULT_CONNECTOR_CLASS = KucoinConnector
 
-    FAKE_DDOS_ERROR_INSTANT_RETRY_COUNT = 5
-    INSTANT_RETRY_ERROR_CODE = "429000"
+    THROTTLING_ERROR_CODE = "429000"
     FUTURES_CCXT_CLASS_NAME = "kucoinfutures"
     MAX_INCREASED_POSITION_QUANTITY_MULTIPLIER = decimal.Decimal("0.95")
 
@@ -128,6 +160,15 @@ class Kucoin(exchanges.RestExchange):
         ("order does not exist",),
     ]
 
+    def __init__(
+        self, config, exchange_manager, exchange_config_by_exchange: typing.Optional[dict[str, dict]],
+        connector_class=None
+    ):
+        super().__init__(config, exchange_manager, exchange_config_by_exchange, connector_class=connector_class)
+        # market statuses by symbol and with_fixer, reset when markets are (re)loaded
+        self._market_statuses_by_symbol = {}
+        self._market_statuses_markets = None
+
     @classmethod
     def get_name(cls):
         return 'kucoin'
@@ -212,7 +253,26 @@ class Kucoin(exchanges.RestExchange):
         """
         local override to take "minFunds" into account
         "minFunds	the minimum spot and margin trading amounts" https://docs.kucoin.com/#get-symbols-list
+        Market statuses are computed once per markets (re)load: returned values should not be edited
         """
+        if price_example is not None and with_fixer:
+            # fixed according to price_example: not cached
+            return self._get_uncached_market_status(symbol, price_example=price_example, with_fixer=with_fixer)
+        markets = self.connector.client.markets
+        if markets is not self._market_statuses_markets:
+            # markets have been (re)loaded
+            self._market_statuses_by_symbol = {}
+            self._market_statuses_markets = markets
+        key = (symbol, with_fixer)
+        try:
+            return self._market_statuses_by_symbol[key]
+        except KeyError:
+            market_status = self._market_statuses_by_symbol[key] = self._get_uncached_market_status(
+                symbol, with_fixer=with_fixer
+            )
+            return market_status
+
+    def _get_uncached_market_status(self, symbol, price_example=None, with_fixer=True):
         market_status = super().get_market_status(symbol, price_example=price_example, with_fixer=with_fixer)
         min_funds = market_status.get(ccxt_constants.CCXT_INFO, {}).get("minFunds")
         if min_funds is not None:
@@ -227,43 +287,31 @@ class Kucoin(exchanges.RestExchange):
             )
         return market_status
 
-    @_kucoin_retrier
     async def get_symbol_prices(self, symbol, time_frame, limit: int = 200, **kwargs: dict):
         if "since" in kwargs:
             # prevent ccxt from fillings the end param (not working when trying to get the 1st candle times)
             kwargs["to"] = int(time.time() * 1000)
         return await super().get_symbol_prices(symbol, time_frame, limit=limit, **kwargs)
 
-    @_kucoin_retrier
     async def get_recent_trades(self, symbol, limit=50, **kwargs):
         # on ccxt kucoin recent trades are received in reverse order from exchange and therefore should never be
         # filtered by limit before reversing (or most recent trades are lost)
         recent_trades = await super().get_recent_trades(symbol, limit=None, **kwargs)
         return recent_trades[::-1][:limit] if recent_trades else []
 
-    @_kucoin_retrier
     async def get_order_book(self, symbol, limit=20, **kwargs):
         # override default limit to be kucoin complient
         return super().get_order_book(symbol, limit=limit, **kwargs)
 
-    @_kucoin_retrier
     async def get_order_book(self, symbol, limit=20, **kwargs):
         # override default limit to be kucoin complient
         return super().get_order_book(symbol, limit=limit, **kwargs)
 
-    @_kucoin_retrier
-    async def get_price_ticker(self, symbol: str, **kwargs: dict) -> typing.Optional[dict]:
-        return await super().get_price_ticker(symbol, **kwargs)
-
-    @_kucoin_retrier
-    async def get_all_currencies_price_ticker(self, **kwargs: dict) -> typing.Optional[dict[str, dict]]:
-        return await super().get_all_currencies_price_ticker(**kwargs)
-
     def should_log_on_ddos_exception(self, exception) -> bool:
         """
         Override when necessary
         """
-        return Kucoin.INSTANT_RETRY_ERROR_CODE not in str(exception)
+        return Kucoin.THROTTLING_ERROR_CODE not in str(exception)
 
     def get_order_additional_params(self, order) -> dict:
         params = {}
@@ -288,7 +336,6 @@ class Kucoin(exchanges.RestExchange):
     async def _update_balance(self, balance, currency, **kwargs):
         balance.update(await super().get_balance(code=currency, **kwargs))
 
-    @_kucoin_retrier
     async def get_balance(self, **kwargs: dict):
         balance = {}
         if self.exchange_manager.is_future:
@@ -315,7 +362,6 @@ class Kucoin(exchanges.RestExchange):
         # leverage is set via orders on kucoin
         return None
 
-    @_kucoin_retrier
     async def get_open_orders(self, symbol=None, since=None, limit=None, **kwargs) -> list:
         if limit is None:
             # default is 50, The maximum cannot exceed 1000
@@ -330,10 +376,6 @@ class Kucoin(exchanges.RestExchange):
             stop_orders = await super().get_open_orders(symbol=symbol, since=since, limit=limit, **kwargs)
         return regular_orders + stop_orders
 
-    @_kucoin_retrier
-    async def get_order(self, exchange_order_id: str, symbol: str = None, **kwargs: dict) -> dict:
-        return await super().get_order(exchange_order_id, symbol=symbol, **kwargs)
-
     async def create_order(self, order_type: trading_enums.TraderOrderType, symbol: str, quantity: decimal.Decimal,
                            price: decimal.Decimal = None, stop_price: decimal.Decimal = None,
                            side: trading_enums.TradeOrderSide = None, current_price: decimal.Decimal = None,
@@ -346,29 +388,6 @@ class Kucoin(exchanges.RestExchange):
                                           side=side, current_price=current_price,
                                           reduce_only=reduce_only, params=params)
 
-    @_kucoin_retrier
-    async def cancel_order(
-        self, exchange_order_id: str, symbol: str, order_type: trading_enums.TraderOrderType, **kwargs: dict
-    ) -> trading_enums.OrderStatus:
-        return await super().cancel_order(exchange_order_id, symbol, order_type, **kwargs)
-
-    # add retried to _create_order_with_retry to avoid catching error in self._order_operation context manager
-    @_kucoin_retrier
-    async def _create_order_with_retry(self, order_type, symbol, quantity: decimal.Decimal,
-                                       price: decimal.Decimal, stop_price: decimal.Decimal,
-                                       side: trading_enums.TradeOrderSide,
-                                       current_price: decimal.Decimal,
-                                       reduce_only: bool, params) -> dict:
-        return await super()._create_order_with_retry(
-            order_type=order_type, symbol=symbol, quantity=quantity, price=price,
-            stop_price=stop_price, side=side, current_price=current_price,
-            reduce_only=reduce_only, params=params
-        )
-
-    @_kucoin_retrier
-    async def get_my_recent_trades(self, symbol: str = None, since: int = None, limit: int = None, **kwargs: dict) -> list:
-        return await super().get_my_recent_trades(symbol=symbol, since=since, limit=limit, **kwargs)
-
     async def get_position(self, symbol: str, **kwargs: dict) -> dict:
         """
         Get the current user symbol position list
@@ -377,7 +396,6 @@ class Kucoin(exchanges.RestExchange):
         """
 
         # todo remove when supported by ccxt
-        @_kucoin_retrier
         async def fetch_position(client, symbol, params={}):
             market = client.market(symbol)
             market_id = market['id']
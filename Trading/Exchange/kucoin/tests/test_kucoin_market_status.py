@@ -0,0 +1,99 @@
+#  Drakkar-Software OctoBot-Private-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import contextlib
+
+import mock
+import pytest
+
+import octobot_commons.constants as commons_constants
+import octobot_trading.exchanges as exchanges
+from tentacles.Trading.Exchange.kucoin import Kucoin
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+class _Kucoin(Kucoin):
+    def get_rest_name(self, *_):
+        # called with the exchange manager as argument in recent OctoBot-Trading versions
+        return super().get_rest_name()
+
+
+def _market(base, is_future, min_funds="0.1"):
+    return {
+        "id": f"{base}-USDT", "symbol": f"{base}/USDT:USDT" if is_future else f"{base}/USDT", "base": base,
+        "quote": "USDT", "settle": "USDT" if is_future else None, "baseId": base, "quoteId": "USDT",
+        "type": "swap" if is_future else "spot", "spot": not is_future, "margin": False, "swap": is_future,
+        "future": False, "option": False, "active": True, "contract": is_future, "linear": is_future or None,
+        "inverse": False if is_future else None, "contractSize": 0.01 if is_future else None,
+        "precision": {"amount": 0.0001, "price": 0.001},
+        "limits": {
+            "amount": {"min": 0.0001, "max": 10000}, "price": {"min": 0.001, "max": 100000},
+            "cost": {"min": 0.01, "max": None}, "leverage": {"min": None, "max": None},
+        },
+        "info": {"symbol": f"{base}-USDT", "minFunds": min_funds},
+    }
+
+
+@contextlib.asynccontextmanager
+async def _kucoin_exchange(is_future):
+    config = {commons_constants.CONFIG_EXCHANGES: {Kucoin.get_name(): {}}}
+    exchange_manager = exchanges.ExchangeManager(config, Kucoin.get_name())
+    exchange_manager.is_future = is_future
+    exchange = exchange_manager.exchange = _Kucoin(config, exchange_manager, None)
+    try:
+        exchange.connector.client.set_markets([_market(f"C{index}", is_future) for index in range(20)])
+        yield exchange
+    finally:
+        await exchange.connector.client.close()
+
+
+@pytest.mark.parametrize("is_future", [False, True])
+async def test_cached_market_statuses(is_future):
+    async with _kucoin_exchange(is_future) as exchange:
+        symbols = list(exchange.connector.client.markets)
+        for symbol in symbols:
+            for with_fixer in (True, False):
+                assert exchange.get_market_status(symbol, with_fixer=with_fixer) == \
+                    exchange._get_uncached_market_status(symbol, with_fixer=with_fixer)
+            assert exchange.get_market_status(symbol, price_example=10) == \
+                exchange._get_uncached_market_status(symbol, price_example=10)
+        symbol = symbols[0]
+        assert exchange.get_market_status(symbol, with_fixer=False)["limits"]["cost"]["min"] == 0.1
+        assert exchange.get_market_status(symbol) is exchange.get_market_status(symbol)
+
+        # reloaded markets: market statuses are computed again
+        exchange.connector.client.set_markets([_market("C0", is_future, min_funds="5")])
+        assert exchange.get_market_status(symbol, with_fixer=False)["limits"]["cost"]["min"] == 5
+        assert exchange.get_market_status(symbol) == exchange._get_uncached_market_status(symbol)
+
+
+@pytest.mark.parametrize("is_future", [False, True])
+async def test_market_status_computations(is_future):
+    async with _kucoin_exchange(is_future) as exchange:
+        symbols = list(exchange.connector.client.markets)
+        with mock.patch.object(exchange, "_get_uncached_market_status",
+                               mock.Mock(wraps=exchange._get_uncached_market_status)) as get_uncached_market_status:
+            for index in range(20000):
+                exchange.get_market_status(symbols[index % len(symbols)], with_fixer=False)
+            # computed once per symbol
+            assert get_uncached_market_status.call_count == len(symbols)
+            exchange.get_market_status(symbols[0])
+            assert get_uncached_market_status.call_count == len(symbols) + 1
+            # price example: never cached
+            exchange.get_market_status(symbols[0], price_example=10)
+            exchange.get_market_status(symbols[0], price_example=10)
+            assert get_uncached_market_status.call_count == len(symbols) + 3
@@ -0,0 +1,163 @@
+#  Drakkar-Software OctoBot-Private-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import time
+
+import aiohttp.web
+import ccxt.async_support
+import pytest
+
+import octobot_commons.constants as commons_constants
+import octobot_commons.singleton as singleton
+import octobot_trading.exchanges as exchanges
+from tentacles.Trading.Exchange.kucoin import Kucoin
+from tentacles.Trading.Exchange.adaptive_rate_limiter import AdaptiveRateLimiters
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+SERVER_RATE = 30
+REQUESTS_COUNT = 100
+
+
+class _Kucoin(Kucoin):
+    def get_rest_name(self, *_):
+        # called with the exchange manager as argument in recent OctoBot-Trading versions
+        return super().get_rest_name()
+
+
+class _ThrottlingKucoinServer:
+    """
+    Answers kucoin 429000 errors when receiving more than SERVER_RATE requests per second
+    """
+    def __init__(self):
+        self.received_requests = 0
+        self._tokens = SERVER_RATE
+        self._last_refill_time = time.monotonic()
+
+    async def timestamp(self, _):
+        self.received_requests += 1
+        now = time.monotonic()
+        self._tokens = min(SERVER_RATE, self._tokens + (now - self._last_refill_time) * SERVER_RATE)
+        self._last_refill_time = now
+        if self._tokens < 1:
+            return aiohttp.web.json_response({"code": "429000", "msg": "Too Many Requests"}, status=429)
+        self._tokens -= 1
+        return aiohttp.web.json_response({"code": "200000", "data": int(now * 1000)})
+
+
+@contextlib.asynccontextmanager
+async def _throttling_server():
+    server = _ThrottlingKucoinServer()
+    app = aiohttp.web.Application()
+    app.router.add_get("/api/v1/timestamp", server.timestamp)
+    runner = aiohttp.web.AppRunner(app)
+    await runner.setup()
+    site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        yield server, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    finally:
+        await runner.cleanup()
+
+
+@contextlib.asynccontextmanager
+async def _kucoin_exchange(url, is_future=False):
+    singleton.Singleton._instances.pop(AdaptiveRateLimiters, None)
+    config = {commons_constants.CONFIG_EXCHANGES: {Kucoin.get_name(): {}}}
+    exchange_manager = exchanges.ExchangeManager(config, Kucoin.get_name())
+    exchange_manager.is_future = is_future
+    exchange = exchange_manager.exchange = _Kucoin(config, exchange_manager, None)
+    if url:
+        exchange.connector.client.urls["api"]["public"] = url
+    # throttled by the exchange before reaching ccxt rate limit
+    exchange.connector.client.enableRateLimit = False
+    try:
+        yield exchange
+    finally:
+        await exchange.connector.client.close()
+        singleton.Singleton._instances.pop(AdaptiveRateLimiters, None)
+
+
+async def _instant_retry(request, is_throttling_error, attempts=5):
+    # previous implementation: retry throttled requests right away
+    last_error = None
+    for _ in range(attempts):
+        try:
+            return await request()
+        except Exception as err:
+            if not is_throttling_error(err):
+                raise
+            last_error = err
+    raise last_error
+
+
+async def _run_requests(request):
+    results = await asyncio.gather(*(request() for _ in range(REQUESTS_COUNT)), return_exceptions=True)
+    return sum(1 for result in results if not isinstance(result, Exception)) / REQUESTS_COUNT
+
+
+async def test_throttled_requests_compared_to_instant_retry():
+    async with _throttling_server() as (server, url):
+        client = ccxt.async_support.kucoin({"enableRateLimit": False})
+        client.urls["api"]["public"] = url
+        try:
+            instant_retry_success_rate = await _run_requests(
+                lambda: _instant_retry(
+                    client.publicGetTimestamp,
+                    lambda error: isinstance(error, ccxt.BaseError) and "429000" in client.last_http_response
+                )
+            )
+        finally:
+            await client.close()
+        instant_retry_server_requests = server.received_requests
+
+    async with _throttling_server() as (server, url), _kucoin_exchange(url) as exchange:
+        rate_limiter = exchange.connector.get_rate_limiter()
+        queue_depths = []
+
+        async def _request():
+            result = await exchange.connector.client.publicGetTimestamp()
+            queue_depths.append(rate_limiter.queue_depth)
+            return result
+
+        rate_limiter_success_rate = await _run_requests(_request)
+        assert rate_limiter_success_rate == 1
+        assert instant_retry_success_rate < rate_limiter_success_rate
+        assert server.received_requests < instant_retry_server_requests
+        assert 0 < rate_limiter.throttle_events
+        assert max(queue_depths) > 0
+        assert rate_limiter.queue_depth == 0
+        # each throttled request is retried once
+        assert server.received_requests == rate_limiter.requests_count == \
+            REQUESTS_COUNT + rate_limiter.throttle_events
+
+
+async def test_rate_limiter_by_account_and_exchange_type():
+    async with _kucoin_exchange(None) as exchange, _kucoin_exchange(None, is_future=True) as futures_exchange:
+        rate_limiter = exchange.connector.get_rate_limiter()
+        assert rate_limiter is exchange.connector.get_rate_limiter()
+        assert rate_limiter.max_rate == 1000 / exchange.connector.client.rateLimit
+        futures_rate_limiter = futures_exchange.connector.get_rate_limiter()
+        assert futures_rate_limiter is not rate_limiter
+        assert futures_rate_limiter.max_rate == 1000 / futures_exchange.connector.client.rateLimit
+        # authenticated clients: one rate limiter per account
+        exchange.connector.client.apiKey = "key"
+        account_rate_limiter = exchange.connector.get_rate_limiter()
+        assert account_rate_limiter not in (rate_limiter, futures_rate_limiter)
+        exchange.connector.client.apiKey = "other-key"
+        assert exchange.connector.get_rate_limiter() not in (rate_limiter, futures_rate_limiter, account_rate_limiter)
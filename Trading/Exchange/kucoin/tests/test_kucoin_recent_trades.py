@@ -0,0 +1,191 @@
+#  Drakkar-Software OctoBot-Private-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import contextlib
+import gc
+import tracemalloc
+
+import aiohttp.web
+import ccxt
+import mock
+import pytest
+
+import octobot_commons.constants as commons_constants
+import octobot_commons.singleton as singleton
+import octobot_trading.errors as trading_errors
+import octobot_trading.exchanges as exchanges
+import octobot_trading.exchanges.connectors.ccxt.ccxt_connector as ccxt_connector
+from tentacles.Trading.Exchange.kucoin import Kucoin
+from tentacles.Trading.Exchange.adaptive_rate_limiter import AdaptiveRateLimiters
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+SYMBOL = "BTC/USDT"
+NEW_TRADES_BY_POLL = 5
+
+
+class _Kucoin(Kucoin):
+    def get_rest_name(self, *_):
+        # called with the exchange manager as argument in recent OctoBot-Trading versions
+        return super().get_rest_name()
+
+
+class _KucoinTradesServer:
+    """
+    Returns the last 100 trades, most recent first, like kucoin
+    """
+    def __init__(self):
+        self.trades = []
+        self.published_trades_count = 0
+        self.sequence_origin = 1548764654235
+
+    def add_trades(self, count):
+        self.published_trades_count += count
+        self.generate_trades(self.published_trades_count)
+
+    def generate_trades(self, count):
+        for sequence in range(len(self.trades) + 1, count + 1):
+            self.trades.append({
+                "sequence": str(self.sequence_origin + sequence), "side": "sell" if sequence % 2 else "buy",
+                "size": str(0.1 + sequence / 1000), "price": str(30000 + sequence),
+                "time": (1548848575203 + sequence * 10) * 1000000,
+            })
+
+    async def histories(self, _):
+        published_trades = self.trades[max(0, self.published_trades_count - 100):self.published_trades_count]
+        return aiohttp.web.json_response({"code": "200000", "data": published_trades[::-1]})
+
+
+@contextlib.asynccontextmanager
+async def _kucoin_exchange():
+    server = _KucoinTradesServer()
+    app = aiohttp.web.Application()
+    app.router.add_get("/api/v1/market/histories", server.histories)
+    runner = aiohttp.web.AppRunner(app)
+    await runner.setup()
+    site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    singleton.Singleton._instances.pop(AdaptiveRateLimiters, None)
+    config = {commons_constants.CONFIG_EXCHANGES: {Kucoin.get_name(): {}}}
+    exchange_manager = exchanges.ExchangeManager(config, Kucoin.get_name())
+    exchange = exchange_manager.exchange = _Kucoin(config, exchange_manager, None)
+    client = exchange.connector.client
+    client.urls["api"]["public"] = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    client.enableRateLimit = False
+    client.set_markets([{
+        "id": "BTC-USDT", "symbol": SYMBOL, "base": "BTC", "quote": "USDT", "baseId": "BTC", "quoteId": "USDT",
+        "type": "spot", "spot": True, "active": True, "contract": False,
+        "precision": {"amount": 0.0001, "price": 0.1}, "limits": {}, "info": {},
+    }])
+    try:
+        yield exchange, server
+    finally:
+        await client.close()
+        await runner.cleanup()
+        singleton.Singleton._instances.pop(AdaptiveRateLimiters, None)
+
+
+async def _get_recent_trades_from_full_response(exchange, limit=50):
+    # previous implementation: parse every returned trade
+    recent_trades = await ccxt_connector.CCXTConnector.get_recent_trades(exchange.connector, SYMBOL, limit=None)
+    return recent_trades[::-1][:limit] if recent_trades else []
+
+
+async def test_incremental_recent_trades():
+    async with _kucoin_exchange() as (exchange, server):
+        assert await exchange.get_recent_trades(SYMBOL) == []
+        for new_trades in (3, 40, 1, 0, 250, 7):
+            server.add_trades(new_trades)
+            recent_trades = await exchange.get_recent_trades(SYMBOL)
+            assert recent_trades == await _get_recent_trades_from_full_response(exchange)
+            assert recent_trades[0]["price"] == 30000 + server.published_trades_count
+            assert await exchange.get_recent_trades(SYMBOL, limit=2) == recent_trades[:2]
+        assert len(await exchange.get_recent_trades(SYMBOL, limit=200)) == Kucoin.DEFAULT_CONNECTOR_CLASS.\
+            MAX_RECENT_TRADES_BUFFER_SIZE
+        assert len(exchange.connector._recent_trades_by_symbol[SYMBOL]) == \
+            Kucoin.DEFAULT_CONNECTOR_CLASS.MAX_RECENT_TRADES_BUFFER_SIZE
+
+
+async def test_recent_trades_sequence_reset():
+    async with _kucoin_exchange() as (exchange, server):
+        server.add_trades(10)
+        await exchange.get_recent_trades(SYMBOL)
+        # sequence reset on kucoin side
+        server.trades.clear()
+        server.published_trades_count = 0
+        server.sequence_origin = 0
+        server.add_trades(3)
+        recent_trades = await exchange.get_recent_trades(SYMBOL)
+        assert [trade["price"] for trade in recent_trades[:4]] == [30003, 30002, 30001, 30010]
+        server.add_trades(2)
+        assert [trade["price"] for trade in (await exchange.get_recent_trades(SYMBOL))[:3]] == [30005, 30004, 30003]
+
+
+async def test_recent_trades_errors():
+    async with _kucoin_exchange() as (exchange, _):
+        client = exchange.connector.client
+        with mock.patch.object(client, "publicGetMarketHistories",
+                               mock.AsyncMock(side_effect=ccxt.NotSupported("not supported"))):
+            with pytest.raises(trading_errors.NotSupported):
+                await exchange.get_recent_trades(SYMBOL)
+        with mock.patch.object(client, "publicGetMarketHistories",
+                               mock.AsyncMock(side_effect=ccxt.ExchangeError("error"))):
+            with pytest.raises(trading_errors.FailedRequest, match="Failed to get_recent_trades error"):
+                await exchange.get_recent_trades(SYMBOL)
+
+
+async def test_polling_parsed_trades_and_memory():
+    polls = 200
+
+    async def _poll(get_recent_trades):
+        server.add_trades(100)
+        await get_recent_trades(exchange)
+        server.generate_trades(server.published_trades_count + polls * NEW_TRADES_BY_POLL)
+        retained_memories = []
+        parse_trade = exchange.connector.client.parse_trade
+        parsed_trades = 0
+
+        def _parse_trade(*args, **kwargs):
+            # not a mock: mocks retain their calls arguments
+            nonlocal parsed_trades
+            parsed_trades += 1
+            return parse_trade(*args, **kwargs)
+
+        with mock.patch.object(exchange.connector.client, "parse_trade", _parse_trade):
+            tracemalloc.start()
+            try:
+                gc.collect()
+                origin = tracemalloc.get_traced_memory()[0]
+                for poll in range(polls):
+                    server.add_trades(NEW_TRADES_BY_POLL)
+                    await get_recent_trades(exchange)
+                    if poll in (polls // 4, polls - 1):
+                        gc.collect()
+                        retained_memories.append(tracemalloc.get_traced_memory()[0] - origin)
+            finally:
+                tracemalloc.stop()
+        return parsed_trades, retained_memories
+
+    async with _kucoin_exchange() as (exchange, server):
+        full_response_parsed_trades, _ = await _poll(_get_recent_trades_from_full_response)
+        incremental_parsed_trades, incremental_retained_memories = await _poll(
+            lambda exchange: exchange.get_recent_trades(SYMBOL)
+        )
+    # only new trades are parsed instead of the 100 returned trades
+    assert full_response_parsed_trades == polls * 100
+    assert incremental_parsed_trades == polls * NEW_TRADES_BY_POLL
+    # bounded buffer: retained memory does not grow with polls
+    assert incremental_retained_memories[1] < incremental_retained_memories[0] * 1.5
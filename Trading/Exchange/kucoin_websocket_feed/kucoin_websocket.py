@@ -13,12 +13,12 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
-import octobot_trading.exchanges as exchanges
 from octobot_trading.enums import WebsocketFeeds as Feeds
 import tentacles.Trading.Exchange.kucoin.kucoin_exchange as kucoin_exchange
+import tentacles.Trading.Exchange.sharded_websocket_connector as sharded_websocket_connector
 
 
-class KucoinCCXTWebsocketConnector(exchanges.CCXTWebsocketConnector):
+class KucoinCCXTWebsocketConnector(sharded_websocket_connector.ShardedCCXTWebsocketConnector):
     EXCHANGE_FEEDS = {
         Feeds.TRADES: True,
         Feeds.KLINE: True,
@@ -48,9 +48,11 @@ class KucoinCCXTWebsocketConnector(exchanges.CCXTWebsocketConnector):
         Feeds.TICKER: [Feeds.KLINE]
     }
 
+    # Kucoin raises "exceed max permits per second" when subscribing to more than 100 feeds on a connection
+    MAX_HANDLED_FEEDS_PER_CONNECTION = 100
+    MAX_CONNECTIONS = 10
     # Feeds to create above which not to use websockets
-    # Kucoin raises "exceed max permits per second" when subscribing to more than 100 feeds
-    MAX_HANDLED_FEEDS = 100
+    MAX_HANDLED_FEEDS = MAX_HANDLED_FEEDS_PER_CONNECTION * MAX_CONNECTIONS
 
     RECREATE_CLIENT_ON_DISCONNECT = True   # when True, a new ccxt websocket client will replace the previous
     # one when the exchange is disconnected
@@ -0,0 +1,209 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import json
+import time
+
+import aiohttp.web
+import pytest
+
+import octobot_commons.constants as commons_constants
+import octobot_trading.constants as trading_constants
+import octobot_trading.exchanges as exchanges
+from octobot_trading.enums import WebsocketFeeds as Feeds
+from tentacles.Trading.Exchange.kucoin import Kucoin
+from tentacles.Trading.Exchange.kucoin_websocket_feed import KucoinCCXTWebsocketConnector
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+MAX_TOPICS_PER_CONNECTION = 100
+PUSH_INTERVAL = 0.2
+SYMBOLS = [f"C{index}/USDT" for index in range(500)]
+MARKETS = [
+    {
+        "id": symbol.replace("/", "-"), "symbol": symbol, "base": symbol.split("/")[0], "quote": "USDT",
+        "baseId": symbol.split("/")[0], "quoteId": "USDT", "type": "spot", "spot": True, "margin": False,
+        "swap": False, "future": False, "option": False, "active": True, "contract": False,
+        "precision": {"amount": 0.0001, "price": 0.0001}, "limits": {}, "info": {},
+    }
+    for symbol in SYMBOLS
+]
+
+
+class _FakeKucoinServer:
+    """
+    Kucoin public websocket refusing subscriptions above MAX_TOPICS_PER_CONNECTION topics on a connection
+    """
+    def __init__(self):
+        self.topics_by_connection = {}
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = aiohttp.web.Application()
+        app.router.add_post("/api/v1/bullet-public", self._bullet)
+        app.router.add_get("/endpoint", self._websocket)
+        self.runner = aiohttp.web.AppRunner(app)
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def get_open_connections(self):
+        return [ws for ws in self.topics_by_connection if not ws.closed]
+
+    async def _bullet(self, _):
+        return aiohttp.web.json_response({"code": "200000", "data": {
+            "token": "token",
+            "instanceServers": [{
+                "endpoint": f"{self.url.replace('http', 'ws')}/endpoint", "protocol": "websocket",
+                "encrypt": False, "pingInterval": 18000, "pingTimeout": 10000,
+            }]
+        }})
+
+    async def _websocket(self, request):
+        ws = aiohttp.web.WebSocketResponse()
+        await ws.prepare(request)
+        topics = self.topics_by_connection[ws] = []
+        await ws.send_json({"id": "connection", "type": "welcome"})
+        push_task = asyncio.create_task(self._push_trades(ws, topics))
+        try:
+            async for message in ws:
+                message = json.loads(message.data)
+                if message["type"] == "ping":
+                    await ws.send_json({"id": message["id"], "type": "pong"})
+                elif message["type"] == "subscribe":
+                    if len(topics) >= MAX_TOPICS_PER_CONNECTION:
+                        await ws.send_json({
+                            "id": message["id"], "type": "error", "code": 509, "data": "exceed max permits per second"
+                        })
+                    else:
+                        topics.append(message["topic"])
+                        await ws.send_json({"id": message["id"], "type": "ack"})
+        finally:
+            push_task.cancel()
+        return ws
+
+    async def _push_trades(self, ws, topics):
+        trade_id = 0
+        while not ws.closed:
+            for topic in list(topics):
+                trade_id += 1
+                await ws.send_json({
+                    "data": {
+                        "sequence": str(trade_id), "symbol": topic.split(":")[1], "side": "buy", "size": "1",
+                        "price": "10", "takerOrderId": "1", "time": str(time.time_ns()), "type": "match",
+                        "makerOrderId": "2", "tradeId": str(trade_id),
+                    },
+                    "subject": "trade.l3match", "topic": topic, "type": "message",
+                })
+            await asyncio.sleep(PUSH_INTERVAL)
+
+
+class _LocalKucoinConnector(KucoinCCXTWebsocketConnector):
+    EXCHANGE_FEEDS = {
+        Feeds.TRADES: True,
+    }
+    SHORT_RECONNECT_DELAY = 0.1
+    LONG_RECONNECT_DELAY = 0.1
+    server_url = None
+    updated_symbols = set()
+
+    def _create_client(self):
+        super()._create_client()
+        self.client.urls["api"] = {key: self.server_url for key in self.client.urls["api"]}
+        self.client.set_markets(MARKETS)
+        # markets are not fetched: open the client as fetching them would
+        self.client.open()
+
+    async def recent_trades(self, trades, symbol=None, **kwargs):
+        self.updated_symbols.add(symbol)
+
+
+class _SingleConnectionLocalKucoinConnector(_LocalKucoinConnector):
+    MAX_HANDLED_FEEDS_PER_CONNECTION = trading_constants.NO_DATA_LIMIT
+
+
+@contextlib.asynccontextmanager
+async def _started_connector(connector_class, symbols):
+    server = _FakeKucoinServer()
+    await server.start()
+    config = {commons_constants.CONFIG_EXCHANGES: {Kucoin.get_name(): {}}}
+    exchange_manager = exchanges.ExchangeManager(config, Kucoin.get_name())
+    # websocket connectors only use the rest exchange to check sandbox support
+    exchange = exchange_manager.exchange = exchanges.DefaultRestExchange(config, exchange_manager, None)
+    connector_class.server_url = server.url
+    connector_class.updated_symbols = set()
+    connector = connector_class(config, exchange_manager)
+    connector.initialize(pairs=symbols, time_frames=[], channels=[Feeds.TRADES])
+    start_task = asyncio.create_task(connector._inner_start())
+    try:
+        yield connector, server
+    finally:
+        await connector._inner_stop()
+        await start_task
+        for feed_task in [task for shard in [connector] + connector.shards for task in shard.feed_tasks.values()]:
+            feed_task.cancel()
+        await exchange.connector.client.close()
+        await server.stop()
+
+
+async def _wait_for_updates(connector_class, symbols, timeout=15):
+    connector_class.updated_symbols = set()
+    t0 = time.time()
+    while time.time() - t0 < timeout and not connector_class.updated_symbols.issuperset(symbols):
+        await asyncio.sleep(0.1)
+    return connector_class.updated_symbols
+
+
+async def test_single_connection_is_capped():
+    async with _started_connector(_SingleConnectionLocalKucoinConnector, SYMBOLS[:320]) as (connector, server):
+        assert connector.shards == []
+        updated_symbols = await _wait_for_updates(_SingleConnectionLocalKucoinConnector, SYMBOLS[:320], timeout=3)
+        # feeds above the connection limit are never updated
+        assert 0 < len(updated_symbols) <= MAX_TOPICS_PER_CONNECTION
+        assert len(server.get_open_connections()) == 1
+
+
+async def test_feeds_sharded_over_connections():
+    symbols = SYMBOLS[:320]
+    async with _started_connector(_LocalKucoinConnector, symbols) as (connector, server):
+        assert [len(shard.pairs) for shard in [connector] + connector.shards] == [100, 100, 100, 20]
+        assert await _wait_for_updates(_LocalKucoinConnector, symbols) == set(symbols)
+        assert len(server.get_open_connections()) == 4
+        assert all(len(topics) <= MAX_TOPICS_PER_CONNECTION for topics in server.topics_by_connection.values())
+
+        # added pairs go to the least loaded connection, then to a new one when connections are full
+        symbols = SYMBOLS[:420]
+        connector.add_pairs(symbols)
+        await connector._inner_update_followed_pairs()
+        assert [len(shard.filtered_pairs) for shard in [connector] + connector.shards] == [100, 100, 100, 100, 20]
+        assert await _wait_for_updates(_LocalKucoinConnector, symbols) == set(symbols)
+        assert len(server.get_open_connections()) == 5
+
+        # a shard disconnection only reconnects this shard
+        connections = server.get_open_connections()
+        await connections[1].close()
+        assert await _wait_for_updates(_LocalKucoinConnector, symbols) == set(symbols)
+        assert len(server.topics_by_connection) == 6
+        assert server.get_open_connections() == connections[:1] + connections[2:] + \
+            list(server.topics_by_connection)[-1:]
+        assert all(len(topics) <= MAX_TOPICS_PER_CONNECTION for topics in server.topics_by_connection.values())
@@ -13,7 +13,9 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
 import decimal
+import time
 import typing
 
 import octobot_commons.constants as commons_constants
@@ -24,7 +26,9 @@ import octobot_trading.errors as trading_errors
 import octobot_trading.exchanges.connectors.ccxt.enums as ccxt_enums
 import octobot_trading.exchanges.connectors.ccxt.constants as ccxt_constants
 import octobot_trading.exchanges.connectors.ccxt.ccxt_connector as ccxt_connector
+import octobot_trading.exchanges.connectors.ccxt.ccxt_client_util as ccxt_client_util
 import octobot_trading.personal_data as trading_personal_data
+import tentacles.Trading.Exchange.order_location_cache as order_location_cache
 
 
 def _disabled_okx_algo_order_creation(f):
@@ -86,6 +90,30 @@ class OkxConnector(ccxt_connector.CCXTConnector):
             symbol=symbol, quantity=quantity
         )
 
+    @ccxt_client_util.converted_ccxt_common_errors
+    async def get_symbols_leverage(self, symbols: list, margin_mode: str) -> dict:
+        """
+        :param symbols: the symbols, fetched in a single request
+        :param margin_mode: the ccxt margin mode of the symbols
+        :return: the current leverage of each symbol
+        """
+        markets = [self.client.market(symbol) for symbol in symbols]
+        response = await self.client.privateGetAccountLeverageInfo({
+            "instId": ",".join(market["id"] for market in markets),
+            "mgnMode": margin_mode,
+        })
+        # one entry by position side
+        entries_by_market_id = {}
+        for entry in response.get("data", []):
+            entries_by_market_id.setdefault(entry.get("instId"), []).append(entry)
+        return {
+            market["symbol"]: self.adapter.adapt_leverage(
+                self.client.parse_leverage(entries_by_market_id[market["id"]], market)
+            )
+            for market in markets
+            if market["id"] in entries_by_market_id
+        }
+
 
 class Okx(exchanges.RestExchange):
     DESCRIPTION = ""
@@ -160,6 +188,38 @@ class Okx(exchanges.RestExchange):
     # set True when get_positions() is not returning empty positions and should use get_position() instead
     REQUIRES_SYMBOL_FOR_EMPTY_POSITION = True
 
+    # set True to only fetch the OKX order types (ex: conditional orders) that are actually in use on a symbol: found
+    # when fetching open orders or created by OctoBot. All used order types are fetched until the symbol open orders
+    # are fetched.
+    FETCH_ONLY_USED_ORDER_TYPES = False
+    # when FETCH_ONLY_USED_ORDER_TYPES is True, all order types are fetched again after this delay to find orders
+    # created outside of OctoBot
+    ALL_ORDER_TYPES_REFRESH_DELAY = 5 * commons_constants.MINUTE_TO_SECONDS
+
+    # max instruments per request, from https://www.okx.com/docs-v5/en/#trading-account-rest-api-get-positions
+    # and https://www.okx.com/docs-v5/en/#trading-account-rest-api-get-leverage
+    MAX_POSITIONS_SYMBOLS_PER_REQUEST = 10
+    MAX_LEVERAGE_SYMBOLS_PER_REQUEST = 20
+    # leverage data of symbols without position is fetched again after this delay to find leverage changed outside
+    # of OctoBot
+    LEVERAGE_DATA_CACHE_DURATION = 10 * commons_constants.MINUTE_TO_SECONDS
+
+    def __init__(
+        self, config, exchange_manager, exchange_config_by_exchange: typing.Optional[dict[str, dict]],
+        connector_class=None
+    ):
+        super().__init__(config, exchange_manager, exchange_config_by_exchange, connector_class=connector_class)
+        # set of OKX order types by symbol, symbols are added when fetching their open orders
+        self._okx_order_types_in_use_by_symbol = {}
+        self._all_order_types_fetch_time_by_symbol = {}
+        # open or closed orders and OKX order type of each fetched order
+        self.order_location_cache = order_location_cache.OrderLocationCache(
+            ["stop", OKXCCXTAdapter.OKX_ORDER_TYPE]
+        )
+        # leverage data of symbols without position, reset when changed by OctoBot or when a position is open
+        self._leverage_data_by_symbol = {}
+        self._leverage_data_fetch_time_by_symbol = {}
+
     @classmethod
     def get_name(cls):
         return 'okx'
@@ -246,33 +306,66 @@ class Okx(exchanges.RestExchange):
         params[self.connector.adapter.OKX_STOP_LOSS_PRICE] = price  # make ccxt understand that it's a stop loss
         return await self.connector.create_market_stop_loss_order(symbol, quantity, price, side, current_price, params=params)
 
-    async def _get_all_typed_orders(self, method, symbol=None, since=None, limit=None, **kwargs) -> list:
+    async def _get_all_typed_orders(self, is_open, symbol=None, since=None, limit=None, **kwargs) -> list:
         limit = self._fix_limit(limit)
         is_stop_order = kwargs.get("stop", False)
         if is_stop_order and self.connector.adapter.OKX_ORDER_TYPE not in kwargs:
             kwargs[self.connector.adapter.OKX_ORDER_TYPE] = self.connector.adapter.OKX_CONDITIONAL_ORDER_TYPE
-        regular_orders = await method(symbol=symbol, since=since, limit=limit, **kwargs)
-        if is_stop_order:
-            # only require stop orders
-            return regular_orders
+        if is_stop_order or self.connector.adapter.OKX_ORDER_TYPE in kwargs or not self.exchange_manager.is_future:
+            # only require stop orders or a given order type or stop orders are futures only for now
+            return await self._get_located_orders(is_open, symbol=symbol, since=since, limit=limit, **kwargs)
         # add order types of order (different param in api endpoint)
-        other_orders = []
-        if self.exchange_manager.is_future:
-            # stop orders are futures only for now
-            for order_type in self._get_used_order_types():
-                kwargs["ordType"] = order_type
-                other_orders += await method(symbol=symbol, since=since, limit=limit, **kwargs)
-        return regular_orders + other_orders
+        # requests are sent concurrently, the ccxt rate limiter delays them when necessary
+        order_types = self._get_used_order_types(symbol)
+        fetched_orders = await asyncio.gather(
+            self._get_located_orders(is_open, symbol=symbol, since=since, limit=limit, **kwargs),
+            *(
+                self._get_located_orders(
+                    is_open, symbol=symbol, since=since, limit=limit,
+                    **{**kwargs, self.connector.adapter.OKX_ORDER_TYPE: order_type}
+                )
+                for order_type in order_types
+            )
+        )
+        if is_open:
+            self._update_order_types_in_use(symbol, order_types, fetched_orders[1:])
+        return self._merge_orders(fetched_orders)
+
+    async def _get_located_orders(self, is_open, symbol=None, since=None, limit=None, **kwargs):
+        if is_open:
+            orders = await super().get_open_orders(symbol=symbol, since=since, limit=limit, **kwargs)
+        else:
+            orders = await super().get_closed_orders(symbol=symbol, since=since, limit=limit, **kwargs)
+        self.order_location_cache.add_orders(orders, is_open, kwargs)
+        return orders
+
+    @staticmethod
+    def _merge_orders(fetched_orders) -> list:
+        orders_by_exchange_id = {}
+        for orders in fetched_orders:
+            for order in orders:
+                orders_by_exchange_id.setdefault(
+                    order[trading_enums.ExchangeConstantsOrderColumns.EXCHANGE_ID.value], order
+                )
+        return list(orders_by_exchange_id.values())
+
+    def _update_order_types_in_use(self, symbol, order_types, fetched_typed_orders):
+        if symbol is None:
+            return
+        if order_types == self._get_okx_order_types():
+            # every order type is fetched: forget order types that are not used anymore
+            self._okx_order_types_in_use_by_symbol[symbol] = set()
+            self._all_order_types_fetch_time_by_symbol[symbol] = time.time()
+        order_types_in_use = self._okx_order_types_in_use_by_symbol.setdefault(symbol, set())
+        for order_type, orders in zip(order_types, fetched_typed_orders):
+            if orders:
+                order_types_in_use.add(order_type)
 
     async def get_open_orders(self, symbol=None, since=None, limit=None, **kwargs) -> list:
-        return await self._get_all_typed_orders(
-            super().get_open_orders, symbol=symbol, since=since, limit=limit, **kwargs
-        )
+        return await self._get_all_typed_orders(True, symbol=symbol, since=since, limit=limit, **kwargs)
 
     async def get_closed_orders(self, symbol=None, since=None, limit=None, **kwargs) -> list:
-        return await self._get_all_typed_orders(
-            super().get_closed_orders, symbol=symbol, since=since, limit=limit, **kwargs
-        )
+        return await self._get_all_typed_orders(False, symbol=symbol, since=since, limit=limit, **kwargs)
 
     async def get_order(self, exchange_order_id: str, symbol: str = None, **kwargs: dict) -> dict:
         try:
@@ -283,6 +376,12 @@ class Okx(exchanges.RestExchange):
             if kwargs.get("stop", False):
                 # from ccxt 2.8.4
                 # fetchOrder() does not support stop orders, use fetchOpenOrders() fetchCanceledOrders() or fetchClosedOrders
+                # look for the order where it was last seen first
+                async def _fetch_location_orders(is_open, location_params):
+                    return await self._get_all_typed_orders(is_open, symbol=symbol, **{**kwargs, **location_params})
+
+                if order := await self.order_location_cache.find_order(exchange_order_id, _fetch_location_orders):
+                    return order
                 return await self.get_order_from_open_and_closed_orders(exchange_order_id, symbol=symbol, **kwargs)
             raise
 
@@ -304,7 +403,9 @@ class Okx(exchanges.RestExchange):
                 params["stop"] = trading_personal_data.is_stop_order(order_type) \
                     or trading_personal_data.is_take_profit_order(order_type)
         except KeyError:
-            pass
+            if (location := self.order_location_cache.get_location(exchange_order_id)) is not None:
+                # unknown order: use the order type it was last fetched with
+                params["stop"] = self.connector.adapter.OKX_ORDER_TYPE in location.params
         return params
 
     async def _verify_order(self, created_order, order_type, symbol, price, side, get_order_params=None):
@@ -336,6 +437,14 @@ class Okx(exchanges.RestExchange):
                 f"OCO bundled orders (orders including both a stop loss and take profit price) "
                 f"are not yet supported on {self.get_name()}"
             )
+        if symbol in self._okx_order_types_in_use_by_symbol and (
+            trading_personal_data.is_stop_order(order_type)
+            or trading_personal_data.is_take_profit_order(order_type)
+            or self.connector.adapter.OKX_STOP_LOSS_PRICE in (params or {})
+            or self.connector.adapter.OKX_TAKE_PROFIT_PRICE in (params or {})
+        ):
+            # conditional order or order bundled with a conditional order
+            self._okx_order_types_in_use_by_symbol[symbol].add(self.connector.adapter.OKX_CONDITIONAL_ORDER_TYPE)
         return await super().create_order(order_type, symbol, quantity,
                                           price=price, stop_price=stop_price,
                                           side=side, current_price=current_price,
@@ -373,14 +482,15 @@ class Okx(exchanges.RestExchange):
         """
         kwargs = kwargs or {}
         if ccxt_enums.ExchangePositionCCXTColumns.MARGIN_MODE.value not in kwargs:
-            margin_type = ccxt_enums.ExchangeMarginTypes.ISOLATED.value
-            try:
-                margin_type = self._get_ccxt_margin_type(symbol)
-            except KeyError:
-                pass
-            kwargs[ccxt_enums.ExchangePositionCCXTColumns.MARGIN_MODE.value] = margin_type
+            kwargs[ccxt_enums.ExchangePositionCCXTColumns.MARGIN_MODE.value] = self._get_leverage_margin_type(symbol)
         return await self.connector.get_symbol_leverage(symbol=symbol, **kwargs)
 
+    def _get_leverage_margin_type(self, symbol):
+        try:
+            return self._get_ccxt_margin_type(symbol)
+        except KeyError:
+            return ccxt_enums.ExchangeMarginTypes.ISOLATED.value
+
     async def set_symbol_leverage(self, symbol: str, leverage: float, **kwargs):
         """
         Set the symbol leverage
@@ -390,11 +500,13 @@ class Okx(exchanges.RestExchange):
         """
         kwargs = self._get_margin_query_params(symbol, **kwargs)
         kwargs.pop(self.connector.adapter.OKX_LEVER, None)
+        self._leverage_data_by_symbol.pop(symbol, None)
         return await self.connector.set_symbol_leverage(leverage=leverage, symbol=symbol, **kwargs)
 
     async def set_symbol_margin_type(self, symbol: str, isolated: bool, **kwargs: dict):
         kwargs = self._get_margin_query_params(symbol, **kwargs)
         kwargs.pop(self.connector.adapter.OKX_MARGIN_MODE)
+        self._leverage_data_by_symbol.pop(symbol, None)
         await super().set_symbol_margin_type(symbol, isolated, **kwargs)
 
     async def get_position(self, symbol: str, **kwargs: dict) -> dict:
@@ -404,8 +516,7 @@ class Okx(exchanges.RestExchange):
         :return: the user symbol position
         """
         position = await super().get_position(symbol=symbol, **kwargs)
-        if position[trading_enums.ExchangeConstantsPositionColumns.SIZE.value] == constants.ZERO:
-            await self._update_position_with_leverage_data(symbol, position)
+        await self._update_positions_with_leverage_data([position])
 
         if position[trading_enums.ExchangeConstantsPositionColumns.SYMBOL.value] != symbol:
             # happened in previous ccxt version, todo remove if no seen again
@@ -416,16 +527,91 @@ class Okx(exchanges.RestExchange):
             )
         return position
 
-    async def _update_position_with_leverage_data(self, symbol, position):
-        leverage_data = await self.get_symbol_leverage(symbol)
+    async def get_positions(self, symbols=None, **kwargs: dict) -> list:
+        """
+        Get the current user position list
+        Positions of up to MAX_POSITIONS_SYMBOLS_PER_REQUEST symbols are fetched at once, empty positions are
+        mocked and completed with the leverage data of their symbol
+        :return: the user position list
+        """
+        if symbols is None:
+            return await super().get_positions(symbols=symbols, **kwargs)
+        fetched_positions = await asyncio.gather(*(
+            self.connector.get_positions(
+                symbols=symbols[index:index + self.MAX_POSITIONS_SYMBOLS_PER_REQUEST], **kwargs
+            )
+            for index in range(0, len(symbols), self.MAX_POSITIONS_SYMBOLS_PER_REQUEST)
+        ))
+        positions_by_symbol = {}
+        for positions in fetched_positions:
+            for position in positions:
+                if position:
+                    positions_by_symbol.setdefault(
+                        position[trading_enums.ExchangeConstantsPositionColumns.SYMBOL.value], []
+                    ).append(position)
+        for symbol in symbols:
+            if symbol not in positions_by_symbol:
+                # only open positions are returned
+                positions_by_symbol[symbol] = [await self.get_mocked_empty_position(symbol, **kwargs)]
+        positions = [
+            position
+            for symbol in symbols
+            for position in positions_by_symbol[symbol]
+        ]
+        await self._update_positions_with_leverage_data(positions)
+        return positions
+
+    async def _update_positions_with_leverage_data(self, positions):
+        empty_positions = []
+        for position in positions:
+            if position[trading_enums.ExchangeConstantsPositionColumns.SIZE.value] == constants.ZERO:
+                empty_positions.append(position)
+            else:
+                # leverage might be changed while the position is open
+                self._leverage_data_by_symbol.pop(
+                    position[trading_enums.ExchangeConstantsPositionColumns.SYMBOL.value], None
+                )
+        if not empty_positions:
+            return
+        await self._fetch_missing_leverage_data([
+            position[trading_enums.ExchangeConstantsPositionColumns.SYMBOL.value]
+            for position in empty_positions
+        ])
         adapter = self.connector.adapter
-        OKX_info = leverage_data[ccxt_constants.CCXT_INFO]
-        position[trading_enums.ExchangeConstantsPositionColumns.POSITION_MODE.value] = \
-            adapter.parse_position_mode(OKX_info[0][adapter.OKX_POS_SIDE])
-        position[trading_enums.ExchangeConstantsPositionColumns.MARGIN_TYPE.value] = \
-            adapter.parse_margin_type(leverage_data[ccxt_enums.ExchangeLeverageCCXTColumns.MARGIN_MODE.value])
-        position[trading_enums.ExchangeConstantsPositionColumns.LEVERAGE.value] = \
-            leverage_data[trading_enums.ExchangeConstantsLeveragePropertyColumns.LEVERAGE.value]
+        for position in empty_positions:
+            try:
+                leverage_data = self._leverage_data_by_symbol[
+                    position[trading_enums.ExchangeConstantsPositionColumns.SYMBOL.value]
+                ]
+            except KeyError:
+                # leverage data not returned by the exchange
+                continue
+            OKX_info = leverage_data[ccxt_constants.CCXT_INFO]
+            position[trading_enums.ExchangeConstantsPositionColumns.POSITION_MODE.value] = \
+                adapter.parse_position_mode(OKX_info[0][adapter.OKX_POS_SIDE])
+            position[trading_enums.ExchangeConstantsPositionColumns.MARGIN_TYPE.value] = \
+                adapter.parse_margin_type(leverage_data[ccxt_enums.ExchangeLeverageCCXTColumns.MARGIN_MODE.value])
+            position[trading_enums.ExchangeConstantsPositionColumns.LEVERAGE.value] = \
+                leverage_data[trading_enums.ExchangeConstantsLeveragePropertyColumns.LEVERAGE.value]
+
+    async def _fetch_missing_leverage_data(self, symbols):
+        symbols_by_margin_type = {}
+        now = time.time()
+        for symbol in symbols:
+            if symbol not in self._leverage_data_by_symbol or (
+                now - self._leverage_data_fetch_time_by_symbol.get(symbol, 0) >= self.LEVERAGE_DATA_CACHE_DURATION
+            ):
+                self._leverage_data_by_symbol.pop(symbol, None)
+                self._leverage_data_fetch_time_by_symbol[symbol] = now
+                symbols_by_margin_type.setdefault(self._get_leverage_margin_type(symbol), []).append(symbol)
+        for leverage_data_by_symbol in await asyncio.gather(*(
+            self.connector.get_symbols_leverage(
+                margin_type_symbols[index:index + self.MAX_LEVERAGE_SYMBOLS_PER_REQUEST], margin_type
+            )
+            for margin_type, margin_type_symbols in symbols_by_margin_type.items()
+            for index in range(0, len(margin_type_symbols), self.MAX_LEVERAGE_SYMBOLS_PER_REQUEST)
+        )):
+            self._leverage_data_by_symbol.update(leverage_data_by_symbol)
 
     async def set_symbol_partial_take_profit_stop_loss(self, symbol: str, inverse: bool,
                                                        tp_sl_mode: trading_enums.TakeProfitStopLossMode):
@@ -433,7 +619,7 @@ class Okx(exchanges.RestExchange):
         take profit / stop loss mode does not exist on okx futures
         """
 
-    def _get_used_order_types(self):
+    def _get_okx_order_types(self):
         return [
             # stop orders
             self.connector.adapter.OKX_CONDITIONAL_ORDER_TYPE,
@@ -441,6 +627,19 @@ class Okx(exchanges.RestExchange):
             # self.connector.adapter.OKX_OCO_ORDER_TYPE,
         ]
 
+    def _get_used_order_types(self, symbol=None):
+        used_order_types = self._get_okx_order_types()
+        if self.FETCH_ONLY_USED_ORDER_TYPES and symbol in self._okx_order_types_in_use_by_symbol and (
+            time.time() - self._all_order_types_fetch_time_by_symbol.get(symbol, 0)
+            < self.ALL_ORDER_TYPES_REFRESH_DELAY
+        ):
+            return [
+                order_type
+                for order_type in used_order_types
+                if order_type in self._okx_order_types_in_use_by_symbol[symbol]
+            ]
+        return used_order_types
+
 
 class OKXCCXTAdapter(exchanges.CCXTAdapter):
     # ORDERS
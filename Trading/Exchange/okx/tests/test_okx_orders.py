@@ -0,0 +1,190 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+
+import aiohttp.web
+import pytest
+
+import octobot_commons.constants as commons_constants
+import octobot_trading.enums as trading_enums
+import octobot_trading.exchanges as exchanges
+import octobot_trading.personal_data as trading_personal_data
+from tentacles.Trading.Exchange.okx import Okx
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+SYMBOL = "BTC/USDT:USDT"
+ROUND_TRIP_TIME = 0.05
+REGULAR_ORDER = {
+    "instId": "BTC-USDT-SWAP", "ordId": "1", "clOrdId": "", "px": "30000", "sz": "1", "ordType": "limit",
+    "side": "buy", "state": "live", "accFillSz": "0", "avgPx": "", "cTime": "1700000000000",
+    "uTime": "1700000000000", "fee": "0", "feeCcy": "USDT", "posSide": "net", "tdMode": "cross",
+}
+CONDITIONAL_ORDER = {
+    "instId": "BTC-USDT-SWAP", "algoId": "2", "ordType": "conditional", "side": "sell", "sz": "1",
+    "slTriggerPx": "25000", "slOrdPx": "-1", "state": "live", "cTime": "1700000000000", "posSide": "net",
+    "tdMode": "cross", "last": "30000",
+}
+
+
+class _FakeOkxRestServer:
+    def __init__(self):
+        self.orders_by_path = {}
+        self.requests = []
+        self.pending_requests = 0
+        self.max_concurrent_requests = 0
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = aiohttp.web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        self.runner = aiohttp.web.AppRunner(app)
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _handle(self, request):
+        self.requests.append(request.path_qs)
+        self.pending_requests += 1
+        self.max_concurrent_requests = max(self.max_concurrent_requests, self.pending_requests)
+        await asyncio.sleep(ROUND_TRIP_TIME)
+        self.pending_requests -= 1
+        return aiohttp.web.json_response({"code": "0", "msg": "", "data": self.orders_by_path.get(request.path, [])})
+
+
+@contextlib.asynccontextmanager
+async def _okx_futures_exchange():
+    server = _FakeOkxRestServer()
+    await server.start()
+    config = {commons_constants.CONFIG_EXCHANGES: {Okx.get_name(): {}}}
+    exchange_manager = exchanges.ExchangeManager(config, Okx.get_name())
+    exchange_manager.is_future = True
+    exchange_manager.exchange_personal_data.orders_manager = trading_personal_data.OrdersManager(
+        exchanges.Trader(config, exchange_manager)
+    )
+    exchange = exchange_manager.exchange = Okx(config, exchange_manager, None)
+    client = exchange.connector.client
+    try:
+        client.urls["api"]["rest"] = server.url
+        client.apiKey, client.secret, client.password = "key", "secret", "password"
+        client.set_markets([{
+            "id": "BTC-USDT-SWAP", "symbol": SYMBOL, "base": "BTC", "quote": "USDT", "settle": "USDT",
+            "baseId": "BTC", "quoteId": "USDT", "settleId": "USDT", "type": "swap", "spot": False,
+            "margin": False, "swap": True, "future": False, "option": False, "active": True, "contract": True,
+            "linear": True, "inverse": False, "contractSize": 0.01, "precision": {"amount": 1, "price": 0.1},
+            "limits": {}, "info": {"instType": "SWAP", "instId": "BTC-USDT-SWAP"},
+        }])
+        yield exchange, server
+    finally:
+        await client.close()
+        await server.stop()
+
+
+def _order_ids(orders):
+    return [order[trading_enums.ExchangeConstantsOrderColumns.EXCHANGE_ID.value] for order in orders]
+
+
+async def test_get_open_orders_fetches_order_types_concurrently():
+    async with _okx_futures_exchange() as (exchange, server):
+        server.orders_by_path = {
+            "/api/v5/trade/orders-pending": [REGULAR_ORDER],
+            # also returned as a regular order
+            "/api/v5/trade/orders-algo-pending": [CONDITIONAL_ORDER, {**REGULAR_ORDER, "algoId": "1"}],
+        }
+        orders = await exchange.get_open_orders(SYMBOL)
+        assert sorted(server.requests) == [
+            "/api/v5/trade/orders-algo-pending?instId=BTC-USDT-SWAP&ordType=conditional",
+            "/api/v5/trade/orders-pending?instId=BTC-USDT-SWAP",
+        ]
+        # de-duplicated by order id
+        assert _order_ids(orders) == ["1", "2"]
+        assert orders[1][trading_enums.ExchangeConstantsOrderColumns.TYPE.value] == \
+            trading_enums.TradeOrderType.STOP_LOSS.value
+        # requests are concurrent instead of one after the other
+        assert server.max_concurrent_requests == 2
+
+        server.requests.clear()
+        await exchange.get_open_orders(SYMBOL, stop=True)
+        # only conditional orders
+        assert server.requests == ["/api/v5/trade/orders-algo-pending?instId=BTC-USDT-SWAP&ordType=conditional"]
+
+
+async def test_fetch_only_used_order_types():
+    async with _okx_futures_exchange() as (exchange, server):
+        exchange.FETCH_ONLY_USED_ORDER_TYPES = True
+        server.orders_by_path = {"/api/v5/trade/orders-pending": [REGULAR_ORDER]}
+        # order types in use are unknown: fetch every type
+        assert _order_ids(await exchange.get_open_orders(SYMBOL)) == ["1"]
+        assert len(server.requests) == 2
+        server.requests.clear()
+        # no conditional order in use
+        assert _order_ids(await exchange.get_open_orders(SYMBOL)) == ["1"]
+        await exchange.get_closed_orders(SYMBOL)
+        assert server.requests == [
+            "/api/v5/trade/orders-pending?instId=BTC-USDT-SWAP",
+            "/api/v5/trade/orders-history?instId=BTC-USDT-SWAP&instType=SWAP&state=filled",
+        ]
+        # other symbol order types in use are still unknown
+        assert exchange._get_used_order_types("ETH/USDT:USDT") == ["conditional"]
+
+        # conditional order created outside of OctoBot: found when every order type is fetched again
+        server.requests.clear()
+        server.orders_by_path["/api/v5/trade/orders-algo-pending"] = [CONDITIONAL_ORDER]
+        assert _order_ids(await exchange.get_open_orders(SYMBOL)) == ["1"]
+        exchange._all_order_types_fetch_time_by_symbol[SYMBOL] -= Okx.ALL_ORDER_TYPES_REFRESH_DELAY
+        assert _order_ids(await exchange.get_open_orders(SYMBOL)) == ["1", "2"]
+        assert len(server.requests) == 3
+        # conditional order is closed: not fetched after the next refresh of every order type
+        server.orders_by_path.pop("/api/v5/trade/orders-algo-pending")
+        exchange._all_order_types_fetch_time_by_symbol[SYMBOL] -= Okx.ALL_ORDER_TYPES_REFRESH_DELAY
+        await exchange.get_open_orders(SYMBOL)
+        server.requests.clear()
+        await exchange.get_open_orders(SYMBOL)
+        assert server.requests == ["/api/v5/trade/orders-pending?instId=BTC-USDT-SWAP"]
+
+        server.requests.clear()
+        server.orders_by_path["/api/v5/trade/orders-algo-pending"] = [CONDITIONAL_ORDER]
+        exchange._okx_order_types_in_use_by_symbol.clear()
+        assert _order_ids(await exchange.get_open_orders(SYMBOL)) == ["1", "2"]
+        assert len(server.requests) == 2
+        server.orders_by_path.pop("/api/v5/trade/orders-algo-pending")
+        server.requests.clear()
+        # conditional orders are in use: always fetched
+        await exchange.get_open_orders(SYMBOL)
+        assert len(server.requests) == 2
+
+
+async def test_get_unknown_order_from_last_seen_location():
+    async with _okx_futures_exchange() as (exchange, server):
+        server.orders_by_path = {
+            "/api/v5/trade/orders-algo-pending": [CONDITIONAL_ORDER],
+            "/api/v5/trade/order-algo": [CONDITIONAL_ORDER],
+        }
+        # unknown order: fetched as a regular order
+        assert await exchange.get_order("2", SYMBOL) is None
+        assert server.requests == ["/api/v5/trade/order?instId=BTC-USDT-SWAP&ordId=2"]
+        await exchange.get_open_orders(SYMBOL)
+        server.requests.clear()
+        # fetched as a conditional order as it was last seen with other conditional orders
+        assert _order_ids([await exchange.get_order("2", SYMBOL)]) == ["2"]
+        assert server.requests == ["/api/v5/trade/order-algo?instId=BTC-USDT-SWAP&algoId=2"]
@@ -0,0 +1,193 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import decimal
+
+import aiohttp.web
+import pytest
+
+import octobot_commons.constants as commons_constants
+import octobot_trading.enums as trading_enums
+import octobot_trading.exchanges as exchanges
+from tentacles.Trading.Exchange.okx import Okx
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+ROUND_TRIP_TIME = 0.1
+POSITIONS_PATH = "/api/v5/account/positions"
+LEVERAGE_INFO_PATH = "/api/v5/account/leverage-info"
+SYMBOLS = [f"C{index}/USDT:USDT" for index in range(35)]
+
+
+def _market_id(symbol):
+    return f"{symbol.split('/')[0]}-USDT-SWAP"
+
+
+def _position(symbol, leverage):
+    return {
+        "instId": _market_id(symbol), "instType": "SWAP", "posId": symbol, "posSide": "net", "pos": "2",
+        "availPos": "2", "avgPx": "100", "markPx": "101", "last": "101", "lever": str(leverage), "mgnMode": "isolated",
+        "margin": "10", "imr": "", "mmr": "0.5", "liqPx": "50", "upl": "0.02", "uplRatio": "0.01",
+        "notionalUsd": "2.02", "ccy": "USDT", "posCcy": "", "cTime": "1700000000000", "uTime": "1700000000000",
+        "adl": "1", "interest": "0", "realizedPnl": "0", "fee": "0",
+    }
+
+
+class _FakeOkxRestServer:
+    def __init__(self):
+        self.open_positions = {}
+        self.leverage_by_symbol = {}
+        self.requests = []
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = aiohttp.web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        self.runner = aiohttp.web.AppRunner(app)
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _handle(self, request):
+        self.requests.append(request.path)
+        market_ids = request.query.get("instId", "").split(",")
+        symbols = [symbol for symbol in SYMBOLS if _market_id(symbol) in market_ids]
+        data = []
+        if request.path == POSITIONS_PATH:
+            data = [
+                _position(symbol, self.leverage_by_symbol[symbol])
+                for symbol in symbols
+                if symbol in self.open_positions
+            ]
+        elif request.path == LEVERAGE_INFO_PATH:
+            data = [
+                {"instId": _market_id(symbol), "mgnMode": request.query["mgnMode"], "posSide": "net",
+                 "lever": str(self.leverage_by_symbol[symbol])}
+                for symbol in symbols
+            ]
+        await asyncio.sleep(ROUND_TRIP_TIME)
+        return aiohttp.web.json_response({"code": "0", "msg": "", "data": data})
+
+
+@contextlib.asynccontextmanager
+async def _okx_futures_exchange():
+    server = _FakeOkxRestServer()
+    await server.start()
+    config = {commons_constants.CONFIG_EXCHANGES: {Okx.get_name(): {}}}
+    exchange_manager = exchanges.ExchangeManager(config, Okx.get_name())
+    exchange_manager.is_future = True
+    exchange = exchange_manager.exchange = Okx(config, exchange_manager, None)
+    client = exchange.connector.client
+    try:
+        client.urls["api"]["rest"] = server.url
+        client.apiKey, client.secret, client.password = "key", "secret", "password"
+        client.set_markets([
+            {
+                "id": _market_id(symbol), "symbol": symbol, "base": symbol.split("/")[0], "quote": "USDT",
+                "settle": "USDT", "baseId": symbol.split("/")[0], "quoteId": "USDT", "settleId": "USDT",
+                "type": "swap", "spot": False, "margin": False, "swap": True, "future": False, "option": False,
+                "active": True, "contract": True, "linear": True, "inverse": False, "contractSize": 0.01,
+                "precision": {"amount": 1, "price": 0.1}, "limits": {},
+                "info": {"instType": "SWAP", "instId": _market_id(symbol)},
+            }
+            for symbol in SYMBOLS
+        ])
+        server.leverage_by_symbol = {symbol: 1 + index % 10 for index, symbol in enumerate(SYMBOLS)}
+        server.open_positions = set(SYMBOLS[::4])
+        yield exchange, server
+    finally:
+        await client.close()
+        await server.stop()
+
+
+def _leverages(positions):
+    return {
+        position[trading_enums.ExchangeConstantsPositionColumns.SYMBOL.value]:
+            position[trading_enums.ExchangeConstantsPositionColumns.LEVERAGE.value]
+        for position in positions
+    }
+
+
+async def test_get_positions():
+    async with _okx_futures_exchange() as (exchange, server):
+        async def _refresh(get_positions):
+            server.requests.clear()
+            positions = await get_positions(exchange, SYMBOLS)
+            return positions, len(server.requests)
+
+        # previous implementation: position then leverage requests for each symbol
+        previous_positions, previous_requests = await _refresh(exchanges.RestExchange.get_positions)
+        exchange._leverage_data_by_symbol.clear()
+        positions, requests = await _refresh(Okx.get_positions)
+        cached_positions, cached_requests = await _refresh(Okx.get_positions)
+
+        assert positions == previous_positions == cached_positions
+        assert [
+            position[trading_enums.ExchangeConstantsPositionColumns.SYMBOL.value] for position in positions
+        ] == SYMBOLS
+        assert _leverages(positions) == {
+            symbol: decimal.Decimal(str(leverage)) for symbol, leverage in server.leverage_by_symbol.items()
+        }
+        assert all(
+            position[trading_enums.ExchangeConstantsPositionColumns.MARGIN_TYPE.value]
+            is trading_enums.MarginType.ISOLATED
+            for position in positions
+        )
+        # 35 symbols: 4 positions requests and 2 leverage requests (for 26 empty positions)
+        assert previous_requests > requests == 6
+        assert cached_requests == 4
+
+
+async def test_leverage_cache_reset():
+    async with _okx_futures_exchange() as (exchange, server):
+        empty_symbol, open_symbol = SYMBOLS[1], SYMBOLS[0]
+        await exchange.get_positions(SYMBOLS)
+        server.leverage_by_symbol[empty_symbol] = server.leverage_by_symbol[open_symbol] = 20
+        # cached leverage
+        assert _leverages(await exchange.get_positions(SYMBOLS))[empty_symbol] == 2
+        # reset cache, as when leverage or margin type are set by OctoBot: up to date leverage
+        exchange._leverage_data_by_symbol.pop(empty_symbol)
+        assert _leverages([await exchange.get_position(empty_symbol)])[empty_symbol] == 20
+
+        # leverage of open positions is not cached: fetched when the position is closed
+        server.open_positions.remove(open_symbol)
+        server.requests.clear()
+        assert _leverages(await exchange.get_positions(SYMBOLS))[open_symbol] == 20
+        assert server.requests.count(LEVERAGE_INFO_PATH) == 1
+
+
+async def test_leverage_cache_expiration():
+    async with _okx_futures_exchange() as (exchange, server):
+        empty_symbol = SYMBOLS[1]
+        await exchange.get_positions(SYMBOLS)
+        # leverage changed outside of OctoBot
+        server.leverage_by_symbol[empty_symbol] = 20
+        assert _leverages(await exchange.get_positions(SYMBOLS))[empty_symbol] == 2
+        # expired leverage data: fetched again
+        exchange._leverage_data_fetch_time_by_symbol[empty_symbol] -= Okx.LEVERAGE_DATA_CACHE_DURATION
+        server.requests.clear()
+        assert _leverages(await exchange.get_positions(SYMBOLS))[empty_symbol] == 20
+        assert server.requests.count(LEVERAGE_INFO_PATH) == 1
+        server.requests.clear()
+        await exchange.get_positions(SYMBOLS)
+        assert server.requests.count(LEVERAGE_INFO_PATH) == 0
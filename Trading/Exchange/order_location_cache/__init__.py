@@ -0,0 +1 @@
+from .order_location_cache import OrderLocation, OrderLocationCache
\ No newline at end of file
@@ -0,0 +1,83 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import collections
+import typing
+
+import octobot_trading.enums as trading_enums
+
+
+class OrderLocation(typing.NamedTuple):
+    # True when the order was last seen in open orders
+    is_open: bool
+    # params of the request the order was last seen in (ex: stop orders filter)
+    params: dict
+
+
+class OrderLocationCache:
+    """
+    Remembers where each exchange order id was last seen: in open or closed orders and with which request params
+    (ex: regular or stop orders). An order can then be looked up in this location only instead of fetching every
+    open and closed orders.
+    Only location_params_keys are kept from request params.
+    """
+    MAX_CACHED_LOCATIONS = 10000
+
+    def __init__(self, location_params_keys, max_cached_locations=MAX_CACHED_LOCATIONS):
+        self.location_params_keys = location_params_keys
+        self.max_cached_locations = max_cached_locations
+        self.hits = 0
+        self.misses = 0
+        self._locations = collections.OrderedDict()
+
+    def add_orders(self, orders, is_open, params):
+        location = OrderLocation(
+            is_open, {key: params[key] for key in self.location_params_keys if key in params}
+        )
+        for order in orders:
+            exchange_order_id = order.get(trading_enums.ExchangeConstantsOrderColumns.EXCHANGE_ID.value)
+            if exchange_order_id is None:
+                continue
+            self._locations[exchange_order_id] = location
+            self._locations.move_to_end(exchange_order_id)
+        while len(self._locations) > self.max_cached_locations:
+            self._locations.popitem(last=False)
+
+    def get_location(self, exchange_order_id) -> typing.Optional[OrderLocation]:
+        return self._locations.get(exchange_order_id)
+
+    def remove(self, exchange_order_id):
+        self._locations.pop(exchange_order_id, None)
+
+    def clear(self):
+        self._locations.clear()
+
+    async def find_order(self, exchange_order_id, fetch_orders) -> typing.Optional[dict]:
+        """
+        Looks for the order in its last known location. Orders last seen open are also looked for in closed orders
+        using the same params as they might have been filled or canceled since.
+        :param exchange_order_id: the order to find
+        :param fetch_orders: async callable of (is_open, params) returning the orders of this location
+        :return: the order or None when its location is unknown or outdated
+        """
+        if (location := self.get_location(exchange_order_id)) is not None:
+            for is_open in ((True, False) if location.is_open else (False, )):
+                for order in await fetch_orders(is_open, location.params):
+                    if order.get(trading_enums.ExchangeConstantsOrderColumns.EXCHANGE_ID.value) == exchange_order_id:
+                        self.hits += 1
+                        return order
+            self.remove(exchange_order_id)
+        self.misses += 1
+        return None
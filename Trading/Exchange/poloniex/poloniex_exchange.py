@@ -14,10 +14,10 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 
-import octobot_trading.exchanges as exchanges
+import tentacles.Trading.Exchange.bulk_ticker_poller as bulk_ticker_poller
 
 
-class Poloniex(exchanges.RestExchange):
+class Poloniex(bulk_ticker_poller.BulkTickersRestExchange):
     FIX_MARKET_STATUS = True
     REMOVE_MARKET_STATUS_PRICE_LIMITS = True
 
@@ -0,0 +1 @@
+from .sharded_websocket_connector import ShardedCCXTWebsocketConnector
\ No newline at end of file
@@ -0,0 +1,143 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import octobot_trading.constants as trading_constants
+import octobot_trading.exchanges as exchanges
+
+
+class ShardedCCXTWebsocketConnector(exchanges.CCXTWebsocketConnector):
+    """
+    Spreads the websocket feeds over several connections when the exchange limits the feeds count of a connection.
+    Each additional connection (shard) is a connector of the same class using its own ccxt client: it is started
+    and stopped along with this connector and reconnects independently.
+    Pair independent feeds are only handled by this connector.
+    """
+    # Feeds to subscribe to on a single websocket connection, NO_DATA_LIMIT to use a single connection
+    MAX_HANDLED_FEEDS_PER_CONNECTION = trading_constants.NO_DATA_LIMIT
+    # Websocket connections to open at most, MAX_HANDLED_FEEDS should be set accordingly
+    MAX_CONNECTIONS = 1
+
+    def __init__(self, config, exchange_manager, adapter_class=None, additional_config=None, websocket_name=None,
+                 is_shard=False):
+        super().__init__(config, exchange_manager, adapter_class=adapter_class, additional_config=additional_config,
+                         websocket_name=websocket_name)
+        self.is_shard = is_shard
+        self.shards = []
+        self.shard_tasks = []
+        # set when starting, required to stop or update shards that are not started yet
+        self.initialized_event = None
+        self.stopped_event = asyncio.Event()
+        self._adapter_class = adapter_class
+
+    @classmethod
+    def get_name(cls):
+        # not associated to any exchange: never selected as an exchange websocket connector
+        return None
+
+    def initialize(self, currencies=None, pairs=None, time_frames=None, channels=None):
+        super().initialize(currencies=currencies, pairs=pairs, time_frames=time_frames, channels=channels)
+        if self.is_shard or not self._is_sharding_enabled() or \
+                self.get_feeds_count(self.pairs, self.time_frames) <= self.MAX_HANDLED_FEEDS_PER_CONNECTION:
+            return
+        pairs_per_connection = max(
+            1, self.MAX_HANDLED_FEEDS_PER_CONNECTION // max(1, self.get_feeds_count(self.pairs[:1], self.time_frames))
+        )
+        pairs_by_connection = [
+            self.pairs[index:index + pairs_per_connection]
+            for index in range(0, len(self.pairs), pairs_per_connection)
+        ]
+        self.logger.info(
+            f"Spreading {self.get_feeds_count(self.pairs, self.time_frames)} feeds "
+            f"over {len(pairs_by_connection)} websocket connections"
+        )
+        self.pairs = pairs_by_connection[0]
+        for shard_pairs in pairs_by_connection[1:]:
+            self._create_shard(shard_pairs)
+
+    def add_pairs(self, pairs, watching_only=False):
+        if self.is_shard or not self._is_sharding_enabled():
+            return super().add_pairs(pairs, watching_only=watching_only)
+        connectors = [self] + self.shards
+        for pair in pairs:
+            if any(connector.is_following_pair(pair) for connector in connectors):
+                continue
+            connector = min(connectors, key=lambda candidate: candidate.get_connection_feeds_count())
+            pair_feeds_count = self.get_feeds_count([pair], [] if watching_only else self.time_frames)
+            if connector.get_connection_feeds_count() + pair_feeds_count > self.MAX_HANDLED_FEEDS_PER_CONNECTION \
+                    and len(connectors) < self.MAX_CONNECTIONS:
+                connector = self._create_shard([])
+                connectors.append(connector)
+            connector._add_pair(pair, watching_only)
+
+    def is_following_pair(self, pair) -> bool:
+        return pair in self.pairs or pair in self.filtered_pairs or pair in self.watched_pairs
+
+    def get_connection_feeds_count(self) -> int:
+        """
+        :return: the feeds count of this connector's websocket connection, shards excluded
+        """
+        return self.get_feeds_count(set(self.pairs + self.filtered_pairs), self.time_frames) \
+            + self.get_feeds_count(self.watched_pairs, [])
+
+    def clear(self):
+        for shard in self.shards:
+            shard.clear()
+        super().clear()
+
+    def _is_sharding_enabled(self):
+        return self.MAX_HANDLED_FEEDS_PER_CONNECTION != trading_constants.NO_DATA_LIMIT
+
+    def _create_shard(self, pairs):
+        shard = self.__class__(
+            self.config, self.exchange_manager, adapter_class=self._adapter_class,
+            additional_config=self.additional_config, websocket_name=self.websocket_name, is_shard=True
+        )
+        shard.add_headers(self.headers)
+        shard.add_options(self.options)
+        shard.throttled_ws_updates = self.throttled_ws_updates
+        shard.initialize(
+            currencies=self.currencies, pairs=pairs, time_frames=self.time_frames,
+            channels=[channel for channel in self.channels if not self._is_pair_independent_feed(channel)]
+        )
+        self.shards.append(shard)
+        return shard
+
+    def _start_new_shards(self):
+        # shards run in this connector's event loop
+        for shard in self.shards[len(self.shard_tasks):]:
+            self.shard_tasks.append(asyncio.create_task(shard._inner_start()))
+
+    async def _inner_start(self):
+        self._start_new_shards()
+        await super()._inner_start()
+
+    async def _inner_stop(self):
+        await asyncio.gather(*(
+            shard._inner_stop()
+            for shard in self.shards[:len(self.shard_tasks)]
+        ))
+        for task in self.shard_tasks:
+            if not task.done():
+                task.cancel()
+        await super()._inner_stop()
+
+    async def _inner_update_followed_pairs(self):
+        await super()._inner_update_followed_pairs()
+        # shards that are not initialized yet will subscribe to their pairs when starting
+        self._start_new_shards()
+        for shard in self.shards:
+            await shard._inner_update_followed_pairs()
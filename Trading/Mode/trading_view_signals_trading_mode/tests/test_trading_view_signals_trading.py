@@ -13,6 +13,7 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
 import decimal
 import math
 
@@ -339,6 +340,59 @@ async def test_signal_callback(tools):
         _set_state_mock.assert_not_called()
 
 
+async def test_parse_signal_data(tools):
+    exchange_manager, symbol, mode, producer, consumer = tools
+    with mock.patch.object(mode.logger, "error", mock.Mock()) as error_mock:
+        assert mode._parse_signal_data("") == {}
+        assert mode._parse_signal_data(
+            "  EXCHANGE = binance \r\n\n SYMBOL=BTCUSDT.P\nSIGNAL=BUY=SELL\nREDUCE_ONLY=TRUE\nPLOP\n  \nA=\n"
+        ) == {
+            mode.EXCHANGE_KEY: "binance",
+            mode.SYMBOL_KEY: "BTCUSDT.P",
+            mode.SIGNAL_KEY: "BUY",
+            mode.REDUCE_ONLY_KEY: True,
+            "A": "",
+        }
+        error_mock.assert_called_once()
+    parsed_data = {mode.SYMBOL_KEY: "BTCUSDT.P"}
+    mode._adapt_symbol(parsed_data)
+    assert parsed_data == {mode.SYMBOL_KEY: "BTCUSDT"}
+    parsed_data = {mode.SYMBOL_KEY: "BTC/USDT"}
+    mode._adapt_symbol(parsed_data)
+    assert parsed_data == {mode.SYMBOL_KEY: "BTC/USDT"}
+
+
+async def test_successive_signals_to_orders(tools):
+    exchange_manager, symbol, mode, producer, consumer = tools
+    orders_manager = exchange_manager.exchange_personal_data.orders_manager
+    signal = f"""
+        EXCHANGE={exchange_manager.exchange_name}
+        SYMBOL={symbol}
+        SIGNAL=BUY
+        ORDER_TYPE=LIMIT
+        PRICE=-5%
+        VOLUME=0.01
+    """
+
+    async def _wait_for_new_open_order(previous_order_ids):
+        while True:
+            open_orders = orders_manager.get_open_orders(symbol=symbol)
+            if open_orders and all(order.order_id not in previous_order_ids for order in open_orders):
+                return open_orders
+            await asyncio.sleep(0)
+
+    order_ids = set()
+    for _ in range(10):
+        await mode._trading_view_signal_callback({"metadata": signal})
+        open_orders = await asyncio.wait_for(_wait_for_new_open_order(order_ids), 5)
+        # each signal cancelled the previous signal order
+        assert len(open_orders) == 1
+        assert open_orders[0].origin_quantity == decimal.Decimal("0.01")
+        order_ids.add(open_orders[0].order_id)
+    # each signal created its own order
+    assert len(order_ids) == 10
+
+
 def compare_dict_with_nan(d_1, d_2):
     try:
         for key, val in d_1.items():
@@ -13,8 +13,11 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
 import decimal
+import functools
 import math
+import re
 
 import async_channel.channels as channels
 import octobot_commons.symbols.symbol_util as symbol_util
@@ -53,6 +56,9 @@ class TradingViewSignalsTradingMode(trading_modes.AbstractTradingMode):
     STOP_SIGNAL = "stop"
     CANCEL_SIGNAL = "cancel"
     SIDE_PARAM_KEY = "SIDE"
+    # one match per non-empty line: KEY=VALUE lines (anything after a second "=" is ignored) or invalid lines
+    SIGNAL_LINE_PATTERN = re.compile(r"^([^=\n]*)=([^=\n]*)[^\n]*$|^([^=\n]*\S[^=\n]*)$", re.MULTILINE)
+    BOOLEAN_VALUES = {"true": True, "false": False}
 
     def __init__(self, config, exchange_manager):
         super().__init__(config, exchange_manager)
@@ -130,30 +136,24 @@ class TradingViewSignalsTradingMode(trading_modes.AbstractTradingMode):
     def _adapt_symbol(self, parsed_data):
         if self.SYMBOL_KEY not in parsed_data:
             return
-        symbol = parsed_data[self.SYMBOL_KEY]
-        for suffix in self.TRADINGVIEW_FUTURES_SUFFIXES:
-            if symbol.endswith(suffix):
-                parsed_data[self.SYMBOL_KEY] = symbol.split(suffix)[0]
-                return
+        parsed_data[self.SYMBOL_KEY] = _get_adapted_symbol(
+            parsed_data[self.SYMBOL_KEY], tuple(self.TRADINGVIEW_FUTURES_SUFFIXES)
+        )
 
-    async def _trading_view_signal_callback(self, data):
+    def _parse_signal_data(self, signal_data) -> dict:
         parsed_data = {}
-        signal_data = data.get("metadata", "")
-        for line in signal_data.split("\n"):
-            if not line.strip():
-                # ignore empty lines
+        for key, value, invalid_line in self.SIGNAL_LINE_PATTERN.findall(signal_data):
+            if invalid_line:
+                self.logger.error(f"Invalid signal line in trading view signal, ignoring it. Line: \"{invalid_line}\"")
                 continue
-            values = line.split("=")
-            try:
-                value = values[1].strip()
-                # restore booleans
-                lower_val = value.lower()
-                if lower_val in ("true", "false"):
-                    value = lower_val == "true"
-                parsed_data[values[0].strip()] = value
-            except IndexError:
-                self.logger.error(f"Invalid signal line in trading view signal, ignoring it. Line: \"{line}\"")
+            value = value.strip()
+            # restore booleans
+            parsed_data[key.strip()] = self.BOOLEAN_VALUES.get(value.lower(), value)
+        return parsed_data
 
+    async def _trading_view_signal_callback(self, data):
+        signal_data = data.get("metadata", "")
+        parsed_data = self._parse_signal_data(signal_data)
         self._adapt_symbol(parsed_data)
         try:
             if parsed_data[self.EXCHANGE_KEY].lower() in self.exchange_manager.exchange_name and \
@@ -175,6 +175,14 @@ class TradingViewSignalsTradingMode(trading_modes.AbstractTradingMode):
         return False
 
 
+@functools.lru_cache(maxsize=1024)
+def _get_adapted_symbol(symbol, futures_suffixes):
+    for suffix in futures_suffixes:
+        if symbol.endswith(suffix):
+            return symbol.split(suffix)[0]
+    return symbol
+
+
 class TradingViewSignalsModeConsumer(daily_trading_mode.DailyTradingModeConsumer):
     def __init__(self, trading_mode):
         super().__init__(trading_mode)
@@ -218,8 +226,9 @@ class TradingViewSignalsModeProducer(daily_trading_mode.DailyTradingModeProducer
     async def _parse_order_details(self, ctx, parsed_data):
         side = parsed_data[TradingViewSignalsTradingMode.SIGNAL_KEY].casefold()
         order_type = parsed_data.get(TradingViewSignalsTradingMode.ORDER_TYPE_SIGNAL, "").casefold()
+        param_prefix_length = len(TradingViewSignalsTradingMode.PARAM_PREFIX_KEY)
         order_exchange_creation_params = {
-            param_name.split(TradingViewSignalsTradingMode.PARAM_PREFIX_KEY)[1]: param_value
+            param_name[param_prefix_length:]: param_value
             for param_name, param_value in parsed_data.items()
             if param_name.startswith(TradingViewSignalsTradingMode.PARAM_PREFIX_KEY)
         }
@@ -249,14 +258,12 @@ class TradingViewSignalsModeProducer(daily_trading_mode.DailyTradingModeProducer
                 f"Unknown signal: {parsed_data[TradingViewSignalsTradingMode.SIGNAL_KEY]}, full data= {parsed_data}"
             )
             state = trading_enums.EvaluatorStates.NEUTRAL
-        target_price = 0 if order_type == TradingViewSignalsTradingMode.MARKET_SIGNAL else (
-            await self._parse_price(ctx, parsed_data, TradingViewSignalsTradingMode.PRICE_KEY, 0))
-        stop_price = await self._parse_price(
-            ctx, parsed_data, TradingViewSignalsTradingMode.STOP_PRICE_KEY, math.nan
-        )
-        tp_price = await self._parse_price(
-            ctx, parsed_data, TradingViewSignalsTradingMode.TAKE_PROFIT_PRICE_KEY, math.nan
-        )
+        target_price, stop_price, tp_price = await self._parse_prices(ctx, parsed_data, (
+            (None if order_type == TradingViewSignalsTradingMode.MARKET_SIGNAL
+             else TradingViewSignalsTradingMode.PRICE_KEY, 0),
+            (TradingViewSignalsTradingMode.STOP_PRICE_KEY, math.nan),
+            (TradingViewSignalsTradingMode.TAKE_PROFIT_PRICE_KEY, math.nan),
+        ))
         allow_holdings_adaptation = parsed_data.get(TradingViewSignalsTradingMode.ALLOW_HOLDINGS_ADAPTATION_KEY, False)
 
         order_data = {
@@ -277,6 +284,31 @@ class TradingViewSignalsModeProducer(daily_trading_mode.DailyTradingModeProducer
         }
         return state, order_data
 
+    async def _parse_prices(self, ctx, parsed_data, keys_and_defaults) -> list:
+        """
+        :param keys_and_defaults: (signal key, default price) tuples, None keys always use their default price
+        :return: the parsed prices, given prices are parsed concurrently
+        """
+        prices = [decimal.Decimal(str(default)) for _, default in keys_and_defaults]
+        # common signals have no price: don't wait for anything
+        to_parse_indexes = [
+            index
+            for index, (key, _) in enumerate(keys_and_defaults)
+            if key is not None and parsed_data.get(key, 0)
+        ]
+        if len(to_parse_indexes) == 1:
+            index = to_parse_indexes[0]
+            key, default = keys_and_defaults[index]
+            prices[index] = await self._parse_price(ctx, parsed_data, key, default)
+        elif to_parse_indexes:
+            parsed_prices = await asyncio.gather(*(
+                self._parse_price(ctx, parsed_data, *keys_and_defaults[index])
+                for index in to_parse_indexes
+            ))
+            for index, price in zip(to_parse_indexes, parsed_prices):
+                prices[index] = price
+        return prices
+
     async def _parse_price(self, ctx, parsed_data, key, default):
         target_price = decimal.Decimal(str(default))
         if input_price_or_offset := parsed_data.get(key, 0):